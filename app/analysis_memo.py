@@ -0,0 +1,83 @@
+"""
+Analysis fingerprints and a short-lived memo of analysis results.
+
+/summarize returns a fingerprint (hash of the transcript, the analyzer
+version and the extraction options) and remembers its keywords and
+extraction under it. When the client saves the same transcript with that
+fingerprint, /save reuses the remembered results instead of running
+extraction again.
+
+The memo only bridges /summarize and the /save that follows it: it lives
+in this process and holds ANALYSIS_MEMO_MAX_ENTRIES results for
+ANALYSIS_MEMO_TTL_S seconds. After a restart, on another worker or past
+the TTL, /save finds no match and saves the meeting 'pending' so the
+enrichment worker recomputes the analysis. That is slower but gives the
+same result. What is durable is the meeting itself: its analysis results
+and fingerprint are stored on the document. The fingerprint lets later
+passes tell whether the analysis still matches the transcript. The options
+it covers are kept in the meeting's meta under 'analysis_options', so
+edits, backfills and resumed jobs can recompute it.
+"""
+
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+
+# Bump when extraction or keyword output changes, so old fingerprints stop matching
+ANALYZER_VERSION = '1'
+
+
+def stored_options(meta: Optional[str]) -> Dict[str, Any]:
+    """The 'analysis_options' saved in a meeting's meta JSON, or {} when there are none."""
+    if not meta:
+        return {}
+    try:
+        options = json.loads(meta).get('analysis_options')
+    except (json.JSONDecodeError, AttributeError):
+        return {}
+    return options if isinstance(options, dict) else {}
+
+
+def analysis_fingerprint(text: str, meeting_date: Optional[str] = None,
+                         attendees: Optional[List[str]] = None) -> str:
+    """Fingerprint of everything that determines keywords and extraction for `text`."""
+    options = json.dumps({'meeting_date': meeting_date or None, 'attendees': list(attendees or [])},
+                         sort_keys=True)
+    digest = hashlib.sha256()
+    digest.update(f"{ANALYZER_VERSION}\x00{options}\x00".encode('utf-8'))
+    digest.update((text or '').encode('utf-8'))
+    return digest.hexdigest()
+
+
+class AnalysisMemo:
+    """Thread-safe, in-process LRU of analysis results by fingerprint, with a TTL."""
+
+    def __init__(self, max_entries: int = 128, ttl_s: float = 3600.0):
+        self.max_entries = max_entries
+        self.ttl_s = ttl_s
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def put(self, fingerprint: str, analysis: Dict[str, Any]):
+        with self._lock:
+            self._entries[fingerprint] = (time.monotonic() + self.ttl_s, analysis)
+            self._entries.move_to_end(fingerprint)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def get(self, fingerprint: Optional[str]) -> Optional[Dict[str, Any]]:
+        if not fingerprint:
+            return None
+        with self._lock:
+            entry = self._entries.get(fingerprint)
+            if entry is None:
+                return None
+            expires, analysis = entry
+            if expires < time.monotonic():
+                del self._entries[fingerprint]
+                return None
+            self._entries.move_to_end(fingerprint)
+            return analysis
@@ -1,32 +1,43 @@
-from fastapi import FastAPI, Request, UploadFile, File, Form, HTTPException, Depends, BackgroundTasks, Response
+from fastapi import FastAPI, Request, UploadFile, File, Form, HTTPException, Depends, BackgroundTasks, Query, Response
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.gzip import GZipMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, StreamingResponse
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from typing import Optional
+from typing import List, Optional
+import asyncio
 import time
 import tempfile
 import uuid
 import os
-import io
+import json
+import logging
 import traceback
 from datetime import datetime
-from dotenv import load_dotenv, find_dotenv
+from pydantic import BaseModel
 from slowapi import Limiter, _rate_limit_exceeded_handler
 from slowapi.util import get_remote_address
 from slowapi.errors import RateLimitExceeded
 
-# load environment variables from .env if present (override any existing env vars)
-load_dotenv(find_dotenv(), override=True)
-
+from app.env import load_env
 from app.audio_processor import AudioProcessor
 from app.speech_to_text import SpeechToText
 from app.nlp_analyzer import NLPAnalyzer
+from app.analysis_memo import analysis_fingerprint, stored_options
+from app import enrichment as enrichment_jobs
+from app.processing_jobs import JobQueueFull, JobRegistry
+from app.speaker_index import talk_time, turns_for
+from app.upload_text import PARSED_EXTENSIONS, UploadError, document_text
+from app import executors
+from app.extraction_schema import parse_stats
 from app import db_mongo as db
 from app.config import config
 from app.auth import hash_password, verify_password, create_access_token, decode_access_token, create_refresh_token, decode_refresh_token
 import re
 
+# load environment variables from .env if present (override any existing env vars). Modules that
+# read the environment at import time (config, db_mongo, auth, nlp_analyzer) have already loaded it
+load_env()
+
 app = FastAPI(title='IMIP Prototype API')
 
 # ----- Compression Middleware -----
@@ -74,6 +85,20 @@ async def app_exception_handler(request: Request, exc: AppException):
         }
     )
 
+@app.exception_handler(executors.ExecutorSaturated)
+async def executor_saturated_handler(request: Request, exc: executors.ExecutorSaturated):
+    """A worker pool is full: ask the client to retry rather than queue without bound."""
+    _logger.warning(f"Rejected {request.method} {request.url.path}: {exc}")
+    return JSONResponse(
+        status_code=503,
+        content={
+            "error": "Server busy, please retry shortly",
+            "pool": exc.pool,
+            "request_id": request.headers.get('X-Request-ID')
+        },
+        headers={"Retry-After": "5"}
+    )
+
 @app.exception_handler(Exception)
 async def general_exception_handler(request: Request, exc: Exception):
     """Handle unexpected exceptions."""
@@ -160,9 +185,18 @@ audio_processor = AudioProcessor()
 # Initialize ASR with VOSK_MODEL_PATH from environment if set
 vosk_path = os.environ.get('VOSK_MODEL_PATH')
 # Use HF_HOME hub cache directory
-hf_cache_dir = os.path.join(config.HF_HOME, 'hub')
+hf_cache_dir = os.path.join(config.hf_home, 'hub')
 asr = SpeechToText(model_name=config.WHISPER_MODEL, vosk_model_path=vosk_path, cache_dir=hf_cache_dir)
 nlp = NLPAnalyzer()
+# Server-side upload -> transcript -> analysis -> meeting pipelines (POST /meetings/process)
+jobs = JobRegistry()
+_process_slots = asyncio.Semaphore(int(os.getenv('PROCESS_JOB_CONCURRENCY', '2')))
+# Computes keywords/extraction for saved meetings after /save has returned
+enrichment = enrichment_jobs.EnrichmentWorker(lambda job: enrichment_jobs.enrich_meeting(job, nlp),
+                                              on_failure=enrichment_jobs.mark_failed)
+
+# Samples event-loop lag for /status (see app.executors)
+_loop_watch: Optional[asyncio.Task] = None
 
 # MongoDB initialization happens in startup event (see below)
 
@@ -172,24 +206,37 @@ async def startup_event():
     # Initialize MongoDB
     await db.init_db()
     
+    # Start background enrichment and resume meetings a previous process left unfinished
+    enrichment.start()
+    global _loop_watch
+    _loop_watch = asyncio.create_task(executors.watch_loop())
+    resumed = await enrichment_jobs.requeue_unfinished(enrichment)
+    if resumed:
+        _logger.info(f"Re-queued {resumed} meetings for enrichment")
+    
     # Pre-load ASR model to reduce first-request latency
     _logger.info("Pre-loading ASR model...")
     try:
-        asr._ensure_model()
+        await executors.run('asr', asr._ensure_model)
         _logger.info(f"✅ ASR model loaded successfully (backend: {asr.backend})")
     except Exception as e:
         _logger.warning(f"⚠️  Failed to pre-load ASR model: {e}")
     
-    # Pre-load NLP/OpenAI client
-    if nlp.openai_client:
-        _logger.info(f"✅ OpenAI client initialized (summary: {nlp.openai_summary_model}, action: {nlp.openai_action_model})")
+    # The OpenAI SDK itself is imported on first use; only check it is configured
+    if nlp.openai_api_key:
+        _logger.info(f"✅ OpenAI configured (summary: {nlp.openai_summary_model}, action: {nlp.openai_action_model})")
     else:
         _logger.warning("⚠️  OpenAI client not configured - using basic extraction")
 
 @app.on_event("shutdown")
 async def shutdown_event():
-    """Close MongoDB connection on shutdown."""
+    """Stop background work and close MongoDB connection on shutdown."""
+    await enrichment.stop()
+    await jobs.cancel_all()
+    if _loop_watch is not None:
+        _loop_watch.cancel()
     await db.close_db()
+    executors.shutdown()
 
 # Security helper for JWT
 security = HTTPBearer()
@@ -250,7 +297,7 @@ async def register(email: str = Form(...), password: str = Form(...), full_name:
     
     # Hash password and create user
     try:
-        password_hash = hash_password(password)
+        password_hash = await executors.run('cpu', hash_password, password)
         user_id = await db.create_user(
             email=email,
             password_hash=password_hash,
@@ -264,6 +311,8 @@ async def register(email: str = Form(...), password: str = Form(...), full_name:
             'email': email,
             'message': 'Registration successful'
         }
+    except executors.ExecutorSaturated:
+        raise
     except Exception as e:
         return JSONResponse({'error': f'Registration failed: {str(e)}'}, status_code=500)
 
@@ -290,7 +339,7 @@ async def _perform_login(email: str, password: str, expected_role: Optional[str]
         raise HTTPException(status_code=401, detail='Invalid email or password')
     
     # Verify password
-    if not verify_password(password, user.password_hash):
+    if not await executors.run('cpu', verify_password, password, user.password_hash):
         raise HTTPException(status_code=401, detail='Invalid email or password')
     
     # Check if user is active
@@ -485,8 +534,8 @@ async def refresh_token(request: Request, response: Response, refresh_token: str
     }
 
 # ----- Admin-Only Routes -----
-from app.authz import require_admin, require_manager_or_admin
-
+# Imported here: app.authz builds these dependencies from get_current_user above
+from app.authz import require_admin, require_manager_or_admin  # noqa: E402
 @app.get('/admin/users')
 async def list_all_users(current_user = Depends(require_admin)):
     """List all users in the system (admin only)."""
@@ -571,8 +620,6 @@ async def delete_user_by_admin(user_id: str, current_user = Depends(require_admi
         })
         raise HTTPException(status_code=500, detail=f"Failed to delete user: {str(e)}")
 
-from pydantic import BaseModel
-
 class UpdateRoleRequest(BaseModel):
     role: str
 
@@ -1032,16 +1079,13 @@ async def update_support_ticket_admin(
 
 
 # ----- Request ID + structured logging middleware -----
-import uuid as _uuid
-import logging as _logging
-import time as _time
-_logger = _logging.getLogger("imip")
+_logger = logging.getLogger("imip")
 
 @app.middleware("http")
 async def add_request_id(request: Request, call_next):
     """Add request ID and log requests with user context."""
-    rid = request.headers.get('X-Request-ID', str(_uuid.uuid4()))
-    start = _time.time()
+    rid = request.headers.get('X-Request-ID', str(uuid.uuid4()))
+    start = time.time()
     
     # Try to extract user info from token (if present)
     user_id = None
@@ -1071,7 +1115,7 @@ async def add_request_id(request: Request, call_next):
             "method": request.method,
             "path": request.url.path,
             "status": response.status_code,
-            "duration_ms": int((_time.time() - start) * 1000),
+            "duration_ms": int((time.time() - start) * 1000),
             "client_ip": request.client.host if request.client else None,
         }
         
@@ -1120,9 +1164,20 @@ def _safe_unlink(path: str, retries: int = 6, delay: float = 0.5):
         pass
 
 
-def _delayed_unlink(path: str, delay: float = 2.0):
-    time.sleep(delay)
-    _safe_unlink(path)
+def _read_file(path: str) -> bytes:
+    with open(path, 'rb') as f:
+        return f.read()
+
+
+async def _media_too_long(content: bytes) -> bool:
+    """True when decoded media runs past MAX_AUDIO_DURATION_MINUTES (False if it can't be decoded)."""
+    try:
+        duration_sec = await executors.run('cpu', audio_processor.extract_duration_seconds, content)
+    except executors.ExecutorSaturated:
+        raise
+    except Exception:
+        return False
+    return duration_sec > config.MAX_AUDIO_DURATION_MINUTES * 60
 
 
 def _wait_for_file_ready(path: str, retries: int = 20, delay: float = 0.25):
@@ -1169,22 +1224,32 @@ async def status():
     
     # Report discovered paths from config
     probe['config'] = {
-        'FFMPEG_BIN': config.FFMPEG_BIN,
-        'VOSK_MODEL_PATH': config.VOSK_MODEL_PATH,
-        'HF_HOME': config.HF_HOME,
+        'FFMPEG_BIN': config.ffmpeg_bin,
+        'VOSK_MODEL_PATH': config.vosk_model_path,
+        'HF_HOME': config.hf_home,
         'WHISPER_MODEL': config.WHISPER_MODEL,
         'MAX_UPLOAD_SIZE': config.MAX_UPLOAD_SIZE,
     }
-    probe['vosk_model_discovered'] = bool(config.VOSK_MODEL_PATH)
+    probe['vosk_model_discovered'] = bool(config.vosk_model_path)
     
     # NLP / AI status - simplified and working
     probe['nlp'] = {
         'openai_enabled': bool(nlp.openai_client),
+        'summary_provider': nlp.summary_provider,
         'openai_summary_model': getattr(nlp, 'openai_summary_model', None),
         'openai_action_model': getattr(nlp, 'openai_action_model', None),
         'gemini_enabled': bool(nlp.gemini_client),
-        'gemini_model': getattr(nlp, 'gemini_model', None)
+        'gemini_model': getattr(nlp, 'gemini_model', None),
+        'prompt_tokens': nlp.prompts.stats(),
+        'extraction_parsing': parse_stats.to_dict(),
+        'providers': nlp.router.snapshot(),
+        'limits': nlp.router.limiter.snapshot(),
+        'hedging': {'enabled': nlp.hedging, **nlp.router.hedges.stats()},
+        'single_flight': {'nlp': dict(nlp.flights.stats), 'asr': dict(asr.flights.stats)},
+        'analysis_tiers': nlp.tiers.stats()
     }
+    # Worker pool occupancy and refusals, and how late the event loop is running
+    probe['executors'] = executors.stats()
     
     # Database status
     try:
@@ -1222,6 +1287,28 @@ async def get_vosk_config():
     exists = bool(path and os.path.isdir(path))
     return {'VOSK_MODEL_PATH': path, 'exists': exists}
 
+async def _document_text(ext: str, content: bytes):
+    """document_text(), with PDF/DOCX parsing in the process pool."""
+    if ext in PARSED_EXTENSIONS:
+        return await executors.run('process', document_text, ext, content)
+    return document_text(ext, content)
+
+def _media_mime_error(content: bytes):
+    """Error message if sniffed MIME type isn't supported audio/video, else None."""
+    try:
+        import magic as _magic
+        mime = _magic.from_buffer(content, mime=True)
+        allowed_mime = {
+            'audio/wav','audio/x-wav','audio/mpeg','audio/mp4','audio/ogg',
+            'video/webm','video/mp4','video/x-msvideo','video/quicktime','video/x-matroska','video/x-flv','video/x-ms-wmv'
+        }
+        if mime not in allowed_mime:
+            return f'Unsupported MIME type: {mime}'
+    except Exception:
+        # If magic unavailable, proceed with extension-only validation
+        pass
+    return None
+
 @app.post('/transcribe')
 @limiter.limit(config.RATE_LIMIT_TRANSCRIBE)
 async def transcribe(request: Request, file: UploadFile = File(None), pasted: str = Form(None)):
@@ -1240,102 +1327,30 @@ async def transcribe(request: Request, file: UploadFile = File(None), pasted: st
         if len(content) > config.MAX_UPLOAD_SIZE:
             return JSONResponse({'error': f'File too large. Max size is {config.MAX_UPLOAD_SIZE} bytes'}, status_code=413)
 
-        # Handle text files directly (no transcription needed)
-        text_extensions = {'.txt', '.md', '.rtf'}
-        if ext in text_extensions:
-            try:
-                # Try to decode as UTF-8
-                text_content = content.decode('utf-8')
-                return {
-                    'text': text_content, 
-                    'segments': [],
-                    'is_text_file': True,
-                    'message': 'Text file loaded directly - no transcription needed'
-                }
-            except UnicodeDecodeError:
-                try:
-                    # Try other encodings
-                    text_content = content.decode('latin-1')
-                    return {
-                        'text': text_content, 
-                        'segments': [],
-                        'is_text_file': True,
-                        'message': 'Text file loaded directly - no transcription needed'
-                    }
-                except UnicodeDecodeError:
-                    return JSONResponse({'error': 'Unable to decode text file. Please ensure it\'s a valid text file.'}, status_code=400)
-
-        # Handle PDF files
-        if ext == '.pdf':
-            try:
-                import PyPDF2
-                pdf_reader = PyPDF2.PdfReader(io.BytesIO(content))
-                text_content = ""
-                for page in pdf_reader.pages:
-                    text_content += page.extract_text() + "\n"
-                return {
-                    'text': text_content.strip(), 
-                    'segments': [],
-                    'is_text_file': True,
-                    'message': 'PDF text extracted directly - no transcription needed'
-                }
-            except ImportError:
-                return JSONResponse({'error': 'PDF processing requires PyPDF2 library. Please install it.'}, status_code=500)
-            except Exception as e:
-                return JSONResponse({'error': f'Failed to extract text from PDF: {str(e)}'}, status_code=400)
-
-        # Handle DOCX files
-        if ext == '.docx':
-            try:
-                from docx import Document
-                doc = Document(io.BytesIO(content))
-                text_content = ""
-                for paragraph in doc.paragraphs:
-                    text_content += paragraph.text + "\n"
-                return {
-                    'text': text_content.strip(), 
-                    'segments': [],
-                    'is_text_file': True,
-                    'message': 'DOCX text extracted directly - no transcription needed'
-                }
-            except ImportError:
-                return JSONResponse({'error': 'DOCX processing requires python-docx library. Please install it.'}, status_code=500)
-            except Exception as e:
-                return JSONResponse({'error': f'Failed to extract text from DOCX: {str(e)}'}, status_code=400)
-
-        # MIME sniffing for audio/video files
+        # Text documents need no transcription
         try:
-            import magic as _magic
-            mime = _magic.from_buffer(content, mime=True)
-            allowed_mime = {
-                'audio/wav','audio/x-wav','audio/mpeg','audio/mp4','audio/ogg',
-                'video/webm','video/mp4','video/x-msvideo','video/quicktime','video/x-matroska','video/x-flv','video/x-ms-wmv'
+            document = await _document_text(ext, content)
+        except UploadError as e:
+            return JSONResponse({'error': e.message}, status_code=e.status)
+        if document is not None:
+            text_content, message = document
+            return {
+                'text': text_content, 
+                'segments': [],
+                'is_text_file': True,
+                'message': message
             }
-            if mime not in allowed_mime:
-                return JSONResponse({'error': f'Unsupported MIME type: {mime}'}, status_code=400)
-        except Exception:
-            # If magic unavailable, proceed with extension-only validation
-            pass
 
-        # Convert to wav
-        tmp_root = str(config.TMP_DIR)
-        os.makedirs(tmp_root, exist_ok=True)
-        wav_path = os.path.join(tmp_root, f"{uuid.uuid4().hex}.wav")
-        try:
-            # Before writing, estimate duration from bytes
-            try:
-                duration_sec = audio_processor.extract_duration_seconds(content)
-                if duration_sec > config.MAX_AUDIO_DURATION_MINUTES * 60:
-                    return JSONResponse({'error': f'Media too long. Max duration is {config.MAX_AUDIO_DURATION_MINUTES} minutes'}, status_code=413)
-            except Exception:
-                pass
-            wav_bytes = audio_processor.convert_to_wav_bytes(content)
-            with open(wav_path, 'wb') as wf:
-                wf.write(wav_bytes)
-            result = asr.transcribe(wav_path)
-            return {'text': result.get('text', ''), 'segments': result.get('segments', [])}
-        finally:
-            _safe_unlink(wav_path)
+        # MIME sniffing for audio/video files
+        mime_error = _media_mime_error(content)
+        if mime_error:
+            return JSONResponse({'error': mime_error}, status_code=400)
+
+        # Before converting, estimate duration from bytes
+        if await _media_too_long(content):
+            return JSONResponse({'error': f'Media too long. Max duration is {config.MAX_AUDIO_DURATION_MINUTES} minutes'}, status_code=413)
+        result = await _transcribe_media(content)
+        return {'text': result.get('text', ''), 'segments': result.get('segments', [])}
     else:
         return {'text': pasted, 'segments': []}
 
@@ -1361,37 +1376,28 @@ async def transcribe_from_path(request: Request, background_tasks: BackgroundTas
     
     try:
         # Read the file and convert to wav
-        with open(file_path, 'rb') as f:
-            content = f.read()
+        content = await executors.run('io', _read_file, file_path)
         # Duration guard
-        try:
-            duration_sec = audio_processor.extract_duration_seconds(content)
-            if duration_sec > config.MAX_AUDIO_DURATION_MINUTES * 60:
-                return JSONResponse({'error': f'Media too long. Max duration is {config.MAX_AUDIO_DURATION_MINUTES} minutes'}, status_code=413)
-        except Exception:
-            pass
-        
-        # Create a temp directory and unique WAV path without pre-opening the file (avoids Windows locks)
-        tmp_root = str(config.TMP_DIR)
-        os.makedirs(tmp_root, exist_ok=True)
-        wav_path = os.path.join(tmp_root, f"{uuid.uuid4().hex}.wav")
-        
-        # Convert in-memory to WAV to avoid intermediate locks; then write once
-        wav_bytes = audio_processor.convert_to_wav_bytes(content)
-        with open(wav_path, 'wb') as wf:
-            wf.write(wav_bytes)
-        result = asr.transcribe(wav_path)
-        
-        # Schedule cleanup with a slight delay to avoid Windows file locking
-        background_tasks.add_task(_delayed_unlink, wav_path)
+        if await _media_too_long(content):
+            return JSONResponse({'error': f'Media too long. Max duration is {config.MAX_AUDIO_DURATION_MINUTES} minutes'}, status_code=413)
         
+        result = await _transcribe_media(content)
         return {'text': result.get('text', ''), 'segments': result.get('segments', [])}
+    except executors.ExecutorSaturated:
+        raise
     except Exception as e:
         return JSONResponse({'error': f'Failed to process file: {str(e)}'}, status_code=500)
 
 @app.post('/summarize')
 @limiter.limit(config.RATE_LIMIT_SUMMARIZE)
-async def summarize(request: Request, text: str = Form(...), meeting_date: str = Form(None), attendees: str = Form(None), require_ai: bool = Form(False), ai_model: str = Form(None)):
+async def summarize(request: Request, text: str = Form(...), meeting_date: str = Form(None), attendees: str = Form(None), require_ai: bool = Form(False), ai_model: str = Form(None),
+                    provider: str = Form(None), latency_budget_s: float = Form(None)):
+    """Summary, keywords and extracted items for a transcript.
+
+    Unless the caller forces AI (require_ai) or a provider, the analysis tier
+    (full LLM down to rule-based) is chosen up front to fit `latency_budget_s`;
+    extraction_metadata.method records the tier used.
+    """
     if not text:
         return JSONResponse({'error': 'No text provided.'}, status_code=400)
     
@@ -1400,17 +1406,35 @@ async def summarize(request: Request, text: str = Form(...), meeting_date: str =
     if attendees:
         attendees_list = [a.strip() for a in attendees.split(',') if a.strip()]
     
-    # Generate summary
-    try:
-        if require_ai:
-            summary = nlp.summarize_force_ai(text, model=ai_model)
-        else:
-            summary = nlp.summarize(text)
-    except Exception as e:
-        return JSONResponse({'error': f'AI summarization failed', 'detail': str(e)}, status_code=502)
+    # Split and tokenize once; every NLP pass below reuses it
+    doc = await executors.run('cpu', nlp.analyze, text)
     
-    extraction_result = nlp.extract_action_items(text, meeting_date=meeting_date, attendees=attendees_list)
-    keywords = nlp.extract_keywords(text)
+    # LLM-backed passes wait on the network, so they go to the io pool; local scoring to cpu
+    if not require_ai and not provider:
+        extraction_result = await executors.run('io', nlp.analyze_within_budget, doc, meeting_date=meeting_date,
+                                                attendees=attendees_list, latency_budget_s=latency_budget_s,
+                                                tenant=get_remote_address(request))
+        summary = extraction_result['summary']
+    else:
+        # Generate summary
+        try:
+            if require_ai:
+                summary = await executors.run('io', nlp.summarize_force_ai, doc, model=ai_model,
+                                              tenant=get_remote_address(request))
+                summary_info = {'method': 'ai', 'model': ai_model, 'degraded_reason': None}
+            else:
+                summary, summary_info = await executors.run('io', nlp.summarize_with_info, doc,
+                                                            tenant=get_remote_address(request), provider=provider)
+        except executors.ExecutorSaturated:
+            raise
+        except Exception as e:
+            return JSONResponse({'error': f'AI summarization failed', 'detail': str(e)}, status_code=502)
+        
+        extraction_result = await executors.run('io', nlp.extract_action_items, doc, meeting_date=meeting_date,
+                                                attendees=attendees_list)
+        # Record how the summary was produced (heuristic when providers were throttled or down)
+        extraction_result.setdefault('metadata', {})['summary'] = summary_info
+    keywords = await executors.run('cpu', nlp.extract_keywords, doc)
     
     response = {
         'summary': summary, 
@@ -1420,14 +1444,87 @@ async def summarize(request: Request, text: str = Form(...), meeting_date: str =
         'key_topics': extraction_result.get('key_topics', []),
         'extraction_metadata': extraction_result.get('metadata', {})
     }
+    # /save accepts this fingerprint and reuses the analysis instead of re-extracting
+    response['fingerprint'] = _remember_analysis(doc.text, meeting_date, attendees_list, response)
     return response
 
+def _remember_analysis(transcript: str, meeting_date: str, attendees: list, analysis: dict) -> str:
+    fingerprint = analysis_fingerprint(transcript, meeting_date, attendees)
+    nlp.memo.put(fingerprint, {key: analysis.get(key) for key in
+                               ('keywords', 'action_items', 'decisions', 'key_topics', 'extraction_metadata')})
+    return fingerprint
+
+def _sse(event: str, data) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+@app.post('/summarize/stream')
+@limiter.limit(config.RATE_LIMIT_SUMMARIZE)
+async def summarize_stream(request: Request, text: str = Form(...), meeting_date: str = Form(None), attendees: str = Form(None),
+                           require_ai: bool = Form(False), ai_model: str = Form(None), provider: str = Form(None)):
+    """Stream /summarize results as Server-Sent Events.
+
+    Events, in order: summary_delta {text} as tokens arrive, summary_done {summary},
+    then one action_item / decision / topic event per item, keywords {keywords},
+    and done {extraction_metadata, fingerprint}. Failures are reported as error {stage, error}.
+    """
+    if not text:
+        return JSONResponse({'error': 'No text provided.'}, status_code=400)
+    
+    attendees_list = None
+    if attendees:
+        attendees_list = [a.strip() for a in attendees.split(',') if a.strip()]
+    tenant = get_remote_address(request)
+    doc = await executors.run('cpu', nlp.analyze, text)
+    # Extraction runs on the io pool while the summary streams; admitted now so a full pool is a 503, not a broken stream
+    extraction = executors.pool('io').submit(nlp.extract_action_items, doc, meeting_date, attendees_list)
+    
+    def events():
+        parts = []
+        try:
+            for delta in nlp.summarize_stream(doc, tenant=tenant, model=ai_model, require_ai=require_ai,
+                                              provider=provider):
+                parts.append(delta)
+                yield _sse('summary_delta', {'text': delta})
+        except Exception as e:
+            _logger.warning(f"Summary stream failed: {e}")
+            yield _sse('error', {'stage': 'summary', 'error': str(e)})
+        yield _sse('summary_done', {'summary': ''.join(parts).strip()})
+        
+        try:
+            result = extraction.result()
+        except Exception as e:
+            _logger.warning(f"Extraction failed during stream: {e}")
+            yield _sse('error', {'stage': 'extraction', 'error': str(e)})
+            result = {}
+        for item in result.get('action_items', []):
+            yield _sse('action_item', item)
+        for item in result.get('decisions', []):
+            yield _sse('decision', item)
+        for item in result.get('key_topics', []):
+            yield _sse('topic', item)
+        keywords = nlp.extract_keywords(doc)
+        yield _sse('keywords', {'keywords': keywords})
+        done = {'extraction_metadata': result.get('metadata', {})}
+        if result:
+            done['fingerprint'] = _remember_analysis(doc.text, meeting_date, attendees_list, {
+                'keywords': keywords,
+                'action_items': result.get('action_items', []),
+                'decisions': result.get('decisions', []),
+                'key_topics': result.get('key_topics', []),
+                'extraction_metadata': result.get('metadata', {}),
+            })
+        yield _sse('done', done)
+    
+    # Sync generator: Starlette iterates it in a worker thread, so blocking LLM reads are fine
+    return StreamingResponse(events(), media_type='text/event-stream',
+                             headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
 @app.post('/save')
 @limiter.limit(config.RATE_LIMIT_SAVE)
 async def save_meeting(request: Request, title: str = Form('Untitled'), transcript: str = Form(''), summary: str = Form(''),
                       meeting_date: str = Form(None), attendees: str = Form(None), action_items: str = Form(None),
-                      decisions: str = Form(None), key_topics: str = Form(None),
-                      current_user = Depends(get_current_user)):
+                      decisions: str = Form(None), key_topics: str = Form(None), fingerprint: str = Form(None),
+                      segments: str = Form(None), current_user = Depends(get_current_user)):
     # CSRF protection (double-submit cookie) when cookie-auth is enabled
     if config.COOKIE_AUTH_ENABLED:
         cookie_csrf = request.cookies.get('csrf_token')
@@ -1465,24 +1562,44 @@ async def save_meeting(request: Request, title: str = Form('Untitled'), transcri
     else:
         key_topics = []
     
-    # Extract keywords from transcript if not provided
+    # ASR segments from /transcribe give the speaker index its turn times
+    try:
+        segments = json.loads(segments) if segments else None
+    except json.JSONDecodeError:
+        segments = None
+    if not isinstance(segments, list):
+        segments = None
+    
+    # Keywords and extraction run in the background enrichment worker unless /summarize's results are reusable
+    analysis_fp = None
+    analysis_status = enrichment_jobs.DONE
     if transcript:
-        keywords = nlp.extract_keywords(transcript)
-        
-        # If no action items provided, extract them from transcript
-        if not action_items:
-            extraction_result = nlp.extract_action_items(transcript, meeting_date=meeting_date, attendees=attendees_list)
-            action_items = extraction_result.get('action_items', [])
-            if not decisions:
-                decisions = extraction_result.get('decisions', [])
-            if not key_topics:
-                key_topics = extraction_result.get('key_topics', [])
+        # A matching fingerprint from /summarize means its analysis is still valid for this transcript
+        analysis_fp = analysis_fingerprint(transcript, meeting_date, attendees_list)
+        memoized = nlp.memo.get(fingerprint) if fingerprint == analysis_fp else None
+        extract_items = not action_items
+        if memoized is not None:
+            keywords = memoized['keywords'] or []
+            if not action_items:
+                action_items = memoized['action_items'] or []
+                if not decisions:
+                    decisions = memoized['decisions'] or []
+                if not key_topics:
+                    key_topics = memoized['key_topics'] or []
+        else:
+            keywords = []
+            analysis_fp = None
+            analysis_status = enrichment_jobs.PENDING
         
         # Store enhanced metadata
         extraction_meta = {
             'decisions': decisions,
             'key_topics': key_topics,
-            'extraction_metadata': {'method': 'frontend_provided' if action_items else 'auto_extracted'}
+            'extraction_metadata': {'method': 'frontend_provided' if action_items else 'auto_extracted',
+                                    'memoized': memoized is not None},
+            # Lets a restarted worker, later edits and backfills analyze with the same options
+            'analysis_options': {'meeting_date': meeting_date, 'attendees': attendees_list,
+                                 'extract_items': extract_items},
         }
         meta_json = json.dumps(extraction_meta)
     else:
@@ -1498,22 +1615,182 @@ async def save_meeting(request: Request, title: str = Form('Untitled'), transcri
         decisions=decisions,
         key_topics=key_topics,
         meta=meta_json,
-        user_id=str(current_user.id)
+        user_id=str(current_user.id),
+        analysis_fingerprint=analysis_fp,
+        analysis_status=analysis_status,
+        segments=segments
     )
-    return {'id': mid}
+    if analysis_status == enrichment_jobs.PENDING:
+        enrichment.submit(enrichment_jobs.EnrichmentJob(mid, meeting_date=meeting_date, attendees=attendees_list,
+                                                        extract_items=extract_items))
+    return {'id': mid, 'analysis_status': analysis_status}
+
+def _write_wav(content: bytes) -> str:
+    """Convert uploaded media to 16 kHz mono WAV in memory, then write it once; returns the path (blocking)."""
+    tmp_root = str(config.TMP_DIR)
+    os.makedirs(tmp_root, exist_ok=True)
+    wav_path = os.path.join(tmp_root, f"{uuid.uuid4().hex}.wav")
+    wav_bytes = audio_processor.convert_to_wav_bytes(content)
+    with open(wav_path, 'wb') as wf:
+        wf.write(wav_bytes)
+    return wav_path
+
+async def _transcribe_media(content: bytes, required: bool = False) -> dict:
+    """Convert on the cpu pool, transcribe on the asr pool, clean up on the io pool.
+
+    `required` queues past the pool limits instead of raising ExecutorSaturated,
+    for work that has already been admitted (a processing job).
+    """
+    run = executors.run_required if required else executors.run
+    wav_path = await run('cpu', _write_wav, content)
+    try:
+        return await run('asr', asr.transcribe, wav_path)
+    finally:
+        # Retries sleep while Windows holds the file; never refused so temp files don't leak
+        await executors.run_required('io', _safe_unlink, wav_path)
+
+def _analyze_for_meeting(transcript: str, meeting_date: str, attendees: list, provider: str, tenant: str) -> dict:
+    """Summary, extraction, keywords and per-chunk entries for a transcript (blocking)."""
+    # One chunked pass: the summary is synthesized from the chunk summaries, and the
+    # chunk entries are stored so later edits only re-analyze what changed
+    analysis, chunks = nlp.analyze_incremental(transcript, meeting_date=meeting_date, attendees=attendees,
+                                               tenant=tenant, provider=provider)
+    return dict(analysis, analysis_chunks=chunks)
+
+async def _process_meeting_job(job_id: str, user_id: str, title: str, content: bytes, pasted: str,
+                               meeting_date: str, attendees: list, provider: str):
+    try:
+        async with _process_slots:
+            segments = None
+            if content is not None:
+                jobs.stage(job_id, 'transcribing', 0.1)
+                asr_result = await _transcribe_media(content, required=True)
+                transcript, segments = asr_result.get('text', ''), asr_result.get('segments')
+            else:
+                transcript = pasted
+            del content
+            if not transcript or not transcript.strip():
+                raise ValueError('No speech or text found in the upload')
+            
+            jobs.stage(job_id, 'analyzing', 0.5)
+            # Admitted jobs are bounded by JobRegistry and _process_slots; the pools must not refuse them midway
+            analysis = await executors.run_required('io', _analyze_for_meeting, transcript, meeting_date, attendees,
+                                                    provider, user_id)
+            
+            jobs.stage(job_id, 'saving', 0.9)
+            chunks = analysis.pop('analysis_chunks')
+            meta_json = json.dumps({
+                'decisions': analysis['decisions'],
+                'key_topics': analysis['key_topics'],
+                'extraction_metadata': dict(analysis['extraction_metadata'], method='auto_extracted'),
+                'analysis_options': {'meeting_date': meeting_date, 'attendees': attendees, 'extract_items': True},
+            })
+            mid = await db.save_meeting(
+                title=title,
+                transcript=transcript,
+                summary=analysis['summary'],
+                keywords=analysis['keywords'],
+                action_items=analysis['action_items'],
+                decisions=analysis['decisions'],
+                key_topics=analysis['key_topics'],
+                meta=meta_json,
+                user_id=user_id,
+                analysis_fingerprint=analysis_fingerprint(transcript, meeting_date, attendees),
+                segments=segments,
+                analysis_chunks=chunks,
+                required=True
+            )
+        # The transcript stays on the server; fetch it from /meetings/{id} if needed
+        jobs.finish(job_id, {'meeting_id': mid, **analysis})
+    except asyncio.CancelledError:
+        # Shutdown: the upload only lived in memory, so the job cannot be resumed; don't leave it 'running'
+        jobs.fail(job_id, 'Cancelled: the server shut down before the job finished')
+        raise
+    except Exception as e:
+        _logger.warning(f"Processing job {job_id} failed: {e}")
+        jobs.fail(job_id, str(e))
+
+@app.post('/meetings/process', status_code=202)
+@limiter.limit(config.RATE_LIMIT_TRANSCRIBE)
+async def process_meeting(request: Request, file: UploadFile = File(None), pasted: str = Form(None),
+                          title: str = Form('Untitled'), meeting_date: str = Form(None), attendees: str = Form(None),
+                          provider: str = Form(None), current_user = Depends(get_current_user)):
+    """Transcribe, analyze and save a meeting in one server-side pipeline.
+
+    Returns a job id at once; poll GET /jobs/{job_id} for the stage
+    (transcribing, analyzing, saving) and, when done, the meeting id and results.
+    """
+    if file is None and not pasted:
+        return JSONResponse({'error': 'No file or pasted text provided.'}, status_code=400)
+    attendees_list = [a.strip() for a in attendees.split(',') if a.strip()] if attendees else None
+    
+    content = None
+    if file is not None:
+        filename = file.filename or ''
+        ext = '.' + filename.lower().rsplit('.', 1)[-1] if '.' in filename else ''
+        if ext not in config.ALLOWED_UPLOAD_EXTENSIONS:
+            return JSONResponse({'error': f'Unsupported file extension: {ext}'}, status_code=400)
+        content = await file.read()
+        if len(content) > config.MAX_UPLOAD_SIZE:
+            return JSONResponse({'error': f'File too large. Max size is {config.MAX_UPLOAD_SIZE} bytes'}, status_code=413)
+        try:
+            document = await _document_text(ext, content)
+        except UploadError as e:
+            return JSONResponse({'error': e.message}, status_code=e.status)
+        if document is not None:
+            pasted, content = document[0], None
+        else:
+            mime_error = _media_mime_error(content)
+            if mime_error:
+                return JSONResponse({'error': mime_error}, status_code=400)
+            if await _media_too_long(content):
+                return JSONResponse({'error': f'Media too long. Max duration is {config.MAX_AUDIO_DURATION_MINUTES} minutes'}, status_code=413)
+    
+    user_id = str(current_user.id)
+    try:
+        job = jobs.create(user_id, 'process_meeting')
+    except JobQueueFull:
+        # Each queued job holds its upload in memory; past the cap, ask the client to retry
+        return JSONResponse({'error': 'Too many meetings are being processed, please retry shortly'},
+                            status_code=503, headers={'Retry-After': '30'})
+    jobs.track(job.id, asyncio.create_task(_process_meeting_job(
+        job.id, user_id, title, content, pasted, meeting_date, attendees_list, provider)))
+    return {'job_id': job.id, 'status': job.status, 'status_url': f'/jobs/{job.id}'}
+
+@app.get('/jobs/{job_id}')
+async def get_job(job_id: str, current_user = Depends(get_current_user)):
+    """Status, stage and progress of a processing job; `result` is set once it is done."""
+    job = jobs.get(job_id)
+    if job is None:
+        return JSONResponse({'error': 'Job not found'}, status_code=404)
+    if job.user_id != str(current_user.id):
+        return JSONResponse({'error': 'Access denied'}, status_code=403)
+    return job.to_dict()
 
 @app.get('/meetings')
-async def list_meetings(limit: int = 10, offset: int = 0, search: str = None, 
+async def list_meetings(limit: int = 10, offset: int = 0, search: str = None, speaker: str = None,
                        current_user = Depends(get_current_user)):
-    """List meetings with pagination and optional search (filtered by current user)."""
-    if search:
-        rows = await db.search_meetings(query=search, limit=limit, offset=offset, user_id=str(current_user.id))
+    """List meetings with pagination and optional search (filtered by current user).
+
+    `speaker` keeps meetings that speaker took part in; with `search` as well,
+    only what that speaker said is searched and each meeting lists the
+    matching turns under `speaker_hits`.
+    """
+    user_id = str(current_user.id)
+    if search and speaker:
+        found = await db.search_speaker_turns(query=search, speaker=speaker, limit=limit, offset=offset,
+                                              user_id=user_id)
+        meetings = [dict(meeting_to_dict(m), speaker_hits=hits) for m, hits in found]
+    elif search:
+        meetings = [meeting_to_dict(r) for r in
+                    await db.search_meetings(query=search, limit=limit, offset=offset, user_id=user_id)]
     else:
-        rows = await db.list_meetings(limit=limit, offset=offset, user_id=str(current_user.id))
+        meetings = [meeting_to_dict(r) for r in
+                    await db.list_meetings(limit=limit, offset=offset, user_id=user_id, speaker=speaker)]
     
-    total = await db.count_meetings(user_id=str(current_user.id))
+    total = await db.count_meetings(user_id=user_id, speaker=speaker)
     return {
-        'meetings': [meeting_to_dict(r) for r in rows],
+        'meetings': meetings,
         'total': total,
         'limit': limit,
         'offset': offset,
@@ -1547,7 +1824,10 @@ async def get_meeting(meeting_id: str, current_user = Depends(get_current_user))
         'summary': m.summary,
         'keywords': m.keywords if isinstance(m.keywords, list) else [],
         'action_items': m.action_items if isinstance(m.action_items, list) else [],
-        'meta': m.meta
+        'meta': m.meta,
+        # pending/running while background enrichment is filling in keywords and items
+        'analysis_status': m.analysis_status,
+        'analysis_error': m.analysis_error
     }
     
     # Add enhanced data if available
@@ -1558,10 +1838,36 @@ async def get_meeting(meeting_id: str, current_user = Depends(get_current_user))
     
     return response
 
+@app.get('/meetings/{meeting_id}/speakers')
+async def get_meeting_speakers(meeting_id: str, speaker: List[str] = Query(None),
+                               current_user = Depends(get_current_user)):
+    """Talk time per speaker, from the speaker index stored with the meeting.
+
+    Pass `speaker` (repeatable) to also get those speakers' turns: character
+    offsets into the transcript and, for transcribed media, times in seconds.
+    """
+    view = await db.get_speaker_index(meeting_id)
+    if view is None:
+        return JSONResponse({'error': 'Meeting not found'}, status_code=404)
+    if view.user_id != str(current_user.id):
+        return JSONResponse({'error': 'Access denied'}, status_code=403)
+    
+    response = {'id': meeting_id, 'speakers': talk_time(view.speaker_index)}
+    if speaker:
+        response['turns'] = turns_for(view.speaker_index, speaker)
+    return response
+
 @app.put('/meetings/{meeting_id}')
 async def update_meeting(meeting_id: str, title: str = Form(None), transcript: str = Form(None), summary: str = Form(None),
+                        reanalyze: bool = Form(False), meeting_date: str = Form(None), attendees: str = Form(None),
                         current_user = Depends(get_current_user)):
-    """Update a meeting's details."""
+    """Update a meeting's details.
+
+    With reanalyze, an edited transcript is re-summarized and re-extracted
+    incrementally: only transcript chunks whose content changed go back to the
+    LLM, the rest reuse the per-chunk results stored with the meeting. A
+    meeting saved without them gets them from its first such edit.
+    """
     # Verify ownership first
     m = await db.get_meeting(meeting_id)
     if not m:
@@ -1569,17 +1875,52 @@ async def update_meeting(meeting_id: str, title: str = Form(None), transcript: s
     if m.user_id != str(current_user.id):
         return JSONResponse({'error': 'Access denied'}, status_code=403)
     
+    analysis = None
+    extra = {}
+    if reanalyze and transcript is not None and transcript != m.transcript:
+        # Options the form leaves out are the ones the meeting was analyzed with, so its chunk entries still match
+        options = stored_options(m.meta)
+        if meeting_date is None:
+            meeting_date = options.get('meeting_date')
+        if attendees is None:
+            attendees_list = options.get('attendees')
+        else:
+            attendees_list = [a.strip() for a in attendees.split(',') if a.strip()] or None
+        analysis, chunks = await executors.run('io', nlp.analyze_incremental, transcript,
+                                               cached_chunks=m.analysis_chunks, meeting_date=meeting_date,
+                                               attendees=attendees_list, tenant=str(current_user.id))
+        if summary is None:
+            summary = analysis['summary']
+        extra = {
+            'keywords': analysis['keywords'],
+            'action_items': analysis['action_items'],
+            'decisions': analysis['decisions'],
+            'key_topics': analysis['key_topics'],
+            'analysis_chunks': chunks,
+            'analysis_fingerprint': analysis_fingerprint(transcript, meeting_date, attendees_list),
+            'meta': json.dumps({
+                'decisions': analysis['decisions'],
+                'key_topics': analysis['key_topics'],
+                'extraction_metadata': analysis['extraction_metadata'],
+                'analysis_options': dict(options, meeting_date=meeting_date, attendees=attendees_list),
+            }),
+        }
+    
     success = await db.update_meeting(
         meeting_id=meeting_id,
         title=title,
         transcript=transcript,
-        summary=summary
+        summary=summary,
+        **extra
     )
     
     if not success:
         return JSONResponse({'error': 'Meeting not found'}, status_code=404)
     
-    return {'success': True, 'id': meeting_id}
+    response = {'success': True, 'id': meeting_id}
+    if analysis is not None:
+        response['analysis'] = analysis
+    return response
 
 @app.delete('/meetings/{meeting_id}')
 async def delete_meeting(meeting_id: str, current_user = Depends(get_current_user)):
@@ -1612,25 +1953,12 @@ async def transcribe_video(file: UploadFile = File(...)):
         if len(content) > config.MAX_UPLOAD_SIZE:
             return JSONResponse({'error': f'File too large. Max size is {config.MAX_UPLOAD_SIZE} bytes'}, status_code=413)
 
-        tmp_root = str(config.TMP_DIR)
-        os.makedirs(tmp_root, exist_ok=True)
-        wav_path = os.path.join(tmp_root, f"{uuid.uuid4().hex}.wav")
-
-        # Convert fully in-memory first, then write
-        wav_bytes = audio_processor.convert_to_wav_bytes(content)
-        with open(wav_path, 'wb') as wf:
-            wf.write(wav_bytes)
-        
-        # Transcribe the audio
-        result = asr.transcribe(wav_path)
+        # Convert and transcribe; the temporary WAV is removed afterwards
+        result = await _transcribe_media(content)
         
         return {'transcript': result.get('text', '')}
 
+    except executors.ExecutorSaturated:
+        raise
     except Exception as e:
         return JSONResponse(content={'error': str(e)}, status_code=500)
-    
-    finally:
-        # Clean up temporary files
-        if 'wav_path' in locals():
-            _safe_unlink(wav_path)
-            pass
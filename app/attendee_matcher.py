@@ -0,0 +1,267 @@
+"""
+Attendee-name matching with an Aho-Corasick automaton.
+
+The attendees passed to extraction ("Robert Smith", "Sarah Lee (Sal)")
+are expanded into the variants people actually say: the full name, the
+first name, common nicknames (Robert -> Bob, Rob, Bobby) and any aliases
+given in parentheses. All variants go into one automaton, built once per
+attendee list, that finds every mention in a single pass over the
+transcript however many names there are. Mentions resolve to the
+canonical attendee name, which assignee attribution and per-attendee
+statistics then share.
+
+Variants claimed by more than one attendee (two Johns) are dropped so a
+bare first name never guesses between people; the full names still match.
+"""
+
+import bisect
+import re
+from collections import deque
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from app.document import AnalyzedDocument, SpeakerTurn
+
+# Formal first name -> nicknames (matched both ways, so "Bob" in the list also matches "Robert")
+NICKNAMES: Dict[str, Tuple[str, ...]] = {
+    'alexander': ('alex', 'al', 'sasha'), 'alexandra': ('alex', 'sasha'), 'andrew': ('andy', 'drew'),
+    'anthony': ('tony',), 'benjamin': ('ben', 'benny'), 'catherine': ('cathy', 'kate'),
+    'charles': ('charlie', 'chuck'), 'christopher': ('chris',), 'christine': ('chris', 'tina'),
+    'daniel': ('dan', 'danny'), 'david': ('dave',), 'deborah': ('deb', 'debbie'), 'donald': ('don',),
+    'edward': ('ed', 'eddie', 'ted'), 'elizabeth': ('liz', 'beth', 'lizzie'), 'gregory': ('greg',),
+    'james': ('jim', 'jimmy', 'jamie'), 'jennifer': ('jen', 'jenny'), 'jessica': ('jess',),
+    'john': ('johnny', 'jack'), 'jonathan': ('jon', 'john'), 'joseph': ('joe', 'joey'),
+    'joshua': ('josh',), 'katherine': ('kate', 'katie', 'kathy'), 'kenneth': ('ken', 'kenny'),
+    'lawrence': ('larry',), 'margaret': ('maggie', 'meg', 'peggy'), 'matthew': ('matt',),
+    'michael': ('mike', 'mikey'), 'nicholas': ('nick',), 'patricia': ('pat', 'patty', 'trish'),
+    'patrick': ('pat',), 'peter': ('pete',), 'rajesh': ('raj',), 'rebecca': ('becky', 'becca'),
+    'richard': ('rick', 'rich', 'dick'), 'robert': ('bob', 'rob', 'bobby', 'robbie'),
+    'ronald': ('ron',), 'samantha': ('sam',), 'samuel': ('sam',), 'stephen': ('steve',),
+    'steven': ('steve',), 'susan': ('sue', 'susie'), 'thomas': ('tom', 'tommy'),
+    'timothy': ('tim',), 'victoria': ('vicky', 'tori'), 'william': ('will', 'bill', 'billy', 'liam'),
+    'zachary': ('zach', 'zack'),
+}
+_FORMAL: Dict[str, List[str]] = {}
+for _formal, _nicks in NICKNAMES.items():
+    for _nick in _nicks:
+        _FORMAL.setdefault(_nick, []).append(_formal)
+
+# Names that are also everyday words only count when capitalized ("Will" yes, "will" no)
+_COMMON_WORDS = frozenset({
+    'al', 'art', 'bill', 'chuck', 'dawn', 'dick', 'don', 'drew', 'ed', 'faith', 'grant', 'hope', 'jack',
+    'joy', 'june', 'mark', 'may', 'pat', 'rich', 'rob', 'rose', 'sue', 'will',
+})
+
+_ALIASES_RE = re.compile(r'^(.*?)\s*\(([^)]*)\)\s*$')
+_WORD_CHARS_RE = re.compile(r'\w')
+
+
+@dataclass(frozen=True)
+class Mention:
+    name: str   # canonical attendee name
+    alias: str  # variant that matched, lowercase
+    start: int
+    end: int
+
+
+def parse_attendee(entry: str) -> Tuple[str, List[str]]:
+    """'Robert Smith (Bob, Bobby)' -> ('Robert Smith', ['Bob', 'Bobby'])."""
+    entry = (entry or '').strip()
+    m = _ALIASES_RE.match(entry)
+    if not m:
+        return entry, []
+    return m.group(1).strip(), [a.strip() for a in m.group(2).split(',') if a.strip()]
+
+
+def name_variants(name: str, aliases: Iterable[str] = ()) -> List[str]:
+    """Lowercase ways of referring to `name`: full name, first name, nicknames and aliases."""
+    parts = name.split()
+    variants = [name.lower()]
+    if parts:
+        first = parts[0].lower()
+        variants.append(first)
+        variants.extend(NICKNAMES.get(first, ()))
+        for formal in _FORMAL.get(first, ()):
+            variants.append(formal)
+        if len(parts) > 1:
+            # "Bob Smith" for "Robert Smith"
+            rest = ' '.join(parts[1:]).lower()
+            variants.extend(f"{nick} {rest}" for nick in NICKNAMES.get(first, ()))
+    variants.extend(a.lower() for a in aliases)
+    return [v for v in dict.fromkeys(variants) if len(v) >= 2]
+
+
+class AhoCorasick:
+    """Multi-pattern matcher: every occurrence of every pattern in one pass over the text."""
+
+    def __init__(self, patterns: Sequence[str]):
+        self.patterns = list(patterns)
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._out: List[List[int]] = [[]]
+        for index, pattern in enumerate(self.patterns):
+            state = 0
+            for ch in pattern:
+                nxt = self._goto[state].get(ch)
+                if nxt is None:
+                    nxt = len(self._goto)
+                    self._goto[state][ch] = nxt
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._out.append([])
+                state = nxt
+            self._out[state].append(index)
+        # Breadth-first fail links; each state also inherits the outputs of its fail state
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in self._goto[state].items():
+                queue.append(nxt)
+                fail = self._fail[state]
+                while fail and ch not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[nxt] = self._goto[fail].get(ch, 0)
+                self._out[nxt] = self._out[nxt] + self._out[self._fail[nxt]]
+
+    def iter(self, text: str, start: int = 0, end: int = None) -> Iterable[Tuple[int, int, int]]:
+        """Yield (pattern index, start, end) for every occurrence in text[start:end]."""
+        goto, fail, out, patterns = self._goto, self._fail, self._out, self.patterns
+        state = 0
+        for pos in range(start, len(text) if end is None else end):
+            ch = text[pos]
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            for index in out[state]:
+                yield index, pos + 1 - len(patterns[index]), pos + 1
+
+
+class AttendeeMatcher:
+    """Finds attendee mentions and resolves name variants to the canonical attendee."""
+
+    def __init__(self, attendees: Sequence[str]):
+        owners: Dict[str, List[str]] = {}
+        self.attendees: List[str] = []
+        for entry in attendees or ():
+            name, aliases = parse_attendee(entry)
+            if not name or name in self.attendees:
+                continue
+            self.attendees.append(name)
+            for variant in name_variants(name, aliases):
+                owners.setdefault(variant, []).append(name)
+        # A variant shared by several attendees is ambiguous; only their full names match
+        self._canonical = {v: names[0] for v, names in owners.items() if len(set(names)) == 1}
+        self._automaton = AhoCorasick(list(self._canonical)) if self._canonical else None
+        self._last: Tuple[Optional[AnalyzedDocument], List[Mention]] = (None, [])
+
+    def __bool__(self) -> bool:
+        return self._automaton is not None
+
+    def canonical(self, name: Optional[str]) -> Optional[str]:
+        """The attendee `name` refers to ("bob" -> "Robert Smith"), or None."""
+        if not name:
+            return None
+        return self._canonical.get(' '.join(name.lower().split()))
+
+    def mentions(self, text: str) -> List[Mention]:
+        """Whole-word mentions in text order; overlapping matches keep the longest ("Bob Smith" over "Bob")."""
+        if self._automaton is None or not text:
+            return []
+        lower = text.lower()
+        if len(lower) != len(text):
+            lower = ''.join(c.lower() if len(c.lower()) == 1 else c for c in text)
+        hits = []
+        for index, start, end in self._automaton.iter(lower):
+            if (start > 0 and _WORD_CHARS_RE.match(lower[start - 1])) or \
+                    (end < len(lower) and _WORD_CHARS_RE.match(lower[end])):
+                continue
+            alias = self._automaton.patterns[index]
+            if alias in _COMMON_WORDS and not text[start].isupper():
+                continue
+            hits.append((start, -(end - start), end, alias))
+        hits.sort()
+        mentions: List[Mention] = []
+        covered = -1
+        for start, _, end, alias in hits:
+            if start < covered:
+                continue
+            mentions.append(Mention(self._canonical[alias], alias, start, end))
+            covered = end
+        return mentions
+
+    def document_mentions(self, doc: AnalyzedDocument) -> List[Mention]:
+        """mentions(doc.text), remembered for the last document so extraction and stats share one scan."""
+        last_doc, found = self._last
+        if last_doc is not doc:
+            found = self.mentions(doc.text)
+            self._last = (doc, found)
+        return found
+
+
+@lru_cache(maxsize=64)
+def _cached_matcher(attendees: Tuple[str, ...]) -> AttendeeMatcher:
+    return AttendeeMatcher(attendees)
+
+
+def matcher_for(attendees: Optional[Sequence[str]]) -> Optional[AttendeeMatcher]:
+    """Matcher for an attendee list (cached, since the same list comes back on every pass), or None."""
+    if not attendees:
+        return None
+    matcher = _cached_matcher(tuple(attendees))
+    return matcher if matcher else None
+
+
+class MentionIndex:
+    """Mentions in one transcript, queryable by character range."""
+
+    def __init__(self, mentions: List[Mention]):
+        self.mentions = mentions
+        self._starts = [m.start for m in mentions]
+
+    def within(self, start: int, end: int) -> List[Mention]:
+        i = bisect.bisect_left(self._starts, start)
+        out = []
+        while i < len(self.mentions) and self.mentions[i].end <= end:
+            out.append(self.mentions[i])
+            i += 1
+        return out
+
+    def first_within(self, start: int, end: int) -> Optional[str]:
+        found = self.within(start, end)
+        return found[0].name if found else None
+
+
+def turn_at(turns: Sequence[SpeakerTurn], offset: int) -> Optional[SpeakerTurn]:
+    """The speaker turn whose utterance contains `offset`, if any (turns are in text order)."""
+    i = bisect.bisect_right([t.start for t in turns], offset) - 1
+    if i >= 0 and offset <= turns[i].end:
+        return turns[i]
+    return None
+
+
+def attendee_stats(doc: AnalyzedDocument, matcher: AttendeeMatcher, mentions: List[Mention],
+                   action_items: Sequence[Dict[str, Any]] = ()) -> Dict[str, Dict[str, int]]:
+    """Per-attendee mentions, speaking turns, characters spoken and assigned action items.
+
+    Speaker labels ("Name:") are turns, not mentions.
+    """
+    stats = {name: {'mentions': 0, 'turns': 0, 'chars_spoken': 0, 'action_items': 0} for name in matcher.attendees}
+    turns = doc.speaker_turns
+    starts = [t.start for t in turns]
+    for mention in mentions:
+        # Inside a label when the next utterance starts later on the same line
+        i = bisect.bisect_right(starts, mention.start)
+        if i < len(turns) and '\n' not in doc.text[mention.start:turns[i].start]:
+            continue
+        stats[mention.name]['mentions'] += 1
+    for turn in turns:
+        name = matcher.canonical(turn.speaker)
+        if name is not None:
+            stats[name]['turns'] += 1
+            stats[name]['chars_spoken'] += turn.end - turn.start
+    for item in action_items:
+        name = matcher.canonical(item.get('assignee') or item.get('owner'))
+        if name is not None:
+            stats[name]['action_items'] += 1
+    return stats
@@ -1,6 +1,12 @@
 import io
 import os
-from pydub import AudioSegment
+
+
+def _audio_segment():
+    # pydub is imported on first use: it probes for ffmpeg at import time
+    from pydub import AudioSegment
+    return AudioSegment
+
 
 class AudioProcessor:
     """Minimal audio helper: validate, convert to WAV (16k mono), and extract duration."""
@@ -13,7 +19,7 @@ class AudioProcessor:
 
     def convert_to_wav(self, input_bytes: bytes, target_path: str) -> str:
         """Convert input audio bytes to 16kHz mono WAV saved at target_path. Returns path."""
-        audio = AudioSegment.from_file(io.BytesIO(input_bytes))
+        audio = _audio_segment().from_file(io.BytesIO(input_bytes))
         audio = audio.set_frame_rate(16000).set_channels(1).set_sample_width(2)
         # Ensure parent dir exists
         os.makedirs(os.path.dirname(target_path) or '.', exist_ok=True)
@@ -22,12 +28,12 @@ class AudioProcessor:
 
     def convert_to_wav_bytes(self, input_bytes: bytes) -> bytes:
         """Convert input audio/video bytes to 16kHz mono WAV and return bytes (no filesystem)."""
-        audio = AudioSegment.from_file(io.BytesIO(input_bytes))
+        audio = _audio_segment().from_file(io.BytesIO(input_bytes))
         audio = audio.set_frame_rate(16000).set_channels(1).set_sample_width(2)
         buf = io.BytesIO()
         audio.export(buf, format='wav')
         return buf.getvalue()
 
     def extract_duration_seconds(self, input_bytes: bytes) -> float:
-        audio = AudioSegment.from_file(io.BytesIO(input_bytes))
+        audio = _audio_segment().from_file(io.BytesIO(input_bytes))
         return len(audio) / 1000.0 
\ No newline at end of file
@@ -6,9 +6,9 @@ from typing import Optional, Dict
 
 import jwt
 import bcrypt
-from dotenv import load_dotenv
+from app.env import load_env
 
-load_dotenv()
+load_env()
 
 # JWT Configuration
 SECRET_KEY = os.getenv('SECRET_KEY', 'your-secret-key-change-in-production')
@@ -0,0 +1,240 @@
+"""
+Resumable bulk re-analysis of stored meetings.
+
+Recomputes keywords, rule-based extraction, extractive summaries and/or
+speaker indexes for every document in the meetings collection without
+going through the API.
+Meetings are streamed in _id order with a cursor, analysis (pure CPU) fans
+out to a process pool, and results go back as unordered bulk_write pages.
+After each page the last _id is written to a checkpoint file, so a crashed
+or interrupted run picks up where it stopped. Used by tools/backfill_analysis.py.
+
+Workers never call an LLM: keys are ignored and the rule-based and
+extractive paths are used, so a backfill costs no provider quota.
+"""
+
+import json
+import os
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterator, List, Optional, Sequence
+
+from bson import json_util
+from pymongo import UpdateOne
+
+from app.analysis_memo import analysis_fingerprint
+from app.corpus_idf import CorpusIdf
+from app.speaker_index import build_speaker_index
+
+TASKS = ('keywords', 'extraction', 'summary', 'speakers')
+# Meetings the enrichment worker still owns are left alone
+_SKIP_STATUSES = ['pending', 'running']
+_FIELDS = {'transcript': 1, 'meta': 1}
+
+
+@dataclass
+class BackfillStats:
+    processed: int = 0
+    updated: int = 0
+    skipped: int = 0
+    failed: List[str] = field(default_factory=list)
+    last_id: Any = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {'processed': self.processed, 'updated': self.updated, 'skipped': self.skipped,
+                'failed': self.failed, 'last_id': self.last_id}
+
+
+class Checkpoint:
+    """Progress file: the tasks being run and the last _id whose page was written."""
+
+    def __init__(self, path: str):
+        self.path = path
+
+    def load(self, tasks: Sequence[str]) -> BackfillStats:
+        if not self.path or not os.path.exists(self.path):
+            return BackfillStats()
+        with open(self.path, 'r', encoding='utf-8') as f:
+            data = json_util.loads(f.read())
+        if sorted(data.get('tasks', [])) != sorted(tasks):
+            raise ValueError(f"Checkpoint {self.path} is for tasks {data.get('tasks')}, not {list(tasks)}; "
+                             f"remove it to start over")
+        return BackfillStats(processed=data.get('processed', 0), updated=data.get('updated', 0),
+                             skipped=data.get('skipped', 0), failed=list(data.get('failed', [])),
+                             last_id=data.get('last_id'))
+
+    def save(self, tasks: Sequence[str], stats: BackfillStats):
+        if not self.path:
+            return
+        data = dict(stats.to_dict(), tasks=list(tasks), updated_at=datetime.now(timezone.utc).isoformat())
+        # Write-then-rename so a crash mid-write never leaves a torn checkpoint
+        directory = os.path.dirname(os.path.abspath(self.path))
+        fd, tmp = tempfile.mkstemp(dir=directory, prefix='.backfill-', suffix='.tmp')
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            f.write(json_util.dumps(data, indent=2))
+        os.replace(tmp, self.path)
+
+
+# ============= Worker Side =============
+
+_worker: Dict[str, Any] = {}
+
+
+def init_worker(tasks: Sequence[str], idf: Optional[CorpusIdf] = None, summary_words: int = 300):
+    """Process-pool initializer: one offline analyzer per worker process."""
+    from app.nlp_analyzer import NLPAnalyzer
+
+    nlp = NLPAnalyzer()
+    nlp.openai_client = None
+    nlp.gemini_client = None
+    if idf is not None:
+        nlp.corpus_idf = idf
+    _worker.update(nlp=nlp, tasks=tuple(tasks), summary_words=summary_words)
+
+
+def _load_meta(raw: Optional[str]) -> Dict[str, Any]:
+    if not raw:
+        return {}
+    try:
+        meta = json.loads(raw)
+    except json.JSONDecodeError:
+        return {}
+    return meta if isinstance(meta, dict) else {}
+
+
+def analyze_meeting(record: Dict[str, Any]) -> Dict[str, Any]:
+    """Fields to $set for one meeting, or {'error': message}. Runs in a worker process."""
+    nlp, tasks = _worker['nlp'], _worker['tasks']
+    try:
+        transcript = record.get('transcript') or ''
+        doc = nlp.analyze(transcript)
+        fields: Dict[str, Any] = {}
+        if 'keywords' in tasks:
+            fields['keywords'] = nlp.extract_keywords(doc)
+        if 'extraction' in tasks:
+            meta = _load_meta(record.get('meta'))
+            options = meta.get('analysis_options') or {}
+            meeting_date, attendees = options.get('meeting_date'), options.get('attendees')
+            extraction = nlp._extract_enhanced_items_rule_based(doc, meeting_date, attendees)
+            fields['action_items'] = extraction['action_items']
+            fields['decisions'] = extraction['decisions']
+            fields['key_topics'] = extraction['key_topics']
+            meta['decisions'] = extraction['decisions']
+            meta['key_topics'] = extraction['key_topics']
+            meta['extraction_metadata'] = dict(extraction.get('metadata', {}), backfilled=True)
+            fields['meta'] = json.dumps(meta)
+            # Without the stored options a new fingerprint would be computed for the wrong date and attendees
+            if 'analysis_options' in meta:
+                fields['analysis_fingerprint'] = analysis_fingerprint(transcript, meeting_date, attendees)
+        if 'summary' in tasks:
+            fields['summary'], _ = nlp.summarize_with_info(doc, _worker['summary_words'], provider='textrank')
+        if 'speakers' in tasks:
+            # ASR segments are not stored, so backfilled turns carry no times
+            fields['speaker_index'] = build_speaker_index(transcript)
+        return fields
+    except Exception as e:
+        return {'error': f"{type(e).__name__}: {e}"}
+
+
+class _InlinePool:
+    """Executor stand-in for workers=0 (debugging, tests): runs analysis in this process."""
+
+    def __init__(self, initializer, initargs):
+        initializer(*initargs)
+
+    def map(self, fn, items, chunksize=1):
+        return [fn(item) for item in items]
+
+    def shutdown(self, wait=True):
+        pass
+
+
+# ============= Driver =============
+
+def build_corpus_idf(collection) -> CorpusIdf:
+    """Document frequencies over every stored transcript, as the API process keeps them."""
+    idf = CorpusIdf()
+    idf.rebuild(m.get('transcript') for m in collection.find({}, {'transcript': 1}).batch_size(500))
+    return idf
+
+
+def _pages(collection, after: Any, page_size: int, limit: Optional[int]) -> Iterator[List[Dict[str, Any]]]:
+    query: Dict[str, Any] = {'analysis_status': {'$nin': _SKIP_STATUSES}}
+    if after is not None:
+        query['_id'] = {'$gt': after}
+    cursor = collection.find(query, _FIELDS).sort('_id', 1).batch_size(page_size)
+    if limit:
+        cursor = cursor.limit(limit)
+    page: List[Dict[str, Any]] = []
+    for meeting in cursor:
+        page.append(meeting)
+        if len(page) >= page_size:
+            yield page
+            page = []
+    if page:
+        yield page
+
+
+def run_backfill(collection, tasks: Sequence[str], checkpoint: Checkpoint = None, workers: int = None,
+                 page_size: int = 200, limit: int = None, summary_words: int = 300,
+                 idf: Optional[CorpusIdf] = None) -> BackfillStats:
+    """Re-analyze every meeting after the checkpoint; returns the cumulative stats.
+
+    `collection` is a pymongo (sync) collection. workers=0 analyzes in
+    this process. Updates match on the transcript that was analyzed, so a
+    meeting edited during the run is skipped rather than overwritten with
+    stale results.
+    """
+    unknown = set(tasks) - set(TASKS)
+    if unknown or not tasks:
+        raise ValueError(f"tasks must be a non-empty subset of {TASKS}, got {list(tasks)}")
+    checkpoint = checkpoint or Checkpoint('')
+    stats = checkpoint.load(tasks)
+    if stats.last_id is not None:
+        print(f"Resuming after _id {stats.last_id} ({stats.processed} meetings already processed)")
+    if idf is None and 'keywords' in tasks:
+        idf = build_corpus_idf(collection)
+        print(f"Corpus IDF built from {idf.documents} transcripts")
+
+    if workers is None:
+        workers = os.cpu_count() or 1
+    initargs = (tuple(tasks), idf, summary_words)
+    pool = (ProcessPoolExecutor(max_workers=workers, initializer=init_worker, initargs=initargs)
+            if workers > 0 else _InlinePool(init_worker, initargs))
+    started = time.monotonic()
+
+    def write(page: List[Dict[str, Any]], results) -> None:
+        ops = []
+        for meeting, fields in zip(page, results, strict=True):
+            if 'error' in fields:
+                stats.failed.append(str(meeting['_id']))
+                print(f"Meeting {meeting['_id']} failed: {fields['error']}")
+                continue
+            ops.append(UpdateOne({'_id': meeting['_id'], 'transcript': meeting.get('transcript')}, {'$set': fields}))
+        if ops:
+            result = collection.bulk_write(ops, ordered=False)
+            stats.updated += result.matched_count
+            stats.skipped += len(ops) - result.matched_count
+        stats.processed += len(page)
+        stats.last_id = page[-1]['_id']
+        checkpoint.save(tasks, stats)
+        rate = stats.processed / max(1e-9, time.monotonic() - started)
+        print(f"{stats.processed} processed ({stats.updated} updated, {stats.skipped} skipped, "
+              f"{len(stats.failed)} failed), {rate:.1f}/s")
+
+    try:
+        pending = None
+        for page in _pages(collection, stats.last_id, page_size, limit):
+            # Executor.map submits the whole page at once, so this page is analyzed while the previous one is written
+            results = pool.map(analyze_meeting, page, chunksize=max(1, len(page) // (max(1, workers) * 4)))
+            if pending is not None:
+                write(*pending)
+            pending = (page, results)
+        if pending is not None:
+            write(*pending)
+    finally:
+        pool.shutdown(wait=True)
+    return stats
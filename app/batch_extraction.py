@@ -0,0 +1,152 @@
+"""
+Multi-document extraction for bulk backfills.
+
+Re-running extraction over stored meetings (after a prompt change, say)
+costs one round trip per meeting, and for short meetings most of that is
+fixed overhead: the instructions and schema are resent every time. Here
+short meetings are packed several to a request, each wrapped in
+<<<MEETING id>>> ... <<<END MEETING id>>> delimiters, and the reply lists
+one entry per id so results can be split back out and verified against
+their own transcript. When the OpenAI client supports the Batch API, all
+packed requests go out as a single batch job instead of one call each.
+"""
+
+import io
+import json
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Sequence
+
+# Packing limits; a meeting longer than BATCH_MAX_DOC_TOKENS is extracted on its own
+BATCH_MAX_DOCS = 8
+BATCH_MAX_TOKENS = 12000
+BATCH_MAX_DOC_TOKENS = 4000
+
+BATCH_COMPLETION_WINDOW = '24h'
+_BATCH_TERMINAL = ('completed', 'failed', 'expired', 'cancelled')
+
+
+class BatchJobError(RuntimeError):
+    """Raised when a provider batch job fails, expires or times out."""
+
+
+@dataclass
+class BatchDocument:
+    id: str
+    text: str
+    meeting_date: Optional[str] = None
+    attendees: Optional[List[str]] = None
+
+
+def pack_documents(tokens: Sequence[int], max_docs: int = BATCH_MAX_DOCS,
+                   max_tokens: int = BATCH_MAX_TOKENS,
+                   max_doc_tokens: int = BATCH_MAX_DOC_TOKENS) -> List[List[int]]:
+    """Group document indexes into requests, packing them in input order.
+
+    Documents over `max_doc_tokens` get a group of their own; the others are
+    added to the current group until it reaches `max_docs` or `max_tokens`.
+    """
+    groups: List[List[int]] = []
+    current: List[int] = []
+    used = 0
+    for i, count in enumerate(tokens):
+        if count > max_doc_tokens:
+            groups.append([i])
+            continue
+        if current and (len(current) >= max_docs or used + count > max_tokens):
+            groups.append(current)
+            current, used = [], 0
+        current.append(i)
+        used += count
+    if current:
+        groups.append(current)
+    return groups
+
+
+def render_documents(ids: Sequence[str], texts: Sequence[str], docs: Sequence[BatchDocument]) -> str:
+    """The delimited meetings block for the `extraction_batch` template."""
+    parts = []
+    for doc_id, text, doc in zip(ids, texts, docs, strict=True):
+        attendees = ", ".join(doc.attendees) if doc.attendees else "Unknown attendees"
+        parts.append(
+            f"<<<MEETING {doc_id}>>>\n"
+            f"Date/Time: {doc.meeting_date or 'unknown'}\n"
+            f"Attendees: {attendees}\n"
+            f"Transcript:\n{text}\n"
+            f"<<<END MEETING {doc_id}>>>"
+        )
+    return "\n\n".join(parts)
+
+
+# ============= OpenAI Batch API =============
+
+def supports_batch_api(client) -> bool:
+    return client is not None and hasattr(client, 'batches') and hasattr(client, 'files')
+
+
+def batch_request_lines(requests: Dict[str, Dict[str, Any]]) -> bytes:
+    """JSONL input file for /v1/chat/completions; `requests` maps custom_id to the request body."""
+    lines = [
+        json.dumps({'custom_id': custom_id, 'method': 'POST', 'url': '/v1/chat/completions', 'body': body})
+        for custom_id, body in requests.items()
+    ]
+    return ("\n".join(lines) + "\n").encode('utf-8')
+
+
+def parse_batch_output(content: str) -> Dict[str, str]:
+    """Reply text by custom_id from a batch output file; failed requests are left out."""
+    replies: Dict[str, str] = {}
+    for line in (content or '').splitlines():
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+            response = record.get('response') or {}
+            if record.get('error') or response.get('status_code', 200) != 200:
+                continue
+            replies[record['custom_id']] = response['body']['choices'][0]['message']['content']
+        except (json.JSONDecodeError, KeyError, IndexError, TypeError):
+            continue
+    return replies
+
+
+def _file_text(content) -> str:
+    text = getattr(content, 'text', content)
+    if callable(text):
+        text = text()
+    if isinstance(text, bytes):
+        text = text.decode('utf-8')
+    return text or ''
+
+
+def run_openai_batch(client, requests: Dict[str, Dict[str, Any]], poll_interval_s: float = 30.0,
+                     timeout_s: float = 86400.0) -> Dict[str, str]:
+    """Submit chat completion requests as one Batch API job and wait for the replies.
+
+    Returns reply text by custom_id. Raises BatchJobError if the job ends
+    in any state but 'completed' or is still running after `timeout_s`
+    (the job is cancelled then).
+    """
+    upload = io.BytesIO(batch_request_lines(requests))
+    upload.name = 'extraction_batch.jsonl'
+    input_file = client.files.create(file=upload, purpose='batch')
+    batch = client.batches.create(input_file_id=input_file.id, endpoint='/v1/chat/completions',
+                                  completion_window=BATCH_COMPLETION_WINDOW)
+    print(f"Submitted extraction batch {batch.id} with {len(requests)} requests")
+
+    deadline = time.monotonic() + timeout_s
+    while batch.status not in _BATCH_TERMINAL:
+        if time.monotonic() >= deadline:
+            try:
+                client.batches.cancel(batch.id)
+            except Exception as e:
+                print(f"Could not cancel extraction batch {batch.id}: {e}")
+            raise BatchJobError(f"Batch {batch.id} still {batch.status} after {timeout_s:.0f}s")
+        time.sleep(poll_interval_s)
+        batch = client.batches.retrieve(batch.id)
+
+    if batch.status != 'completed':
+        raise BatchJobError(f"Batch {batch.id} ended as {batch.status}")
+    if not batch.output_file_id:
+        return {}
+    return parse_batch_output(_file_text(client.files.content(batch.output_file_id)))
@@ -0,0 +1,77 @@
+"""
+Content-addressed transcript chunks for incremental re-analysis.
+
+A transcript is cut into chunks at sentence boundaries chosen by the
+content itself (a boundary follows a sentence whose hash hits a fixed
+residue once the chunk is long enough), so an edit only changes the
+chunk it lands in and, at most, the next one; every other chunk keeps
+its text and therefore its hash. Per-chunk summaries and extracted items
+are stored with the meeting under those hashes and reused on the next
+analysis, so only chunks whose hash is new go back to the LLM.
+"""
+
+import hashlib
+import zlib
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Optional
+
+from app.extractive_summarizer import split_sentences
+
+# Bump when chunk prompts or the stored chunk format change, so stale entries are ignored
+CHUNK_VERSION = 1
+MIN_CHUNK_CHARS = 2000
+MAX_CHUNK_CHARS = 5000
+# About one sentence in BOUNDARY_MODULUS ends a chunk once it is past MIN_CHUNK_CHARS
+BOUNDARY_MODULUS = 8
+
+
+@dataclass(frozen=True)
+class Chunk:
+    start: int
+    end: int
+    text: str
+    hash: str
+
+
+def chunk_hash(text: str, context: str = '') -> str:
+    """Key for a chunk's cached outputs; `context` covers inputs besides the text (date, attendees)."""
+    return hashlib.sha1(f"{CHUNK_VERSION}\x00{context}\x00{text}".encode('utf-8')).hexdigest()
+
+
+def chunk_transcript(text: str, context: str = '') -> List[Chunk]:
+    """Split `text` into content-defined chunks covering it end to end."""
+    if not text:
+        return []
+    chunks: List[Chunk] = []
+    start = 0
+    for _, end, sentence in split_sentences(text):
+        size = end - start
+        if size < MIN_CHUNK_CHARS:
+            continue
+        if size >= MAX_CHUNK_CHARS or zlib.crc32(sentence.encode('utf-8')) % BOUNDARY_MODULUS == 0:
+            chunks.append(Chunk(start, end, text[start:end], chunk_hash(text[start:end], context)))
+            start = end
+    if start < len(text):
+        if chunks and not text[start:].strip():
+            # Only trailing whitespace left: extend the last chunk rather than add an empty one
+            last = chunks.pop()
+            start = last.start
+        chunks.append(Chunk(start, len(text), text[start:], chunk_hash(text[start:], context)))
+    return chunks
+
+
+def index_cached(entries: Optional[Iterable[Dict[str, Any]]]) -> Dict[str, Dict[str, Any]]:
+    """Stored chunk entries by hash (entries without a hash are ignored)."""
+    return {e['hash']: e for e in entries or () if isinstance(e, dict) and e.get('hash')}
+
+
+def shift_spans(items: List[Dict[str, Any]], offset: int) -> List[Dict[str, Any]]:
+    """Copies of `items` with chunk-relative char_start/char_end moved to transcript offsets."""
+    shifted = []
+    for item in items:
+        item = dict(item)
+        for key in ('char_start', 'char_end'):
+            if isinstance(item.get(key), int):
+                item[key] += offset
+        shifted.append(item)
+    return shifted
@@ -1,6 +1,11 @@
 """
 Configuration management for IMIP application.
 Handles environment variables, auto-discovery, and default settings.
+
+Tool and model locations (FFmpeg, Vosk, the Hugging Face cache) are
+discovered on first access rather than at import, and the result is exported
+to the environment, so worker processes spawned later find it on the fast
+environment-variable path instead of searching the filesystem again.
 """
 
 import os
@@ -9,6 +14,11 @@ from pathlib import Path
 from typing import Optional
 import shutil
 
+from app.env import load_env
+
+# Config() below reads the environment at import
+load_env()
+
 
 class Config:
     """Application configuration with environment variable support and auto-discovery."""
@@ -23,12 +33,8 @@ class Config:
         self.DATA_DIR.mkdir(exist_ok=True)
         self.TMP_DIR.mkdir(exist_ok=True)
         
-        # FFmpeg configuration
-        self.FFMPEG_BIN = self._get_ffmpeg_path()
-        
-        # Model paths
-        self.VOSK_MODEL_PATH = self._get_vosk_model_path()
-        self.HF_HOME = self._get_hf_home()
+        # FFmpeg and model paths (FFMPEG_BIN, VOSK_MODEL_PATH, HF_HOME) are discovered lazily
+        self._discovered = {}
         self.WHISPER_MODEL = os.getenv("WHISPER_MODEL", "small")
         
         # API settings
@@ -88,6 +94,27 @@ class Config:
         self.ROLE_FEATURES = self._setup_role_features()
         self.ROLE_PERMISSIONS = self._setup_role_permissions()
     
+    @property
+    def ffmpeg_bin(self) -> Optional[str]:
+        return self._discover('FFMPEG_BIN', self._get_ffmpeg_path)
+    
+    @property
+    def vosk_model_path(self) -> Optional[str]:
+        return self._discover('VOSK_MODEL_PATH', self._get_vosk_model_path)
+    
+    @property
+    def hf_home(self) -> str:
+        return self._discover('HF_HOME', self._get_hf_home)
+    
+    def _discover(self, name: str, finder) -> Optional[str]:
+        """Run a path lookup once and export what it found as the environment variable `name`."""
+        if name not in self._discovered:
+            value = finder()
+            if value:
+                os.environ[name] = value
+            self._discovered[name] = value
+        return self._discovered[name]
+    
     def _setup_cors_origins(self):
         """Configure CORS origins based on environment."""
         # If explicitly set in env, use that
@@ -289,32 +316,32 @@ class Config:
     
     def setup_environment(self):
         """Set up environment variables based on configuration."""
-        if self.FFMPEG_BIN:
+        if self.ffmpeg_bin:
             # Add FFmpeg to PATH if not already there
-            if self.FFMPEG_BIN not in os.environ.get('PATH', ''):
-                os.environ['PATH'] = self.FFMPEG_BIN + os.pathsep + os.environ.get('PATH', '')
+            if self.ffmpeg_bin not in os.environ.get('PATH', ''):
+                os.environ['PATH'] = self.ffmpeg_bin + os.pathsep + os.environ.get('PATH', '')
         
         # Set HF_HOME
-        os.environ['HF_HOME'] = self.HF_HOME
+        os.environ['HF_HOME'] = self.hf_home
         
         # Set VOSK_MODEL_PATH if found
-        if self.VOSK_MODEL_PATH:
-            os.environ['VOSK_MODEL_PATH'] = self.VOSK_MODEL_PATH
+        if self.vosk_model_path:
+            os.environ['VOSK_MODEL_PATH'] = self.vosk_model_path
     
     def validate(self) -> dict:
         """Validate configuration and return status."""
         status = {
             "ffmpeg": {
-                "found": self.FFMPEG_BIN is not None,
-                "path": self.FFMPEG_BIN
+                "found": self.ffmpeg_bin is not None,
+                "path": self.ffmpeg_bin
             },
             "vosk": {
-                "found": self.VOSK_MODEL_PATH is not None,
-                "path": self.VOSK_MODEL_PATH
+                "found": self.vosk_model_path is not None,
+                "path": self.vosk_model_path
             },
             "hf_cache": {
-                "path": self.HF_HOME,
-                "exists": os.path.exists(self.HF_HOME)
+                "path": self.hf_home,
+                "exists": os.path.exists(self.hf_home)
             },
             "database": {
                 "path": self.DATABASE_PATH,
@@ -327,8 +354,8 @@ class Config:
         }
         
         # Check if ffmpeg is actually executable
-        if self.FFMPEG_BIN:
-            ffmpeg_exe = os.path.join(self.FFMPEG_BIN, "ffmpeg.exe" if sys.platform == "win32" else "ffmpeg")
+        if self.ffmpeg_bin:
+            ffmpeg_exe = os.path.join(self.ffmpeg_bin, "ffmpeg.exe" if sys.platform == "win32" else "ffmpeg")
             status["ffmpeg"]["executable"] = os.path.exists(ffmpeg_exe)
         
         return status
@@ -339,9 +366,9 @@ class Config:
             "BASE_DIR": str(self.BASE_DIR),
             "DATA_DIR": str(self.DATA_DIR),
             "TMP_DIR": str(self.TMP_DIR),
-            "FFMPEG_BIN": self.FFMPEG_BIN,
-            "VOSK_MODEL_PATH": self.VOSK_MODEL_PATH,
-            "HF_HOME": self.HF_HOME,
+            "FFMPEG_BIN": self.ffmpeg_bin,
+            "VOSK_MODEL_PATH": self.vosk_model_path,
+            "HF_HOME": self.hf_home,
             "WHISPER_MODEL": self.WHISPER_MODEL,
             "HOST": self.HOST,
             "PORT": self.PORT,
@@ -0,0 +1,172 @@
+"""
+Corpus-level document frequencies for TF-IDF keyword scoring.
+
+One table per process counts, for every word, how many stored meeting
+transcripts contain it. db_mongo keeps it current as meetings are saved,
+edited and deleted, and rebuilds it from the collection at startup and
+periodically (to pick up writes from other workers and correct drift).
+Keyword extraction then needs a single pass over the new transcript.
+
+A rebuild counts into a Recount a batch at a time, so only the table and
+the current batch of transcripts are in memory, and swaps it in at the end.
+Saves, edits and deletes keep landing on the live table meanwhile. Each
+one that the scan has already passed (its key is at or before the
+Recount's `position`) is also logged on the Recount and replayed onto it
+when it is installed. Writes the scan has not reached yet are picked up
+when it reads them. A write racing the scan's read of that same document
+can still be counted twice or missed until the next refresh.
+"""
+
+import math
+import threading
+from collections import Counter
+from typing import Any, Iterable, List, Optional, Set, Tuple
+
+from app.document import AnalyzedDocument
+
+# Below this many documents corpus IDF is too noisy; callers fall back
+MIN_DOCUMENTS = 3
+
+
+def document_terms(text: Optional[str]) -> Set[str]:
+    """Distinct lowercase words of a transcript."""
+    if not text:
+        return set()
+    return set(AnalyzedDocument(text).words)
+
+
+class Recount:
+    """Document frequencies being recounted; fed a batch at a time, then installed.
+
+    The scan must read documents in key order and set `position` to the key
+    of each one as it reads it.
+    """
+
+    def __init__(self):
+        self.df: Counter = Counter()
+        self.documents = 0
+        self.position: Any = None
+        # (+1 | -1, terms) for writes behind the scan, replayed by CorpusIdf.install
+        self.deltas: List[Tuple[int, Set[str]]] = []
+
+    def passed(self, key: Any) -> bool:
+        """Whether the scan has already read the document with `key` (unknown keys count as read)."""
+        return key is None or (self.position is not None and key <= self.position)
+
+    def add(self, texts: Iterable[Optional[str]]):
+        for text in texts:
+            if text is None:
+                continue
+            self.df.update(document_terms(text))
+            self.documents += 1
+
+    def _apply(self, sign: int, terms: Set[str]):
+        if sign > 0:
+            self.df.update(terms)
+        else:
+            self.df.subtract(terms)
+            for term in terms:
+                if self.df[term] <= 0:
+                    del self.df[term]
+        self.documents = max(0, self.documents + sign)
+
+
+class CorpusIdf:
+    """Thread-safe document-frequency table."""
+
+    def __init__(self):
+        self._df: Counter = Counter()
+        self._documents = 0
+        self._recounts: List[Recount] = []
+        self._lock = threading.Lock()
+
+    def __getstate__(self):
+        # Picklable (minus the lock) so a snapshot can be shipped to worker processes
+        with self._lock:
+            return {'df': Counter(self._df), 'documents': self._documents}
+
+    def __setstate__(self, state):
+        self._df = state['df']
+        self._documents = state['documents']
+        self._recounts = []
+        self._lock = threading.Lock()
+
+    @property
+    def documents(self) -> int:
+        return self._documents
+
+    @property
+    def ready(self) -> bool:
+        return self._documents >= MIN_DOCUMENTS
+
+    def add(self, text: Optional[str], key: Any = None):
+        """Count a new transcript; `key` places its document in a running recount's scan order."""
+        if text is None:
+            return
+        terms = document_terms(text)
+        with self._lock:
+            self._df.update(terms)
+            self._documents += 1
+            self._log(1, terms, key)
+
+    def remove(self, text: Optional[str], key: Any = None):
+        if text is None:
+            return
+        terms = document_terms(text)
+        with self._lock:
+            self._df.subtract(terms)
+            for term in terms:
+                if self._df[term] <= 0:
+                    del self._df[term]
+            self._documents = max(0, self._documents - 1)
+            self._log(-1, terms, key)
+
+    def replace(self, old: Optional[str], new: Optional[str], key: Any = None):
+        """Account for a transcript edit."""
+        self.remove(old, key)
+        self.add(new, key)
+
+    def _log(self, sign: int, terms: Set[str], key: Any):
+        for recount in self._recounts:
+            if recount.passed(key):
+                recount.deltas.append((sign, terms))
+
+    def begin_recount(self) -> Recount:
+        """A Recount that logs the writes behind its scan until it is installed or abandoned."""
+        recount = Recount()
+        with self._lock:
+            self._recounts.append(recount)
+        return recount
+
+    def abandon(self, recount: Recount):
+        with self._lock:
+            if recount in self._recounts:
+                self._recounts.remove(recount)
+
+    def rebuild(self, texts: Iterable[Optional[str]]):
+        """Recount from scratch, then swap the new table in."""
+        recount = self.begin_recount()
+        recount.add(texts)
+        self.install(recount)
+
+    def install(self, recount: Recount):
+        """Swap in a finished recount, after replaying the writes made behind its scan."""
+        with self._lock:
+            if recount in self._recounts:
+                self._recounts.remove(recount)
+            for sign, terms in recount.deltas:
+                recount._apply(sign, terms)
+            recount.deltas = []
+            self._df = recount.df
+            self._documents = recount.documents
+
+    def document_frequency(self, term: str) -> int:
+        return self._df.get(term, 0)
+
+    def idf(self, term: str) -> float:
+        """Smoothed IDF, log((1 + N) / (1 + df)) + 1, so unseen terms score highest."""
+        return math.log((1 + self._documents) / (1 + self._df.get(term, 0))) + 1.0
+
+
+# Shared by db_mongo (writers) and NLPAnalyzer (reader)
+corpus_idf = CorpusIdf()
@@ -1,18 +1,32 @@
 """MongoDB database models and operations using Beanie ODM."""
+import asyncio
 import os
 from datetime import datetime, timezone
 from typing import Optional, List
-from beanie import Document, Indexed, init_beanie
+from beanie import Document, Indexed, PydanticObjectId, init_beanie
 from motor.motor_asyncio import AsyncIOMotorClient
-from pydantic import Field, EmailStr
+from pydantic import BaseModel, Field, EmailStr
 import json
 
+from app import executors
+from app.corpus_idf import corpus_idf
+from app.env import load_env
+from app.speaker_index import build_speaker_index, search_turns
+
+load_env()
+
 # MongoDB configuration
 MONGODB_URL = os.getenv('MONGODB_URL', 'mongodb://localhost:27017')
 DATABASE_NAME = os.getenv('DATABASE_NAME', 'imip')
 
+# Seconds between full rebuilds of the corpus IDF table
+CORPUS_IDF_REFRESH_S = float(os.getenv('CORPUS_IDF_REFRESH_S', '3600'))
+# Transcripts held in memory at a time while the table is rebuilt
+CORPUS_IDF_BATCH = int(os.getenv('CORPUS_IDF_BATCH', '200'))
+
 # Global motor client
 motor_client: Optional[AsyncIOMotorClient] = None
+_corpus_idf_task: Optional[asyncio.Task] = None
 
 
 # ============= Beanie Document Models =============
@@ -57,6 +71,15 @@ class Meeting(Document):
     decisions: List[dict] = Field(default_factory=list)
     key_topics: List[dict] = Field(default_factory=list)
     meta: Optional[str] = None
+    # Per-chunk analysis outputs keyed by content hash (see app.chunk_analysis)
+    analysis_chunks: List[dict] = Field(default_factory=list)
+    # Fingerprint (app.analysis_memo) of the transcript and options the stored analysis was made for
+    analysis_fingerprint: Optional[str] = None
+    # Background enrichment state (app.enrichment): pending, running, done or failed
+    analysis_status: str = Field(default='done')
+    analysis_error: Optional[str] = None
+    # Speaker turns parsed at save time (app.speaker_index); None for meetings saved before it existed
+    speaker_index: Optional[dict] = None
 
     class Settings:
         name = "meetings"
@@ -65,6 +88,8 @@ class Meeting(Document):
             "created_at",
             [("user_id", 1), ("created_at", -1)],  # Compound index for efficient user queries
             [("title", "text"), ("transcript", "text"), ("summary", "text")],  # Text index for search
+            "analysis_status",
+            "speaker_index.keys",
         ]
 
     class Config:
@@ -161,6 +186,10 @@ async def init_db():
         )
         
         print(f"Connected to MongoDB: {MONGODB_URL}/{DATABASE_NAME}")
+
+        # Built in the background: keyword scoring falls back until the table is ready
+        global _corpus_idf_task
+        _corpus_idf_task = asyncio.create_task(_refresh_corpus_idf_periodically())
         return True
     except Exception as e:
         print(f"Failed to connect to MongoDB: {e}")
@@ -169,12 +198,58 @@ async def init_db():
 
 async def close_db():
     """Close MongoDB connection."""
-    global motor_client
+    global motor_client, _corpus_idf_task
+    if _corpus_idf_task:
+        _corpus_idf_task.cancel()
+        _corpus_idf_task = None
     if motor_client:
         motor_client.close()
         print("Closed MongoDB connection")
 
 
+class _TranscriptView(BaseModel):
+    id: Optional[PydanticObjectId] = Field(None, alias='_id')
+    transcript: Optional[str] = None
+
+
+class _SpeakerIndexView(BaseModel):
+    user_id: Optional[str] = None
+    speaker_index: Optional[dict] = None
+
+
+async def refresh_corpus_idf():
+    """Rebuild the corpus IDF table from every stored transcript, streamed in batches.
+
+    The scan runs in _id order so saves, edits and deletes made meanwhile can be
+    replayed onto the new table if the scan has already passed them.
+    """
+    recount = corpus_idf.begin_recount()
+    try:
+        batch: List[Optional[str]] = []
+        async for m in Meeting.find_all(projection_model=_TranscriptView,
+                                         batch_size=CORPUS_IDF_BATCH).sort(+Meeting.id):
+            recount.position = m.id
+            batch.append(m.transcript)
+            if len(batch) >= CORPUS_IDF_BATCH:
+                await executors.run_required('cpu', recount.add, batch)
+                batch = []
+        if batch:
+            await executors.run_required('cpu', recount.add, batch)
+        corpus_idf.install(recount)
+    except Exception as e:
+        print(f"Failed to refresh corpus IDF: {e}")
+    finally:
+        corpus_idf.abandon(recount)
+
+
+async def _refresh_corpus_idf_periodically():
+    while True:
+        await refresh_corpus_idf()
+        if CORPUS_IDF_REFRESH_S <= 0:
+            return
+        await asyncio.sleep(CORPUS_IDF_REFRESH_S)
+
+
 # ============= Meeting CRUD Operations =============
 
 async def save_meeting(
@@ -186,9 +261,21 @@ async def save_meeting(
     decisions: list = None,
     key_topics: list = None,
     meta: str = None,
-    user_id: str = None
+    user_id: str = None,
+    analysis_fingerprint: str = None,
+    analysis_status: str = 'done',
+    segments: list = None,
+    analysis_chunks: list = None,
+    required: bool = False
 ) -> str:
-    """Create a new meeting. Returns meeting ID."""
+    """Create a new meeting. Returns meeting ID.
+
+    `segments` are the ASR segments the transcript came from, if any; they
+    give the speaker index its turn times. `required` builds the index even
+    when the cpu pool is saturated (saves from already-admitted jobs).
+    """
+    run = executors.run_required if required else executors.run
+    speaker_index = await run('cpu', build_speaker_index, transcript, segments) if transcript else None
     meeting = Meeting(
         user_id=user_id,
         title=title,
@@ -198,18 +285,25 @@ async def save_meeting(
         action_items=action_items or [],
         decisions=decisions or [],
         key_topics=key_topics or [],
-        meta=meta or ''
+        meta=meta or '',
+        analysis_fingerprint=analysis_fingerprint,
+        analysis_status=analysis_status,
+        speaker_index=speaker_index,
+        analysis_chunks=analysis_chunks or []
     )
     await meeting.insert()
+    await executors.run_required('cpu', corpus_idf.add, meeting.transcript, meeting.id)
     return str(meeting.id)
 
 
-async def list_meetings(limit: int = 50, offset: int = 0, user_id: str = None) -> List[Meeting]:
-    """List meetings with pagination. Optionally filter by user_id."""
+async def list_meetings(limit: int = 50, offset: int = 0, user_id: str = None, speaker: str = None) -> List[Meeting]:
+    """List meetings with pagination. Optionally filter by user_id and by a speaker who took part."""
     query = Meeting.find()
     
     if user_id is not None:
         query = query.find(Meeting.user_id == user_id)
+    if speaker:
+        query = query.find({'speaker_index.keys': speaker.lower()})
     
     meetings = await query.sort(-Meeting.created_at).skip(offset).limit(limit).to_list()
     return meetings
@@ -230,9 +324,16 @@ async def update_meeting(
     summary: str = None,
     keywords: list = None,
     action_items: list = None,
-    meta: str = None
+    meta: str = None,
+    decisions: list = None,
+    key_topics: list = None,
+    analysis_chunks: list = None,
+    analysis_fingerprint: str = None
 ) -> bool:
-    """Update a meeting's fields. Returns True if successful."""
+    """Update a meeting's fields. Returns True if successful.
+
+    A new transcript without a new analysis_fingerprint clears the stored one.
+    """
     meeting = await get_meeting(meeting_id)
     if not meeting:
         return False
@@ -242,6 +343,11 @@ async def update_meeting(
         update_data['title'] = title
     if transcript is not None:
         update_data['transcript'] = transcript
+        if transcript != meeting.transcript:
+            update_data['analysis_fingerprint'] = analysis_fingerprint
+            update_data['speaker_index'] = await executors.run('cpu', build_speaker_index, transcript)
+    if analysis_fingerprint is not None:
+        update_data['analysis_fingerprint'] = analysis_fingerprint
     if summary is not None:
         update_data['summary'] = summary
     if keywords is not None:
@@ -250,13 +356,37 @@ async def update_meeting(
         update_data['action_items'] = action_items
     if meta is not None:
         update_data['meta'] = meta
+    if decisions is not None:
+        update_data['decisions'] = decisions
+    if key_topics is not None:
+        update_data['key_topics'] = key_topics
+    if analysis_chunks is not None:
+        update_data['analysis_chunks'] = analysis_chunks
     
     if update_data:
+        old_transcript = meeting.transcript
         await meeting.set(update_data)
+        if transcript is not None:
+            await executors.run_required('cpu', corpus_idf.replace, old_transcript, transcript, meeting.id)
     
     return True
 
 
+async def set_analysis_status(meeting_id: str, status: str, error: str = None) -> bool:
+    """Record a meeting's background enrichment status. Returns True if successful."""
+    meeting = await get_meeting(meeting_id)
+    if not meeting:
+        return False
+    await meeting.set({'analysis_status': status, 'analysis_error': error})
+    return True
+
+
+async def list_meetings_by_analysis_status(statuses: List[str], limit: int = 1000) -> List[Meeting]:
+    """Meetings whose enrichment is in one of `statuses` (oldest first)."""
+    query = Meeting.find({'analysis_status': {'$in': statuses}})
+    return await query.sort(+Meeting.created_at).limit(limit).to_list()
+
+
 async def delete_meeting(meeting_id: str) -> bool:
     """Delete a meeting. Returns True if successful."""
     meeting = await get_meeting(meeting_id)
@@ -264,15 +394,35 @@ async def delete_meeting(meeting_id: str) -> bool:
         return False
     
     await meeting.delete()
+    await executors.run_required('cpu', corpus_idf.remove, meeting.transcript, meeting.id)
     return True
 
 
-async def count_meetings(user_id: str = None) -> int:
-    """Count total number of meetings. Optionally filter by user_id."""
+async def get_speaker_index(meeting_id: str) -> Optional[_SpeakerIndexView]:
+    """A meeting's owner and speaker index, without loading the transcript.
+
+    Meetings saved before the index existed get theirs built and stored on first use.
+    """
+    try:
+        view = await Meeting.find_one({'_id': PydanticObjectId(meeting_id)}).project(_SpeakerIndexView)
+    except Exception:
+        return None
+    if view is not None and view.speaker_index is None:
+        meeting = await get_meeting(meeting_id)
+        if meeting is not None:
+            view.speaker_index = await executors.run('cpu', build_speaker_index, meeting.transcript or '')
+            await meeting.set({'speaker_index': view.speaker_index})
+    return view
+
+
+async def count_meetings(user_id: str = None, speaker: str = None) -> int:
+    """Count total number of meetings. Optionally filter by user_id and speaker."""
     query = Meeting.find()
     
     if user_id is not None:
         query = query.find(Meeting.user_id == user_id)
+    if speaker:
+        query = query.find({'speaker_index.keys': speaker.lower()})
     
     return await query.count()
 
@@ -298,6 +448,31 @@ async def search_meetings(
     return meetings
 
 
+async def search_speaker_turns(
+    query: str,
+    speaker: str,
+    limit: int = 10,
+    offset: int = 0,
+    user_id: str = None
+) -> List[tuple]:
+    """(meeting, matching turns) for meetings where `speaker` said every word of `query`.
+
+    The text index and the speaker key narrow the candidates in MongoDB; only
+    that speaker's turns of each candidate are then checked. Pagination is
+    over candidates, so a page may hold fewer than `limit` results.
+    """
+    search_query = Meeting.find({'$text': {'$search': query}, 'speaker_index.keys': speaker.lower()})
+    if user_id is not None:
+        search_query = search_query.find(Meeting.user_id == user_id)
+    meetings = await search_query.skip(offset).limit(limit).to_list()
+    results = []
+    for meeting in meetings:
+        hits = search_turns(meeting.transcript or '', meeting.speaker_index, speaker, query)
+        if hits:
+            results.append((meeting, hits))
+    return results
+
+
 # ============= User CRUD Operations =============
 
 async def create_user(
@@ -418,7 +593,8 @@ def meeting_to_dict(meeting: Meeting) -> dict:
         'action_items': meeting.action_items,
         'decisions': meeting.decisions,
         'key_topics': meeting.key_topics,
-        'meta': meeting.meta
+        'meta': meeting.meta,
+        'analysis_status': meeting.analysis_status
     }
 
 
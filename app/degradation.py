@@ -0,0 +1,208 @@
+"""
+Analysis tiers chosen up front from current load.
+
+Instead of always trying the LLM and falling back after a timeout, each
+analysis picks the richest tier that is expected to finish inside the
+caller's latency budget:
+
+    llm          LLM summary and LLM extraction (run side by side)
+    llm_summary  LLM summary, rule-based extraction
+    extractive   TextRank summary, rule-based extraction
+    rule_based   keyword-heuristic summary, rule-based extraction
+
+The estimate for the LLM tiers is the slower of the router's p90 for the
+healthiest target and the recently observed latency of that stage, plus
+the limiter's queue wait when the target is saturated. LLM tiers are also
+skipped while the executors' llm pool has no room for their calls; choose()
+reserves that room for the tier it picks, and end_llm() gives it back as
+each call finishes. Local tiers
+are costed per character from observed run times. rule_based is the
+floor and is always available.
+
+Observed LLM stage times drift back toward their defaults as they age
+(half-life ANALYSIS_STAGE_HALF_LIFE_S), and once no LLM stage has been
+timed for ANALYSIS_LLM_PROBE_S an analysis that would otherwise skip the
+LLM for latency goes out at llm_summary as a probe. One slow spell
+therefore can't pin every later analysis to the local tiers, where
+nothing would ever measure the provider again.
+"""
+
+import os
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, Optional, Sequence, Tuple
+
+from app import executors
+
+FULL_LLM = 'llm'
+LLM_SUMMARY = 'llm_summary'
+EXTRACTIVE = 'extractive'
+RULE_BASED = 'rule_based'
+TIERS = (FULL_LLM, LLM_SUMMARY, EXTRACTIVE, RULE_BASED)
+
+Target = Tuple[str, str]
+
+# Starting points until a stage has been observed
+_DEFAULT_STAGE_S = {'summary': 6.0, 'extraction': 12.0}
+_DEFAULT_S_PER_CHAR = {'textrank': 1e-6, 'heuristic': 5e-7, 'rules': 1e-6}
+
+
+@dataclass
+class TierDecision:
+    tier: str
+    reason: str
+    budget_s: float
+    estimates: Dict[str, Optional[float]] = field(default_factory=dict)
+    target: Optional[Target] = None
+    llm_calls: int = 0  # reserved by choose(); release each with end_llm()
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'tier': self.tier,
+            'reason': self.reason,
+            'budget_s': round(self.budget_s, 3),
+            'estimates_s': {k: (round(v, 3) if v is not None else None) for k, v in self.estimates.items()},
+            'target': f"{self.target[0]}/{self.target[1]}" if self.target else None,
+        }
+
+
+class TierSelector:
+    """Picks an analysis tier; thread-safe. Stage timings feed back in through record()."""
+
+    def __init__(self, router, capacity: int = None, default_budget_s: float = None, alpha: float = 0.2,
+                 half_life_s: float = None, probe_after_s: float = None):
+        self.router = router
+        # LLM calls the llm pool admits at once; see NLPAnalyzer.analyze_within_budget
+        self.capacity = capacity or executors.pool('llm').limit
+        self.default_budget_s = default_budget_s or float(os.getenv('ANALYSIS_LATENCY_BUDGET_S', '30'))
+        self.alpha = alpha
+        self.half_life_s = half_life_s or float(os.getenv('ANALYSIS_STAGE_HALF_LIFE_S', '300'))
+        self.probe_after_s = probe_after_s or float(os.getenv('ANALYSIS_LLM_PROBE_S', '60'))
+        # stage -> (EWMA seconds, when it was last fed)
+        self._stage_s: Dict[str, Tuple[float, float]] = {}
+        # Last LLM stage timed or probe sent; the selector starts out fresh
+        self._llm_seen_at = time.monotonic()
+        self._s_per_char = dict(_DEFAULT_S_PER_CHAR)
+        self._pending = 0
+        self._lock = threading.Lock()
+        self.counts = {tier: 0 for tier in TIERS}
+
+    # ----- feedback -----
+
+    def record(self, stage: str, seconds: float, chars: int = 0):
+        """Fold one observed run of `stage` (summary | extraction | textrank | heuristic | rules) into its EWMA."""
+        with self._lock:
+            if stage in self._s_per_char:
+                if chars <= 0:
+                    return
+                old = self._s_per_char[stage]
+                self._s_per_char[stage] = (1 - self.alpha) * old + self.alpha * seconds / chars
+                return
+            now = time.monotonic()
+            old = self._observed(stage, now)
+            self._stage_s[stage] = (seconds if old is None else (1 - self.alpha) * old + self.alpha * seconds, now)
+            self._llm_seen_at = now
+
+    def _observed(self, stage: str, now: float) -> Optional[float]:
+        """The stage's EWMA, decayed toward its default by age; None before the first sample. Caller holds the lock."""
+        entry = self._stage_s.get(stage)
+        if entry is None:
+            return None
+        value, updated = entry
+        default = _DEFAULT_STAGE_S.get(stage, value)
+        return default + (value - default) * 0.5 ** (max(0.0, now - updated) / self.half_life_s)
+
+    def begin_llm(self, calls: int):
+        with self._lock:
+            self._pending += calls
+
+    def end_llm(self):
+        with self._lock:
+            self._pending = max(0, self._pending - 1)
+
+    @property
+    def pending(self) -> int:
+        with self._lock:
+            return self._pending
+
+    # ----- estimates -----
+
+    def local_estimate(self, stage: str, chars: int) -> float:
+        with self._lock:
+            return self._s_per_char[stage] * chars
+
+    def _llm_s(self, stage: str, targets: Sequence[Target]) -> Tuple[Optional[float], Optional[Target]]:
+        ranked = self.router.rank(targets)
+        if not ranked:
+            return None, None
+        target = ranked[0]
+        p90 = self.router.health(target).latency_percentile(90)
+        with self._lock:
+            observed = self._observed(stage, time.monotonic())
+        if observed is None:
+            observed = _DEFAULT_STAGE_S[stage]
+        estimate = max(p90 or 0.0, observed)
+        limits = self.router.limiter.snapshot().get(f"{target[0]}/{target[1]}")
+        if limits and limits['in_flight'] >= int(limits['concurrency_limit']):
+            estimate += self.router.limiter.queue_s
+        return estimate, target
+
+    def choose(self, chars: int, targets: Sequence[Target], budget_s: float = None,
+               textrank: bool = True) -> TierDecision:
+        budget = self.default_budget_s if budget_s is None else budget_s
+        rules = self.local_estimate('rules', chars)
+        estimates: Dict[str, Optional[float]] = {
+            EXTRACTIVE: self.local_estimate('textrank', chars) + rules if textrank else None,
+            RULE_BASED: self.local_estimate('heuristic', chars) + rules,
+        }
+        summary_s, target = self._llm_s('summary', targets) if targets else (None, None)
+        extraction_s, _ = self._llm_s('extraction', targets) if targets else (None, None)
+        if summary_s is not None:
+            estimates[FULL_LLM] = max(summary_s, extraction_s)
+            estimates[LLM_SUMMARY] = max(summary_s, rules)
+
+        tier, reason, calls = None, 'within_budget', 0
+        # Checking for room and reserving it is one step, so a burst can't overshoot the capacity
+        with self._lock:
+            for candidate, calls in ((FULL_LLM, 2), (LLM_SUMMARY, 1)):
+                if not targets:
+                    reason = 'no_llm_configured'
+                elif summary_s is None:
+                    reason = 'no_healthy_provider'
+                elif self._pending + calls > self.capacity:
+                    reason = 'queue_depth'
+                elif estimates[candidate] > budget:
+                    reason = 'provider_latency'
+                else:
+                    tier = candidate
+                    break
+            if tier is None and reason == 'provider_latency' and self._pending + 1 <= self.capacity \
+                    and self._probe_due(time.monotonic()):
+                # Estimates only move when a call is timed; send one through now and then
+                tier, reason, calls = LLM_SUMMARY, 'probe', 1
+            if tier is None:
+                extractive = estimates[EXTRACTIVE]
+                tier, calls = (EXTRACTIVE if extractive is not None and extractive <= budget else RULE_BASED), 0
+            self._pending += calls
+            self.counts[tier] += 1
+        # reason says why a richer tier was passed over ('within_budget' when none was)
+        return TierDecision(tier, reason if tier != FULL_LLM else 'within_budget', budget, estimates,
+                            target if calls else None, calls)
+
+    def _probe_due(self, now: float) -> bool:
+        """Whether a probe may go out now, claiming it if so. Caller holds the lock."""
+        if now - self._llm_seen_at < self.probe_after_s:
+            return False
+        self._llm_seen_at = now
+        return True
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            now = time.monotonic()
+            return {
+                'tiers': dict(self.counts),
+                'pending_llm_calls': self._pending,
+                'capacity': self.capacity,
+                'stage_s': {k: round(self._observed(k, now), 3) for k in self._stage_s},
+            }
@@ -0,0 +1,178 @@
+"""
+Pre-tokenized transcript shared by every NLP pass.
+
+An AnalyzedDocument is built once per request (NLPAnalyzer.analyze() also
+caches the most recent ones) so summarization, rule-based extraction,
+evidence validation and keyword scoring reuse the same sentence offsets,
+lowercase view and tokens instead of each re-splitting a multi-megabyte
+transcript. Every view is computed lazily on first use.
+
+Evidence quotes from LLM extraction are located through a token-position
+index (token -> ordinal positions), so each lookup only inspects the
+occurrences of the quote's rarest word instead of rescanning the
+transcript with a freshly compiled regex.
+"""
+
+import re
+from dataclasses import dataclass
+from functools import cached_property
+from typing import Dict, List, Optional, Tuple
+
+from app.extractive_summarizer import split_sentences
+
+_SENTENCE_RE = re.compile(r'[^.!?]+')
+_WORD_RE = re.compile(r'\b[a-z]+\b')
+_TOKEN_RE = re.compile(r'\w+')
+# Characters allowed between the words of a loosely matched evidence quote (besides whitespace)
+_EVIDENCE_GAP_CHARS = frozenset(".,;:!?-–—'\"/\\()[]")
+_EVIDENCE_GAP_RE = r"[\s\.,;:!\?\-–—'\"/\\()\[\]]+"
+# "Sarah (Infrastructure): text" or "John: text" at the start of a line
+_SPEAKER_RE = re.compile(r"^[ \t]*([A-Z][\w.'\- ]{0,40}?)(?:[ \t]*\(([^)\n]{1,40})\))?:[ \t]+(.*)$", re.MULTILINE)
+
+
+@dataclass(frozen=True)
+class Sentence:
+    text: str  # stripped
+    start: int
+    end: int
+
+
+@dataclass(frozen=True)
+class SpeakerTurn:
+    speaker: str
+    role: Optional[str]
+    text: str
+    start: int  # offset of the utterance text, after "Name (Role): "
+    end: int
+
+
+class AnalyzedDocument:
+    """A transcript plus its reusable analysis views."""
+
+    def __init__(self, text: str):
+        self.text = text or ''
+
+    def __len__(self) -> int:
+        return len(self.text)
+
+    @cached_property
+    def lower(self) -> str:
+        return self.text.lower()
+
+    @cached_property
+    def _lower_aligned(self) -> bool:
+        # A few characters change length when lowercased (e.g. 'İ'); offsets then don't carry over
+        return len(self.lower) == len(self.text)
+
+    @cached_property
+    def sentences(self) -> List[Sentence]:
+        """Non-empty pieces between runs of . ! ? (same boundaries as re.split(r'[.!?]+'))."""
+        out = []
+        for m in _SENTENCE_RE.finditer(self.text):
+            raw = m.group()
+            stripped = raw.strip()
+            if stripped:
+                start = m.start() + (len(raw) - len(raw.lstrip()))
+                out.append(Sentence(stripped, start, start + len(stripped)))
+        return out
+
+    @cached_property
+    def segments(self) -> List[Sentence]:
+        """Sentences that also break at newlines, for line-oriented transcripts."""
+        return [Sentence(s, a, b) for a, b, s in split_sentences(self.text)]
+
+    @cached_property
+    def words(self) -> List[str]:
+        """Lowercase alphabetic tokens in document order."""
+        return _WORD_RE.findall(self.lower)
+
+    @cached_property
+    def speaker_turns(self) -> List[SpeakerTurn]:
+        turns = []
+        for m in _SPEAKER_RE.finditer(self.text):
+            turns.append(SpeakerTurn(m.group(1).strip(), m.group(2), m.group(3), m.start(3), m.end(3)))
+        return turns
+
+    @cached_property
+    def _token_index(self) -> Tuple[List[Tuple[int, int]], Dict[str, List[int]]]:
+        """(span of every word token in `lower`, lowercase token -> ordinals where it occurs)."""
+        spans: List[Tuple[int, int]] = []
+        positions: Dict[str, List[int]] = {}
+        for m in _TOKEN_RE.finditer(self.lower):
+            positions.setdefault(m.group(), []).append(len(spans))
+            spans.append(m.span())
+        return spans, positions
+
+    def find_evidence(self, quote: str, min_tokens: int = 2, max_tokens: int = 25) -> Optional[Tuple[int, int]]:
+        """Return the (start, end) of `quote` in the transcript, or None.
+
+        Case-insensitive exact match first; otherwise the quote's words in order
+        with only whitespace/punctuation between them. Same results as a
+        str.find followed by a flexible regex search, via the token index.
+        """
+        if not quote:
+            return None
+        quote = quote.strip()
+        if not self._lower_aligned:
+            return _scan_evidence(self.text, self.lower, quote, min_tokens, max_tokens)
+        idx = self._find_exact(quote.lower())
+        if idx >= 0:
+            return idx, idx + len(quote)
+        words = [t.lower() for t in _TOKEN_RE.findall(quote)]
+        if len(words) < min_tokens or len(words) > max_tokens:
+            return None
+        return self._find_words(words)
+
+    def _find_exact(self, needle: str) -> int:
+        # Tokens strictly inside the needle are whole tokens wherever the needle occurs
+        inner = [m for m in _TOKEN_RE.finditer(needle) if m.start() > 0 and m.end() < len(needle)]
+        if not inner:
+            return self.lower.find(needle)
+        spans, positions = self._token_index
+        anchor = min(inner, key=lambda m: len(positions.get(m.group(), ())))
+        for i in positions.get(anchor.group(), ()):
+            start = spans[i][0] - anchor.start()
+            if start >= 0 and self.lower.startswith(needle, start):
+                return start
+        return -1
+
+    def _find_words(self, words: List[str]) -> Optional[Tuple[int, int]]:
+        spans, positions = self._token_index
+        n = len(words)
+        # Walk the occurrences of the rarest word; candidates come out in transcript order
+        anchor = min(range(n), key=lambda j: len(positions.get(words[j], ())))
+        for i in positions.get(words[anchor], ()):
+            first = i - anchor
+            if first < 0 or first + n > len(spans):
+                continue
+            if all(self._token_at(first + j) == words[j] for j in range(n)) and \
+                    all(_is_evidence_gap(self.text[spans[k][1]:spans[k + 1][0]]) for k in range(first, first + n - 1)):
+                return spans[first][0], spans[first + n - 1][1]
+        return None
+
+    def _token_at(self, ordinal: int) -> str:
+        start, end = self._token_index[0][ordinal]
+        return self.lower[start:end]
+
+    def lower_of(self, sentence: Sentence) -> str:
+        """Lowercase text of `sentence` without lowercasing it again."""
+        if self._lower_aligned:
+            return self.lower[sentence.start:sentence.end]
+        return sentence.text.lower()
+
+
+def _is_evidence_gap(gap: str) -> bool:
+    return all(c.isspace() or c in _EVIDENCE_GAP_CHARS for c in gap)
+
+
+def _scan_evidence(text: str, lower: str, quote: str, min_tokens: int, max_tokens: int) -> Optional[Tuple[int, int]]:
+    """find_evidence() without the index, for text whose lowercase form has different offsets."""
+    idx = lower.find(quote.lower())
+    if idx >= 0:
+        return idx, idx + len(quote)
+    words = _TOKEN_RE.findall(quote)
+    if len(words) < min_tokens or len(words) > max_tokens:
+        return None
+    pattern = _EVIDENCE_GAP_RE.join(r'\b' + re.escape(w) + r'\b' for w in words)
+    m = re.search(pattern, text, re.IGNORECASE)
+    return m.span() if m else None
@@ -0,0 +1,185 @@
+"""
+Background enrichment of saved meetings.
+
+/save persists a meeting right away with analysis_status 'pending' and
+queues an EnrichmentJob. A small pool of asyncio workers then computes
+keywords (and, when the client sent none, action items, decisions and
+topics) off the event loop and patches the document. Failed attempts are
+retried with exponential backoff; after the last attempt the meeting is
+marked 'failed' with the error. Meetings still pending when the process
+stopped are re-queued at startup.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import random
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, List, Optional
+
+from app import db_mongo as db
+from app import executors
+from app.analysis_memo import analysis_fingerprint, stored_options
+
+_logger = logging.getLogger("imip.enrichment")
+
+PENDING = 'pending'
+RUNNING = 'running'
+DONE = 'done'
+FAILED = 'failed'
+
+
+@dataclass
+class EnrichmentJob:
+    meeting_id: str
+    meeting_date: Optional[str] = None
+    attendees: Optional[List[str]] = None
+    extract_items: bool = True  # False when the client already supplied action items
+    attempts: int = 0
+    errors: List[str] = field(default_factory=list)
+
+
+class EnrichmentWorker:
+    """Runs `process(job)` for queued jobs, retrying failures with exponential backoff."""
+
+    def __init__(self, process: Callable[[EnrichmentJob], Awaitable[None]],
+                 on_failure: Callable[[EnrichmentJob], Awaitable[None]] = None,
+                 workers: int = None, max_attempts: int = None, backoff_s: float = None,
+                 max_backoff_s: float = 300.0):
+        self.process = process
+        self.on_failure = on_failure
+        self.workers = workers or int(os.getenv('ENRICHMENT_WORKERS', '2'))
+        self.max_attempts = max_attempts or int(os.getenv('ENRICHMENT_MAX_ATTEMPTS', '5'))
+        self.backoff_s = backoff_s if backoff_s is not None else float(os.getenv('ENRICHMENT_BACKOFF_S', '2'))
+        self.max_backoff_s = max_backoff_s
+        self._queue: Optional[asyncio.Queue] = None
+        self._tasks: List[asyncio.Task] = []
+        self._retries: set = set()
+
+    def start(self):
+        if self._tasks:
+            return
+        self._queue = asyncio.Queue()
+        self._tasks = [asyncio.create_task(self._run()) for _ in range(self.workers)]
+
+    async def stop(self):
+        for task in self._tasks + list(self._retries):
+            task.cancel()
+        await asyncio.gather(*self._tasks, *self._retries, return_exceptions=True)
+        self._tasks = []
+        self._retries.clear()
+
+    def submit(self, job: EnrichmentJob):
+        if self._queue is None:
+            raise RuntimeError("EnrichmentWorker is not started")
+        self._queue.put_nowait(job)
+
+    async def join(self):
+        """Wait until every queued job (including scheduled retries) has finished."""
+        while True:
+            await self._queue.join()
+            if not self._retries:
+                return
+            await asyncio.gather(*self._retries, return_exceptions=True)
+
+    def _delay(self, attempts: int) -> float:
+        # Full jitter keeps retries of a burst of saves from landing together
+        return random.uniform(0, min(self.max_backoff_s, self.backoff_s * (2 ** (attempts - 1))))
+
+    async def _retry_later(self, job: EnrichmentJob):
+        await asyncio.sleep(self._delay(job.attempts))
+        self._queue.put_nowait(job)
+
+    async def _run(self):
+        while True:
+            job = await self._queue.get()
+            try:
+                job.attempts += 1
+                await self.process(job)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                job.errors.append(str(e))
+                if job.attempts < self.max_attempts:
+                    _logger.warning(f"Enrichment of {job.meeting_id} failed (attempt {job.attempts}): {e}; retrying")
+                    task = asyncio.create_task(self._retry_later(job))
+                    self._retries.add(task)
+                    task.add_done_callback(self._retries.discard)
+                else:
+                    _logger.error(f"Enrichment of {job.meeting_id} failed after {job.attempts} attempts: {e}")
+                    if self.on_failure is not None:
+                        try:
+                            await self.on_failure(job)
+                        except Exception as e2:
+                            _logger.error(f"Could not mark {job.meeting_id} as failed: {e2}")
+            finally:
+                self._queue.task_done()
+
+
+async def enrich_meeting(job: EnrichmentJob, nlp) -> None:
+    """Compute the missing analysis for a saved meeting and patch it in place."""
+    meeting = await db.get_meeting(job.meeting_id)
+    if meeting is None:
+        return
+    transcript = meeting.transcript or ''
+    await db.set_analysis_status(job.meeting_id, RUNNING)
+
+    def analyze():
+        doc = nlp.analyze(transcript)
+        result = {'keywords': nlp.extract_keywords(doc)}
+        if job.extract_items:
+            # Extraction runs per chunk anyway, so its entries are kept for the meeting's first edit.
+            # Meetings saved with their items get their chunk entries from that edit instead.
+            result['extraction'], result['chunks'] = nlp.analyze_chunks(
+                doc, meeting_date=job.meeting_date, attendees=job.attendees)
+        return result
+
+    # Already throttled by the worker count, so it waits for the io pool rather than failing the attempt
+    result = await executors.run_required('io', analyze)
+
+    # The transcript was edited meanwhile: analyze the new text instead
+    current = await db.get_meeting(job.meeting_id)
+    if current is None:
+        return
+    if (current.transcript or '') != transcript:
+        raise RuntimeError("transcript changed during enrichment")
+
+    meta = {}
+    if current.meta:
+        try:
+            meta = json.loads(current.meta)
+        except json.JSONDecodeError:
+            meta = {}
+    fields = {'keywords': result['keywords']}
+    if job.extract_items:
+        extraction = result['extraction']
+        fields['analysis_chunks'] = result['chunks']
+        fields['action_items'] = extraction.get('action_items', [])
+        fields['decisions'] = extraction.get('decisions', [])
+        fields['key_topics'] = extraction.get('key_topics', [])
+        meta['decisions'] = fields['decisions']
+        meta['key_topics'] = fields['key_topics']
+        meta['extraction_metadata'] = dict(extraction.get('metadata', {}), method='auto_extracted')
+    fields['meta'] = json.dumps(meta)
+    fields['analysis_fingerprint'] = analysis_fingerprint(transcript, job.meeting_date, job.attendees)
+    await db.update_meeting(job.meeting_id, **fields)
+    await db.set_analysis_status(job.meeting_id, DONE)
+
+
+async def mark_failed(job: EnrichmentJob) -> None:
+    await db.set_analysis_status(job.meeting_id, FAILED, error=job.errors[-1] if job.errors else None)
+
+
+async def requeue_unfinished(worker: EnrichmentWorker) -> int:
+    """Queue meetings left pending or running by a previous process. Returns how many."""
+    meetings = await db.list_meetings_by_analysis_status([PENDING, RUNNING])
+    for meeting in meetings:
+        options = stored_options(meeting.meta)
+        worker.submit(EnrichmentJob(
+            meeting_id=str(meeting.id),
+            meeting_date=options.get('meeting_date'),
+            attendees=options.get('attendees'),
+            extract_items=options.get('extract_items', not meeting.action_items),
+        ))
+    return len(meetings)
@@ -0,0 +1,35 @@
+"""
+.env loading shared by every module that needs it.
+
+find_dotenv() walks up the directory tree and load_dotenv() re-parses the
+file, so both used to run on import of each module that wanted the
+environment. Here the file is located once and loaded once per process;
+later calls are free.
+"""
+
+from functools import lru_cache
+from typing import Optional
+
+from dotenv import dotenv_values, find_dotenv, load_dotenv
+
+_loaded = False
+
+
+@lru_cache(maxsize=1)
+def dotenv_path() -> str:
+    """Path of the project's .env file ('' when there is none)."""
+    return find_dotenv()
+
+
+def load_env():
+    """Load .env into os.environ (overriding existing values), once per process."""
+    global _loaded
+    if not _loaded:
+        load_dotenv(dotenv_path(), override=True)
+        _loaded = True
+
+
+def dotenv_value(key: str) -> Optional[str]:
+    """Current value of `key` in the .env file, re-read from disk (e.g. after a key rotation)."""
+    path = dotenv_path()
+    return (dotenv_values(path) or {}).get(key) if path else None
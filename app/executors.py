@@ -0,0 +1,215 @@
+"""
+Bounded executors for blocking work done on behalf of async handlers.
+
+Anything that blocks (bcrypt, NLP passes, LLM calls, FFmpeg conversion,
+ASR, PDF parsing, file clean-up retries) runs in one of a few named pools
+instead of on the event loop, so health checks and cheap requests keep
+being answered while heavy ones are in flight:
+
+    cpu      threads, one per core   bcrypt, tokenizing, keywords, indexes, media conversion
+    io       threads, many           LLM-backed analysis, file reads and clean-up
+    llm      threads, no queue       LLM stages of tiered analysis (app.degradation)
+    asr      threads, one            speech-to-text (one model, memory-bound)
+    process  processes               pure-Python document parsing that holds the GIL
+
+Each pool admits at most workers + queue tasks; past that `run()` raises
+ExecutorSaturated (served as 503 with Retry-After) instead of letting work
+pile up behind a busy pool. Clean-up that must happen regardless is
+submitted with `run_required()`, which is never refused. Sizes come from
+EXEC_<NAME>_WORKERS and EXEC_<NAME>_QUEUE; EXEC_PROCESS_WORKERS=0 runs
+process work on the cpu threads instead (platforms without process
+support, debugging).
+
+`stats()` reports, per pool, what is running and queued, the high-water
+mark, refusals and how long tasks waited for a worker; /status shows it
+next to the event-loop lag measured by `watch_loop()`.
+"""
+
+import asyncio
+import contextvars
+import os
+import threading
+import time
+from concurrent.futures import Executor, Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+# name: (kind, default workers, default queue)
+_POOLS = {
+    'cpu': ('thread', os.cpu_count() or 2, 64),
+    'io': ('thread', 32, 256),
+    'asr': ('thread', 1, 8),
+    'llm': ('thread', 8, 0),
+    'process': ('process', min(4, os.cpu_count() or 2), 32),
+}
+
+
+class ExecutorSaturated(Exception):
+    """A pool already has as many tasks running and queued as it admits."""
+    def __init__(self, pool: str, limit: int):
+        super().__init__(f"{pool} pool is saturated ({limit} tasks running or queued)")
+        self.pool = pool
+        self.limit = limit
+
+
+class BoundedPool:
+    """An executor that admits at most `workers + queue` outstanding tasks and keeps counters."""
+
+    def __init__(self, name: str, workers: int, queue: int, kind: str = 'thread'):
+        self.name = name
+        self.kind = kind
+        self.workers = max(1, workers)
+        self.limit = self.workers + max(0, queue)
+        self._executor: Optional[Executor] = None
+        self._lock = threading.Lock()
+        self._outstanding = 0
+        self._running = 0
+        self.counters = {'submitted': 0, 'completed': 0, 'failed': 0, 'rejected': 0, 'max_outstanding': 0}
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+        self._waited = 0
+
+    def _pool(self) -> Executor:
+        # Created on first use: most processes never need every pool
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    if self.kind == 'process':
+                        # Imports multiprocessing; only paid once a document needs parsing
+                        from concurrent.futures import ProcessPoolExecutor
+                        self._executor = ProcessPoolExecutor(max_workers=self.workers)
+                    else:
+                        self._executor = ThreadPoolExecutor(max_workers=self.workers,
+                                                            thread_name_prefix=f'exec-{self.name}')
+        return self._executor
+
+    def submit(self, fn: Callable, *args, **kwargs) -> Future:
+        """Schedule fn(*args, **kwargs); raises ExecutorSaturated when the pool is full."""
+        return self._submit(fn, args, kwargs, required=False)
+
+    def submit_required(self, fn: Callable, *args, **kwargs) -> Future:
+        """Like submit(), but never refused (clean-up that has to run)."""
+        return self._submit(fn, args, kwargs, required=True)
+
+    def _submit(self, fn: Callable, args: tuple, kwargs: dict, required: bool) -> Future:
+        with self._lock:
+            if not required and self._outstanding >= self.limit:
+                self.counters['rejected'] += 1
+                raise ExecutorSaturated(self.name, self.limit)
+            self._outstanding += 1
+            self.counters['submitted'] += 1
+            self.counters['max_outstanding'] = max(self.counters['max_outstanding'], self._outstanding)
+        try:
+            if self.kind == 'process':
+                # Arguments are pickled to the worker; nothing to time inside it
+                future = self._pool().submit(fn, *args, **kwargs)
+            else:
+                future = self._pool().submit(self._call, time.monotonic(), contextvars.copy_context(),
+                                             fn, args, kwargs)
+        except BaseException:
+            with self._lock:
+                self._outstanding -= 1
+            raise
+        future.add_done_callback(self._done)
+        return future
+
+    def _call(self, queued_at: float, context: contextvars.Context, fn: Callable, args: tuple, kwargs: dict):
+        waited = time.monotonic() - queued_at
+        with self._lock:
+            self._running += 1
+            self._waited += 1
+            self._wait_total += waited
+            self._wait_max = max(self._wait_max, waited)
+        try:
+            return context.run(fn, *args, **kwargs)
+        finally:
+            with self._lock:
+                self._running -= 1
+
+    def _done(self, future: Future):
+        with self._lock:
+            self._outstanding -= 1
+            failed = future.cancelled() or future.exception() is not None
+            self.counters['failed' if failed else 'completed'] += 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            outstanding = self._outstanding
+            # Process workers can't report back when they start, so infer it from the worker count
+            running = self._running if self.kind == 'thread' else min(outstanding, self.workers)
+            stats = {
+                'kind': self.kind,
+                'workers': self.workers,
+                'limit': self.limit,
+                'running': running,
+                'queued': max(0, outstanding - running),
+                'saturated': outstanding >= self.limit,
+                **self.counters,
+            }
+            if self.kind == 'thread':
+                stats['wait_ms'] = {
+                    'avg': round(self._wait_total / self._waited * 1000, 2) if self._waited else 0.0,
+                    'max': round(self._wait_max * 1000, 2),
+                }
+            return stats
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+_registry: Dict[str, BoundedPool] = {}
+_registry_lock = threading.RLock()
+_loop_lag = {'last_ms': 0.0, 'max_ms': 0.0}
+
+
+def pool(name: str) -> BoundedPool:
+    """The named pool, sized from the environment on first use."""
+    found = _registry.get(name)
+    if found is not None:
+        return found
+    with _registry_lock:
+        if name not in _registry:
+            kind, workers, queue = _POOLS[name]
+            workers = int(os.getenv(f'EXEC_{name.upper()}_WORKERS', str(workers)))
+            queue = int(os.getenv(f'EXEC_{name.upper()}_QUEUE', str(queue)))
+            if kind == 'process' and workers <= 0:
+                _registry[name] = pool('cpu')
+            else:
+                _registry[name] = BoundedPool(name, workers, queue, kind)
+        return _registry[name]
+
+
+async def run(name: str, fn: Callable, *args, **kwargs):
+    """Await fn(*args, **kwargs) on the named pool; raises ExecutorSaturated when it is full."""
+    return await asyncio.wrap_future(pool(name).submit(fn, *args, **kwargs))
+
+
+async def run_required(name: str, fn: Callable, *args, **kwargs):
+    """Await fn(*args, **kwargs) on the named pool, queueing past its limit if need be."""
+    return await asyncio.wrap_future(pool(name).submit_required(fn, *args, **kwargs))
+
+
+async def watch_loop(interval: float = 0.5):
+    """Measure event-loop lag (how late a sleep wakes up) until cancelled."""
+    loop = asyncio.get_running_loop()
+    while True:
+        started = loop.time()
+        await asyncio.sleep(interval)
+        lag_ms = max(0.0, (loop.time() - started - interval) * 1000)
+        _loop_lag['last_ms'] = round(lag_ms, 2)
+        _loop_lag['max_ms'] = round(max(_loop_lag['max_ms'], lag_ms), 2)
+
+
+def stats() -> Dict[str, Any]:
+    """Per-pool counters for the pools in use, plus event-loop lag."""
+    pools = {name: p.stats() for name, p in list(_registry.items()) if p.name == name}
+    return {'pools': pools, 'loop_lag_ms': dict(_loop_lag)}
+
+
+def shutdown():
+    """Stop all pools without waiting; queued tasks are cancelled."""
+    with _registry_lock:
+        for p in set(_registry.values()):
+            p.shutdown()
+        _registry.clear()
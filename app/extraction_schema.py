@@ -0,0 +1,359 @@
+"""
+Structured-output schemas for LLM extraction.
+
+Defines the Pydantic models the providers are constrained to (Gemini
+`response_schema`, OpenAI `json_schema` response format), a local JSON repair
+step for the rare malformed reply, and counters for parse failures and retries.
+"""
+
+import json
+import re
+import time
+from typing import Any, Dict, List, Optional, Tuple, Type
+
+from pydantic import BaseModel, ConfigDict, Field, ValidationError, field_validator
+
+
+class ExtractionParseError(ValueError):
+    """Raised when an LLM reply cannot be parsed even after local repair."""
+
+
+# ============= Schemas =============
+
+class _LenientModel(BaseModel):
+    """Ignore unknown keys and treat explicit nulls as "use the default"."""
+    model_config = ConfigDict(extra='ignore')
+
+    @field_validator('*', mode='before')
+    @classmethod
+    def _null_to_default(cls, value, info):
+        if value is None:
+            field = cls.model_fields[info.field_name]
+            if field.default_factory is not None:
+                return field.default_factory()
+            return field.default
+        return value
+
+
+class GeminiActionItem(_LenientModel):
+    task: str = ''
+    owner: str = ''
+    assignee: str = ''
+    deadline: str = ''
+    priority: str = 'medium'
+    status: str = 'pending'
+
+
+class GeminiDecision(_LenientModel):
+    decision: str = ''
+    context: str = ''
+    impact: str = ''
+
+
+class GeminiTopic(_LenientModel):
+    topic: str = ''
+    summary: str = ''
+    importance: str = 'medium'
+
+
+class GeminiExtraction(_LenientModel):
+    action_items: List[GeminiActionItem] = Field(default_factory=list)
+    decisions: List[GeminiDecision] = Field(default_factory=list)
+    key_topics: List[GeminiTopic] = Field(default_factory=list)
+
+
+class OpenAIActionItem(_LenientModel):
+    text: str = ''
+    owner: Optional[str] = None
+    due_date_iso: Optional[str] = None
+    priority: str = 'P3'
+    confidence: float = 0.7
+    evidence_quote: str = ''
+    char_start: int = 0
+    char_end: int = 0
+    category: str = 'Other'
+    urgency_indicators: List[str] = Field(default_factory=list)
+
+
+class OpenAIDecision(_LenientModel):
+    decision: str = ''
+    rationale: Optional[str] = None
+    decision_maker: Optional[str] = None
+    impact: Optional[str] = None
+    confidence: float = 0.7
+    evidence_quote: str = ''
+    char_start: int = 0
+    char_end: int = 0
+    category: str = 'Other'
+
+
+class OpenAITopic(_LenientModel):
+    topic: str = ''
+    description: Optional[str] = None
+    duration_indicators: List[str] = Field(default_factory=list)
+    importance_level: str = 'Medium'
+    confidence: float = 0.6
+    evidence_quote: str = ''
+    char_start: int = 0
+    char_end: int = 0
+    category: str = 'Other'
+
+
+class OpenAIExtraction(_LenientModel):
+    action_items: List[OpenAIActionItem] = Field(default_factory=list)
+    decisions: List[OpenAIDecision] = Field(default_factory=list)
+    key_topics: List[OpenAITopic] = Field(default_factory=list)
+
+
+class OpenAIBatchDocument(_LenientModel):
+    doc_id: str = ''
+    action_items: List[OpenAIActionItem] = Field(default_factory=list)
+    decisions: List[OpenAIDecision] = Field(default_factory=list)
+    key_topics: List[OpenAITopic] = Field(default_factory=list)
+
+
+class OpenAIBatchExtraction(_LenientModel):
+    """Several meetings extracted in one request, one entry per delimited document."""
+    documents: List[OpenAIBatchDocument] = Field(default_factory=list)
+
+
+# ============= Provider Schema Conversion =============
+
+def _inline_refs(node: Any, defs: Dict[str, Any]) -> Any:
+    if isinstance(node, dict):
+        if '$ref' in node:
+            return _inline_refs(defs[node['$ref'].split('/')[-1]], defs)
+        return {k: _inline_refs(v, defs) for k, v in node.items()}
+    if isinstance(node, list):
+        return [_inline_refs(v, defs) for v in node]
+    return node
+
+
+def _convert(node: Dict[str, Any], dialect: str) -> Dict[str, Any]:
+    # Optional[X] comes out of Pydantic as anyOf [X, null]
+    if 'anyOf' in node:
+        variants = [v for v in node['anyOf'] if v.get('type') != 'null']
+        inner = _convert(variants[0], dialect)
+        if dialect == 'gemini':
+            inner['nullable'] = True
+            return inner
+        return {'anyOf': [inner, {'type': 'null'}]}
+
+    out: Dict[str, Any] = {'type': node.get('type', 'string')}
+    if out['type'] == 'object':
+        props = {name: _convert(sub, dialect) for name, sub in node.get('properties', {}).items()}
+        out['properties'] = props
+        # OpenAI strict mode wants every key listed; Gemini treats `required` as "always emit"
+        out['required'] = list(props)
+        if dialect == 'openai':
+            out['additionalProperties'] = False
+    elif out['type'] == 'array':
+        out['items'] = _convert(node.get('items', {}), dialect)
+    return out
+
+
+def provider_schema(model: Type[BaseModel], dialect: str) -> Dict[str, Any]:
+    """Render a Pydantic model as the schema dialect a provider accepts.
+
+    dialect: 'gemini' (OpenAPI subset, `nullable`) or 'openai' (strict JSON Schema).
+    """
+    schema = model.model_json_schema()
+    schema = _inline_refs(schema, schema.pop('$defs', {}))
+    return _convert(schema, dialect)
+
+
+def openai_response_format(model: Type[BaseModel], name: str = 'meeting_extraction') -> Dict[str, Any]:
+    """`response_format` argument for OpenAI structured outputs."""
+    return {
+        'type': 'json_schema',
+        'json_schema': {'name': name, 'strict': True, 'schema': provider_schema(model, 'openai')},
+    }
+
+
+def gemini_generation_config(model: Type[BaseModel]) -> Dict[str, Any]:
+    """`generation_config` argument for Gemini JSON mode with a response schema."""
+    return {
+        'response_mime_type': 'application/json',
+        'response_schema': provider_schema(model, 'gemini'),
+    }
+
+
+# ============= Parsing, Repair and Stats =============
+
+class ParseStats:
+    """Process-wide counters for structured-output parsing."""
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.parsed = 0
+        self.parse_failures = 0
+        self.repaired = 0
+        self.invalid_items = 0
+        self.retries = 0
+        self.retry_latency_s = 0.0
+
+    def record_retry(self, started_at: float):
+        """Record a failed extraction attempt that began at `started_at` (time.monotonic()).
+
+        The router retries on another target, so the attempt's latency is what the retry cost.
+        """
+        self.retries += 1
+        self.retry_latency_s += time.monotonic() - started_at
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'parsed': self.parsed,
+            'parse_failures': self.parse_failures,
+            'repaired': self.repaired,
+            'invalid_items': self.invalid_items,
+            'retries': self.retries,
+            'retry_latency_s': round(self.retry_latency_s, 3),
+        }
+
+
+parse_stats = ParseStats()
+
+
+def strip_code_fences(raw: str) -> str:
+    s = (raw or '').strip()
+    if s.startswith('```json'):
+        s = s[7:]
+    elif s.startswith('```'):
+        s = s[3:]
+    if s.endswith('```'):
+        s = s[:-3]
+    return s.strip()
+
+
+_DANGLING_KEY_RE = re.compile(r'[,{]\s*"(?:[^"\\]|\\.)*"$')
+
+
+def repair_json(raw: str) -> str:
+    """Best-effort local repair of a malformed JSON object.
+
+    Handles code fences, prose around the object, trailing commas, raw
+    newlines inside strings, and replies truncated mid-object (unterminated
+    strings, dangling keys, unclosed brackets).
+    """
+    s = strip_code_fences(raw)
+    first = s.find('{')
+    if first == -1:
+        return s
+    s = s[first:]
+
+    out: List[str] = []
+    closers: List[str] = []
+    in_str = False
+    escaped = False
+    for ch in s:
+        if in_str:
+            if escaped:
+                escaped = False
+            elif ch == '\\':
+                escaped = True
+            elif ch == '"':
+                in_str = False
+            elif ch == '\n':
+                out.append('\\n')
+                continue
+            out.append(ch)
+            continue
+        if ch == '"':
+            in_str = True
+        elif ch in '{[':
+            closers.append('}' if ch == '{' else ']')
+        elif ch in '}]':
+            if not closers or closers[-1] != ch:
+                continue
+            closers.pop()
+            while out and out[-1] in ' \t\r\n,':
+                out.pop()
+        out.append(ch)
+        if not closers:
+            break
+
+    text = ''.join(out)
+    if closers:
+        # Truncated reply: close the open string, then drop a dangling key or separator
+        if in_str:
+            text += '"'
+        text = text.rstrip()
+        if text.endswith(':'):
+            text += ' null'
+        elif closers[-1] == '}':
+            dangling = _DANGLING_KEY_RE.search(text)
+            if dangling:
+                text = text[:dangling.start() + 1] if text[dangling.start()] == '{' else text[:dangling.start()]
+        text = text.rstrip().rstrip(',')
+        text += ''.join(reversed(closers))
+    return text
+
+
+def _validate(data: Any, schema: Type[BaseModel]) -> Dict[str, Any]:
+    """Validate list fields item-by-item so one bad item doesn't discard the reply."""
+    if not isinstance(data, dict):
+        raise ExtractionParseError(f"Expected a JSON object, got {type(data).__name__}")
+    result: Dict[str, Any] = {}
+    for name, field in schema.model_fields.items():
+        item_model = field.annotation.__args__[0]
+        items = data.get(name) or []
+        valid = []
+        for item in items if isinstance(items, list) else []:
+            try:
+                valid.append(item_model.model_validate(item).model_dump())
+            except ValidationError:
+                parse_stats.invalid_items += 1
+        result[name] = valid
+    return result
+
+
+def _load_json(raw: str) -> Tuple[Any, bool]:
+    s = strip_code_fences(raw)
+    try:
+        return json.loads(s), False
+    except json.JSONDecodeError as e:
+        parse_stats.parse_failures += 1
+        try:
+            data = json.loads(repair_json(s))
+        except json.JSONDecodeError:
+            raise ExtractionParseError(f"Unparseable extraction response: {e}") from e
+        parse_stats.repaired += 1
+        return data, True
+
+
+def parse_extraction(raw: str, schema: Type[BaseModel]) -> Tuple[Dict[str, Any], bool]:
+    """Parse and validate an extraction reply.
+
+    Returns (result, repaired). Falls back to repair_json() once instead of
+    asking the model again; raises ExtractionParseError if that fails too.
+    """
+    data, repaired = _load_json(raw)
+    result = _validate(data, schema)
+    parse_stats.parsed += 1
+    return result, repaired
+
+
+def parse_batch_extraction(raw: str, doc_ids: List[str],
+                           schema: Type[BaseModel] = OpenAIExtraction) -> Tuple[Dict[str, Dict[str, Any]], bool]:
+    """Parse a multi-document reply into per-document results.
+
+    Returns ({doc_id: result}, repaired). Entries for unknown ids are
+    dropped; ids the model skipped are simply absent so the caller can
+    extract those documents on their own. A repeated id keeps its first entry.
+    """
+    data, repaired = _load_json(raw)
+    if not isinstance(data, dict):
+        raise ExtractionParseError(f"Expected a JSON object, got {type(data).__name__}")
+    wanted = set(doc_ids)
+    results: Dict[str, Dict[str, Any]] = {}
+    entries = data.get('documents')
+    for entry in entries if isinstance(entries, list) else []:
+        if not isinstance(entry, dict):
+            continue
+        doc_id = str(entry.get('doc_id') or '').strip()
+        if doc_id in wanted and doc_id not in results:
+            results[doc_id] = _validate(entry, schema)
+    parse_stats.parsed += 1
+    return results, repaired
@@ -0,0 +1,151 @@
+"""
+Offline extractive summarization (TF-IDF + TextRank).
+
+Sentences are embedded as L2-normalised TF-IDF rows in a NumPy matrix, the
+cosine similarity graph is one matrix product, and PageRank runs as a power
+iteration over it. No network and no model download, so latency depends only
+on transcript length. NumPy is imported on the first summary rather than at
+import time, which keeps it off the API's startup path.
+"""
+
+import importlib.util
+import math
+import re
+from functools import lru_cache
+from typing import Iterable, List, Optional, Tuple
+
+np = None  # numpy, once _numpy() has imported it
+
+_SENTENCE_RE = re.compile(r'[^.!?\n]+(?:[.!?]+|$)', re.MULTILINE)
+_TOKEN_RE = re.compile(r"[a-z0-9][a-z0-9'\-]*")
+# Transcript lines often start with "Name (Team):"
+_SPEAKER_PREFIX_RE = re.compile(r"^\s*[A-Z][\w .'\-]{0,40}(?:\([^)]*\))?:\s+")
+
+
+@lru_cache(maxsize=1)
+def available() -> bool:
+    return importlib.util.find_spec('numpy') is not None
+
+
+def _numpy():
+    global np
+    if np is None:
+        import numpy
+        np = numpy
+    return np
+
+
+def split_sentences(text: str) -> List[Tuple[int, int, str]]:
+    """Return (start, end, sentence) for each sentence in `text`."""
+    out = []
+    for m in _SENTENCE_RE.finditer(text):
+        sentence = m.group().strip()
+        if sentence:
+            start = m.start() + (len(m.group()) - len(m.group().lstrip()))
+            out.append((start, start + len(sentence), sentence))
+    return out
+
+
+class TextRankSummarizer:
+    """TF-IDF sentence graph ranked with TextRank (PageRank over cosine similarity)."""
+
+    def __init__(self, stop_words: Iterable[str] = (), damping: float = 0.85, max_vocab: int = 4096,
+                 min_tokens: int = 4, redundancy: float = 0.8):
+        self.stop_words = frozenset(stop_words)
+        self.damping = damping
+        self.max_vocab = max_vocab
+        self.min_tokens = min_tokens
+        self.redundancy = redundancy
+
+    def _tokens(self, sentence: str) -> List[str]:
+        body = _SPEAKER_PREFIX_RE.sub('', sentence, count=1).lower()
+        return [t for t in _TOKEN_RE.findall(body) if t not in self.stop_words and len(t) > 2]
+
+    def _tfidf(self, docs: List[List[str]]) -> 'np.ndarray':
+        np = _numpy()
+        df = {}
+        for doc in docs:
+            for term in set(doc):
+                df[term] = df.get(term, 0) + 1
+        # Keep the most widespread terms; rare ones barely affect similarity
+        vocab_terms = sorted(df, key=lambda t: (-df[t], t))[:self.max_vocab]
+        vocab = {t: i for i, t in enumerate(vocab_terms)}
+        n = len(docs)
+        idf = np.array([math.log((1 + n) / (1 + df[t])) + 1.0 for t in vocab_terms], dtype=np.float32)
+
+        rows, cols = [], []
+        for i, doc in enumerate(docs):
+            for term in doc:
+                j = vocab.get(term)
+                if j is not None:
+                    rows.append(i)
+                    cols.append(j)
+        tf = np.zeros((n, len(vocab_terms)), dtype=np.float32)
+        np.add.at(tf, (np.array(rows, dtype=np.int64), np.array(cols, dtype=np.int64)), 1.0)
+        X = np.log1p(tf) * idf
+        norms = np.linalg.norm(X, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return X / norms
+
+    def rank(self, sentences: List[str]) -> Tuple[Optional['np.ndarray'], Optional['np.ndarray']]:
+        """Return (TextRank score per sentence, TF-IDF matrix), or (None, None) if nothing to rank."""
+        docs = [self._tokens(s) for s in sentences]
+        if not any(docs):
+            return None, None
+        np = _numpy()
+        X = self._tfidf(docs)
+        sim = X @ X.T
+        np.fill_diagonal(sim, 0.0)
+        out_weight = sim.sum(axis=1, keepdims=True)
+        dangling = out_weight[:, 0] == 0
+        out_weight[dangling] = 1.0
+        transition = sim / out_weight
+        n = len(sentences)
+        scores = np.full(n, 1.0 / n, dtype=np.float32)
+        for _ in range(100):
+            # Dangling sentences spread their score uniformly
+            leak = scores[dangling].sum() / n
+            updated = (1 - self.damping) / n + self.damping * (scores @ transition + leak)
+            if np.abs(updated - scores).sum() < 1e-6:
+                scores = updated
+                break
+            scores = updated
+        # Very short sentences ("Action item captured.", "--- Minute 3 ---") carry no content
+        short = np.array([len(d) < self.min_tokens for d in docs])
+        scores[short] = 0.0
+        return scores, X
+
+    def summarize(self, text: str, max_words: int = 500) -> str:
+        """Pick the top-ranked sentences up to `max_words`, in transcript order."""
+        return self.summarize_sentences([s for _, _, s in split_sentences(text or '')], max_words)
+
+    def summarize_sentences(self, sentences: List[str], max_words: int = 500) -> str:
+        """summarize() for text that has already been split into sentences."""
+        if not sentences:
+            return ''
+        if len(sentences) <= 2:
+            return ' '.join(sentences)
+        scores, X = self.rank(sentences)
+        if scores is None or not scores.any():
+            return ' '.join(sentences[:3])
+        np = _numpy()
+
+        chosen: List[int] = []
+        words = 0
+        for idx in np.argsort(-scores, kind='stable'):
+            idx = int(idx)
+            if scores[idx] == 0.0:
+                break
+            n_words = len(sentences[idx].split())
+            if chosen and words + n_words > max_words:
+                continue
+            # Skip near-duplicates of sentences already picked
+            if chosen and float(np.max(X[chosen] @ X[idx])) >= self.redundancy:
+                continue
+            chosen.append(idx)
+            words += n_words
+            if words >= max_words:
+                break
+        # Lines without closing punctuation stay on their own line so they don't run together
+        return ''.join(sentences[i] + (' ' if sentences[i][-1] in '.!?' else '\n')
+                       for i in sorted(chosen)).strip()
@@ -0,0 +1,132 @@
+"""
+Adaptive (AIMD) concurrency and token-rate limits for LLM calls.
+
+Each (provider, model) gets a concurrency limit and a tokens-per-minute
+bucket. Both are cut in half on a 429/quota response and grow additively
+while calls succeed, so we back off before the provider throttles every
+request instead of after. Callers that can't get a slot within a short
+queue wait are told to degrade.
+"""
+
+import os
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, Tuple
+
+Target = Tuple[str, str]  # (provider, model)
+
+
+class RateLimited(RuntimeError):
+    """Raised when a call can't be admitted within the queue wait."""
+
+
+@dataclass
+class TargetLimit:
+    """AIMD state for one target."""
+    limit: float
+    tpm: float
+    min_limit: float = 1.0
+    max_limit: float = 16.0
+    min_tpm: float = 5000.0
+    max_tpm: float = 1000000.0
+    in_flight: int = 0
+    tokens: float = 0.0
+    refilled_at: float = 0.0
+    admitted: int = 0
+    throttled: int = 0
+    backoffs: int = 0
+
+    def refill(self, now: float):
+        self.tokens = min(self.tpm, self.tokens + (now - self.refilled_at) * self.tpm / 60.0)
+        self.refilled_at = now
+
+    def wait_for(self, tokens: int) -> float:
+        """Seconds until this call fits, 0 if it fits now."""
+        if self.in_flight >= int(self.limit):
+            return -1.0  # wait for a release, not the clock
+        # A request bigger than the whole bucket is admitted once the bucket is full
+        need = min(tokens, self.tpm) - self.tokens
+        return max(0.0, need * 60.0 / self.tpm)
+
+    def increase(self):
+        self.limit = min(self.max_limit, self.limit + 1.0 / max(self.limit, 1.0))
+        self.tpm = min(self.max_tpm, self.tpm + self.max_tpm * 0.01)
+
+    def decrease(self):
+        self.limit = max(self.min_limit, self.limit / 2.0)
+        self.tpm = max(self.min_tpm, self.tpm / 2.0)
+        self.tokens = min(self.tokens, self.tpm)
+        self.backoffs += 1
+
+
+class AdaptiveLimiter:
+    """Per-target AIMD limiter shared by all LLM calls in the process."""
+
+    def __init__(self, initial_limit: float = None, max_limit: float = None,
+                 initial_tpm: float = None, max_tpm: float = None, queue_s: float = None):
+        self.initial_limit = initial_limit or float(os.getenv('LLM_CONCURRENCY_INITIAL', '4'))
+        self.max_limit = max_limit or float(os.getenv('LLM_CONCURRENCY_MAX', '16'))
+        self.initial_tpm = initial_tpm or float(os.getenv('LLM_TPM_INITIAL', '200000'))
+        self.max_tpm = max_tpm or float(os.getenv('LLM_TPM_MAX', '1000000'))
+        self.queue_s = queue_s if queue_s is not None else float(os.getenv('LLM_LIMIT_QUEUE_S', '2'))
+        self._limits: Dict[Target, TargetLimit] = {}
+        self._cond = threading.Condition()
+
+    def _get(self, target: Target) -> TargetLimit:
+        lim = self._limits.get(target)
+        if lim is None:
+            lim = TargetLimit(limit=self.initial_limit, tpm=self.initial_tpm, max_limit=self.max_limit,
+                              max_tpm=max(self.max_tpm, self.initial_tpm), tokens=self.initial_tpm,
+                              refilled_at=time.monotonic())
+            self._limits[target] = lim
+        return lim
+
+    def acquire(self, target: Target, tokens: int = 0, timeout: float = None):
+        """Take a concurrency slot and `tokens` from the bucket, queueing up to `timeout` seconds.
+
+        Raises RateLimited if the call can't be admitted in time.
+        """
+        deadline = time.monotonic() + (self.queue_s if timeout is None else timeout)
+        with self._cond:
+            lim = self._get(target)
+            while True:
+                now = time.monotonic()
+                lim.refill(now)
+                wait = lim.wait_for(tokens)
+                if wait == 0.0:
+                    lim.in_flight += 1
+                    lim.tokens -= min(tokens, lim.tpm)
+                    lim.admitted += 1
+                    return
+                remaining = deadline - now
+                if remaining <= 0 or wait > remaining:
+                    lim.throttled += 1
+                    raise RateLimited(f"{target[0]}/{target[1]} over limit "
+                                      f"(in_flight={lim.in_flight}, limit={int(lim.limit)}, tpm={int(lim.tpm)})")
+                self._cond.wait(remaining if wait < 0 else wait)
+
+    def release(self, target: Target, kind: str = None):
+        """Return the slot; `kind` is the classify_error() bucket, or None on success."""
+        with self._cond:
+            lim = self._get(target)
+            lim.in_flight = max(0, lim.in_flight - 1)
+            if kind is None:
+                lim.increase()
+            elif kind == 'quota':
+                lim.decrease()
+            self._cond.notify_all()
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        with self._cond:
+            return {
+                f"{provider}/{model}": {
+                    'concurrency_limit': round(lim.limit, 2),
+                    'in_flight': lim.in_flight,
+                    'tpm_limit': int(lim.tpm),
+                    'admitted': lim.admitted,
+                    'throttled': lim.throttled,
+                    'backoffs': lim.backoffs,
+                }
+                for (provider, model), lim in self._limits.items()
+            }
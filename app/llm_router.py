@@ -0,0 +1,450 @@
+"""
+Health-aware routing across LLM providers.
+
+Tracks rolling latency and error rate per (provider, model), opens a circuit
+breaker on quota errors, 5xx responses or repeated failures, and orders
+candidates so new requests go to the healthiest target first. Each request
+carries a retry budget so an outage costs a dictionary lookup instead of a
+full provider timeout per call.
+
+Optional hedging: when the primary target has not answered within its
+observed p90, the same request is sent to a secondary target and the first
+successful reply wins. Hedges are capped by a per-tenant budget.
+"""
+
+import os
+import re
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from typing import Any, Callable, Deque, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from app.llm_limiter import AdaptiveLimiter, RateLimited
+
+Target = Tuple[str, str]  # (provider, model)
+
+_EMPTY = object()
+
+
+class NoHealthyProviderError(RuntimeError):
+    """Raised when every candidate is unavailable or the retry budget is spent."""
+
+
+class ProvidersThrottledError(NoHealthyProviderError):
+    """Raised when every candidate was skipped by the adaptive limiter."""
+
+
+class BreakerOpen(RuntimeError):
+    """Raised when an attempt reaches a target whose breaker no longer admits it (e.g. a probe is in flight)."""
+
+
+_STATUS_IN_MESSAGE_RE = re.compile(r"\b([45]\d\d)\b")
+
+
+def classify_error(exc: BaseException) -> str:
+    """Bucket a provider exception into quota | server | timeout | auth | client | other."""
+    status = getattr(exc, 'status_code', None) or getattr(exc, 'code', None)
+    if not isinstance(status, int):
+        status = getattr(getattr(exc, 'response', None), 'status_code', None)
+    msg = str(exc).lower()
+    # Status codes quoted in the message count only as whole numbers ("maximum 1500 tokens" is not a 500)
+    codes = set(_STATUS_IN_MESSAGE_RE.findall(msg))
+    if status == 429 or '429' in codes or 'quota' in msg or 'rate limit' in msg or 'resource exhausted' in msg or 'resourceexhausted' in type(exc).__name__.lower():
+        return 'quota'
+    if (isinstance(status, int) and status >= 500) or codes & {'500', '502', '503', '504'} \
+            or 'unavailable' in msg or 'internal error' in msg:
+        return 'server'
+    if 'timeout' in msg or 'timed out' in msg or isinstance(exc, TimeoutError):
+        return 'timeout'
+    if status in (401, 403) or '401' in codes or 'invalid_api_key' in msg or 'permission' in msg:
+        return 'auth'
+    if isinstance(status, int) and 400 <= status < 500:
+        return 'client'
+    return 'other'
+
+
+@dataclass
+class TargetHealth:
+    """Rolling latency/error window and circuit breaker state for one target."""
+    window: int = 50
+    failure_threshold: int = 3
+    open_seconds: float = 30.0
+    max_open_seconds: float = 600.0
+    # latency is None for streamed calls: they count toward the error rate but not the percentiles
+    samples: Deque[Tuple[Optional[float], bool]] = field(default_factory=deque)
+    consecutive_failures: int = 0
+    state: str = 'closed'  # closed | open | half_open
+    opened_at: float = 0.0
+    open_for: float = 0.0
+    probe_started: float = 0.0
+    trips: int = 0
+    last_error: Optional[str] = None
+
+    def record(self, latency: Optional[float], ok: bool):
+        self.samples.append((latency, ok))
+        while len(self.samples) > self.window:
+            self.samples.popleft()
+
+    @property
+    def error_rate(self) -> float:
+        if not self.samples:
+            return 0.0
+        return sum(1 for _, ok in self.samples if not ok) / len(self.samples)
+
+    def latency_percentile(self, pct: float) -> Optional[float]:
+        latencies = sorted(lat for lat, ok in self.samples if ok and lat is not None)
+        if not latencies:
+            return None
+        idx = min(len(latencies) - 1, int(round(pct / 100.0 * (len(latencies) - 1))))
+        return latencies[idx]
+
+    def trip(self, now: float):
+        """Open the breaker; repeated trips back off exponentially."""
+        self.open_for = min(self.max_open_seconds, self.open_seconds * (2 ** self.trips))
+        self.trips += 1
+        self.state = 'open'
+        self.opened_at = now
+
+    def available(self, now: float) -> bool:
+        """Whether an attempt could be admitted now (no state change; see begin())."""
+        if self.state == 'closed':
+            return True
+        if self.state == 'open':
+            return now - self.opened_at >= self.open_for
+        # half_open: a probe is in flight; if it never reports back, allow another
+        return now - self.probe_started >= self.open_for
+
+    def begin(self, now: float) -> bool:
+        """Claim an attempt as it is dispatched; the first one after the cooldown is the half-open probe."""
+        if self.state == 'closed':
+            return True
+        if not self.available(now):
+            return False
+        self.state = 'half_open'
+        self.probe_started = now
+        return True
+
+    def abandon_probe(self):
+        """The probe never reached the provider (throttled locally): reopen so the next attempt can probe."""
+        if self.state == 'half_open':
+            self.state = 'open'
+
+    def score(self) -> float:
+        """Lower is healthier: median latency inflated by the error rate."""
+        p50 = self.latency_percentile(50)
+        base = p50 if p50 is not None else 1.0
+        return base * (1.0 + 4.0 * self.error_rate)
+
+
+@dataclass
+class RetryBudget:
+    """Per-request cap on attempts and wall time across all providers."""
+    max_attempts: int = 3
+    deadline_s: float = 60.0
+    attempts: int = 0
+    started_at: float = field(default_factory=time.monotonic)
+
+    def allow(self) -> bool:
+        return self.attempts < self.max_attempts and (time.monotonic() - self.started_at) < self.deadline_s
+
+    def spend(self):
+        self.attempts += 1
+
+    def refund(self):
+        """Give back an attempt that never reached the provider."""
+        self.attempts = max(0, self.attempts - 1)
+
+
+class HedgeBudget:
+    """Per-tenant token bucket for hedged requests.
+
+    Every request earns `ratio` tokens (capped at `burst`); a hedge spends one,
+    so hedges stay near `ratio` of a tenant's traffic.
+    """
+
+    def __init__(self, ratio: float = 0.1, burst: float = 3.0):
+        self.ratio = ratio
+        self.burst = burst
+        self._tenants: Dict[str, Dict[str, float]] = {}
+        self._lock = threading.Lock()
+
+    def _get(self, tenant: str) -> Dict[str, float]:
+        t = self._tenants.get(tenant)
+        if t is None:
+            t = {'tokens': self.burst, 'requests': 0, 'hedges': 0, 'wins': 0}
+            self._tenants[tenant] = t
+        return t
+
+    def on_request(self, tenant: str):
+        with self._lock:
+            t = self._get(tenant)
+            t['requests'] += 1
+            t['tokens'] = min(self.burst, t['tokens'] + self.ratio)
+
+    def try_hedge(self, tenant: str) -> bool:
+        with self._lock:
+            t = self._get(tenant)
+            if t['tokens'] < 1.0:
+                return False
+            t['tokens'] -= 1.0
+            t['hedges'] += 1
+            return True
+
+    def record_win(self, tenant: str):
+        with self._lock:
+            self._get(tenant)['wins'] += 1
+
+    def stats(self) -> Dict[str, Any]:
+        """Hedge rate (hedges/requests) and win rate (hedge answered first / hedges)."""
+        with self._lock:
+            tenants = {k: dict(v) for k, v in self._tenants.items()}
+        requests = sum(t['requests'] for t in tenants.values())
+        hedges = sum(t['hedges'] for t in tenants.values())
+        wins = sum(t['wins'] for t in tenants.values())
+        return {
+            'requests': requests,
+            'hedges': hedges,
+            'wins': wins,
+            'hedge_rate': round(hedges / requests, 3) if requests else 0.0,
+            'win_rate': round(wins / hedges, 3) if hedges else 0.0,
+            'tenants': {
+                name: {
+                    'requests': t['requests'],
+                    'hedges': t['hedges'],
+                    'wins': t['wins'],
+                    'hedge_rate': round(t['hedges'] / t['requests'], 3) if t['requests'] else 0.0,
+                }
+                for name, t in tenants.items()
+            },
+        }
+
+
+class ProviderRouter:
+    """Orders LLM targets by health and runs calls under a retry budget."""
+
+    def __init__(self, max_attempts: int = None, deadline_s: float = None,
+                 open_seconds: float = None, failure_threshold: int = 3):
+        self.max_attempts = max_attempts or int(os.getenv('LLM_RETRY_BUDGET', '3'))
+        self.deadline_s = deadline_s or float(os.getenv('LLM_REQUEST_DEADLINE_S', '90'))
+        self.open_seconds = open_seconds or float(os.getenv('LLM_BREAKER_OPEN_S', '30'))
+        self.failure_threshold = failure_threshold
+        self.hedge_min_samples = int(os.getenv('LLM_HEDGE_MIN_SAMPLES', '5'))
+        self.hedges = HedgeBudget(ratio=float(os.getenv('LLM_HEDGE_RATIO', '0.1')),
+                                  burst=float(os.getenv('LLM_HEDGE_BURST', '3')))
+        self.limiter = AdaptiveLimiter()
+        self._health: Dict[Target, TargetHealth] = {}
+        self._lock = threading.Lock()
+        self._pool: Optional[ThreadPoolExecutor] = None
+
+    def health(self, target: Target) -> TargetHealth:
+        with self._lock:
+            h = self._health.get(target)
+            if h is None:
+                h = TargetHealth(open_seconds=self.open_seconds, failure_threshold=self.failure_threshold)
+                self._health[target] = h
+            return h
+
+    def budget(self) -> RetryBudget:
+        return RetryBudget(max_attempts=self.max_attempts, deadline_s=self.deadline_s)
+
+    def rank(self, targets: Sequence[Target]) -> List[Target]:
+        """Return the targets whose breakers admit traffic, healthiest first.
+
+        Ties keep the caller's preference order.
+        """
+        now = time.monotonic()
+        ranked = []
+        for order, target in enumerate(dict.fromkeys(targets)):
+            h = self.health(target)
+            with self._lock:
+                if h.available(now):
+                    ranked.append((h.score(), order, target))
+        ranked.sort(key=lambda r: (round(r[0], 1), r[1]))
+        return [t for _, _, t in ranked]
+
+    def record_success(self, target: Target, latency: Optional[float]):
+        h = self.health(target)
+        with self._lock:
+            h.record(latency, True)
+            h.consecutive_failures = 0
+            if h.state != 'closed':
+                h.state = 'closed'
+                h.trips = 0
+
+    def record_failure(self, target: Target, latency: Optional[float], exc: BaseException) -> str:
+        kind = classify_error(exc)
+        h = self.health(target)
+        with self._lock:
+            h.record(latency, False)
+            h.consecutive_failures += 1
+            h.last_error = f"{kind}: {str(exc)[:200]}"
+            if kind in ('quota', 'server', 'auth') or h.state == 'half_open' \
+                    or h.consecutive_failures >= h.failure_threshold:
+                h.trip(time.monotonic())
+        return kind
+
+    def call(self, targets: Sequence[Target], fn: Callable[[str, str], Any],
+             budget: Optional[RetryBudget] = None, tokens: int = 0, stream: bool = False) -> Tuple[Any, Target]:
+        """Try `fn(provider, model)` on targets in health order until one succeeds.
+
+        `tokens` is the estimated prompt size, charged against each target's
+        token-rate limit. Returns (result, target). With `stream`, `fn` returns
+        an iterator: its first item is read inside the attempt (so connection
+        and quota errors still fail over) and the result is an iterator that
+        holds the target's limiter slot until it is exhausted or closed. Raises NoHealthyProviderError
+        when every target is open or failed, or the budget runs out, and
+        ProvidersThrottledError when the limiter turned every target away.
+        """
+        budget = budget or self.budget()
+        last_err: Optional[BaseException] = None
+        throttled_only = True
+        for target in self.rank(targets):
+            if not budget.allow():
+                break
+            budget.spend()
+            try:
+                return self._timed(target, fn, tokens, stream), target
+            except RateLimited as e:
+                budget.refund()
+                print(f"LLM call skipped: {e}")
+                last_err = e
+            except BreakerOpen as e:
+                budget.refund()
+                throttled_only = False
+                last_err = e
+            except Exception as e:
+                throttled_only = False
+                last_err = e
+        if last_err is not None and throttled_only:
+            raise ProvidersThrottledError(f"All LLM providers over limit ({last_err})") from last_err
+        raise NoHealthyProviderError(f"No healthy LLM provider (last error: {last_err})") from last_err
+
+    def _timed(self, target: Target, fn: Callable[[str, str], Any], tokens: int = 0, stream: bool = False) -> Any:
+        """Run one attempt under the limiter and record its outcome, even if the caller has moved on."""
+        h = self.health(target)
+        with self._lock:
+            if not h.begin(time.monotonic()):
+                raise BreakerOpen(f"{target[0]}/{target[1]} breaker is {h.state}")
+        try:
+            self.limiter.acquire(target, tokens)
+        except RateLimited:
+            with self._lock:
+                h.abandon_probe()
+            raise
+        started = time.monotonic()
+        try:
+            result = fn(*target)
+            if stream:
+                result = iter(result)
+                first = next(result, _EMPTY)
+                if first is _EMPTY:
+                    raise RuntimeError(f"Empty {target[0]} stream")
+        except Exception as e:
+            kind = self.record_failure(target, time.monotonic() - started, e)
+            self.limiter.release(target, kind)
+            print(f"LLM call failed on {target[0]}/{target[1]} ({kind}): {e}")
+            raise
+        if stream:
+            return self._drain(target, first, result)
+        self.limiter.release(target)
+        self.record_success(target, time.monotonic() - started)
+        return result
+
+    def _drain(self, target: Target, first: Any, rest: Iterator[Any]) -> Iterator[Any]:
+        """Yield a stream, releasing its limiter slot when it ends.
+
+        Time to first chunk isn't comparable with whole-call latency, so streamed
+        calls count toward the error rate but stay out of the latency window
+        that hedging and tier selection read.
+        """
+        kind = 'closed'  # consumer stopped early: return the slot without growing the limit
+        try:
+            yield first
+            yield from rest
+            kind = None
+        except Exception as e:
+            kind = self.record_failure(target, None, e)
+            raise
+        finally:
+            if kind is None:
+                self.record_success(target, None)
+            self.limiter.release(target, kind)
+
+    def _executor(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._pool is None:
+                self._pool = ThreadPoolExecutor(max_workers=int(os.getenv('LLM_HEDGE_WORKERS', '8')),
+                                                thread_name_prefix='llm-hedge')
+            return self._pool
+
+    def hedged_call(self, targets: Sequence[Target], fn: Callable[[str, str], Any], tenant: str = 'default',
+                    budget: Optional[RetryBudget] = None, tokens: int = 0) -> Tuple[Any, Target]:
+        """Like call(), but hedges the primary with a secondary target after the primary's p90.
+
+        The first successful reply wins; the other attempt is cancelled if it has not
+        started, otherwise its reply is discarded (its latency is still recorded).
+        Falls back to sequential call() on the remaining targets if both fail.
+        """
+        budget = budget or self.budget()
+        self.hedges.on_request(tenant)
+        ranked = self.rank(targets)
+        if len(ranked) < 2:
+            return self.call(ranked, fn, budget, tokens)
+        primary = ranked[0]
+        # Prefer hedging onto a different provider so one outage can't slow both
+        secondary = next((t for t in ranked[1:] if t[0] != primary[0]), ranked[1])
+        h = self.health(primary)
+        delay = h.latency_percentile(90) if len(h.samples) >= self.hedge_min_samples else None
+        if delay is None:
+            return self.call(ranked, fn, budget, tokens)
+
+        pool = self._executor()
+        budget.spend()
+        futures = {pool.submit(self._timed, primary, fn, tokens): primary}
+        done, _ = wait(futures, timeout=delay)
+        hedged = False
+        if not done and budget.allow() and self.hedges.try_hedge(tenant):
+            budget.spend()
+            futures[pool.submit(self._timed, secondary, fn, tokens)] = secondary
+            hedged = True
+
+        pending = set(futures)
+        last_err: Optional[BaseException] = None
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for f in done:
+                try:
+                    result = f.result()
+                except Exception as e:
+                    last_err = e
+                    continue
+                for other in pending:
+                    other.cancel()
+                if hedged and futures[f] == secondary:
+                    self.hedges.record_win(tenant)
+                return result, futures[f]
+
+        remaining = [t for t in ranked if t not in futures.values()]
+        if remaining and budget.allow():
+            return self.call(remaining, fn, budget, tokens)
+        raise NoHealthyProviderError(f"No healthy LLM provider (last error: {last_err})") from last_err
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """Per-target health for /status."""
+        with self._lock:
+            items = list(self._health.items())
+        out = {}
+        for (provider, model), h in items:
+            p50, p90 = h.latency_percentile(50), h.latency_percentile(90)
+            out[f"{provider}/{model}"] = {
+                'state': h.state,
+                'error_rate': round(h.error_rate, 3),
+                'p50_s': round(p50, 3) if p50 is not None else None,
+                'p90_s': round(p90, 3) if p90 is not None else None,
+                'samples': len(h.samples),
+                'trips': h.trips,
+                'last_error': h.last_error,
+            }
+        return out
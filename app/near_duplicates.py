@@ -0,0 +1,145 @@
+"""
+MinHash/LSH candidate generation for near-duplicate text.
+
+Each text becomes a set of byte 3-gram shingles and a MinHash signature;
+signatures are cut into bands and texts that share any band bucket become
+candidate pairs. With 40 bands of 2 rows, pairs whose shingle Jaccard is
+>= ~0.35 (what a difflib ratio of 0.7 typically corresponds to) are found
+with > 99% probability, while unrelated pairs rarely collide. Callers
+verify candidates with their exact similarity measure, so LSH only decides
+which pairs are worth comparing. NumPy is imported when the first index
+is built, not at import time.
+"""
+
+import importlib.util
+from functools import lru_cache
+from typing import Dict, List, Optional
+
+np = None  # numpy, once _numpy() has imported it
+
+SHINGLE = 3
+BANDS = 40
+ROWS = 2
+_SEP = 0  # byte joining texts; '\x00' never appears in transcript text
+
+
+@lru_cache(maxsize=1)
+def available() -> bool:
+    return importlib.util.find_spec('numpy') is not None
+
+
+def _numpy():
+    global np
+    if np is None:
+        import numpy
+        np = numpy
+    return np
+
+
+class NearDuplicateIndex:
+    """Candidate near-duplicates among `texts` (identical texts are always candidates)."""
+
+    def __init__(self, texts: List[str], seed: int = 1):
+        self._members: Dict[str, List[int]] = {}
+        for i, text in enumerate(texts):
+            self._members.setdefault(text, []).append(i)
+        self._unique = list(self._members)
+        self._slot = {text: u for u, text in enumerate(self._unique)}
+        self._texts = texts
+        # None means "no numpy": every pair is a candidate, as before
+        self._neighbours: Optional[List['np.ndarray']] = None
+        if available():
+            self._neighbours = _lsh_neighbours(self._unique, seed)
+
+    def candidates(self, i: int) -> List[int]:
+        """Sorted indices j > i that may be near-duplicates of text i."""
+        if self._neighbours is None:
+            return list(range(i + 1, len(self._texts)))
+        if len(self._unique) == len(self._texts):
+            # All texts distinct: unique slots are the original indices
+            neighbours = self._neighbours[i]
+            return neighbours[neighbours > i].tolist()
+        text = self._texts[i]
+        out = [j for j in self._members[text] if j > i]
+        for u in self._neighbours[self._slot[text]].tolist():
+            out.extend(j for j in self._members[self._unique[u]] if j > i)
+        out.sort()
+        return out
+
+
+def _signatures(texts: List[str], seed: int) -> 'np.ndarray':
+    """MinHash signatures, one row of BANDS * ROWS values per text."""
+    np = _numpy()
+    n = len(texts)
+    encoded = [t.encode('utf-8') for t in texts]
+    buf = np.frombuffer(bytes([_SEP]).join(encoded), dtype=np.uint8).astype(np.uint64)
+    lengths = np.fromiter((len(e) for e in encoded), dtype=np.int64, count=n)
+
+    owner = np.repeat(np.arange(n), lengths + 1)[:len(buf)]
+    if len(buf) >= SHINGLE:
+        # A shingle is valid when all of its bytes belong to the same text
+        keys = (buf[:-2] << np.uint64(16)) | (buf[1:-1] << np.uint64(8)) | buf[2:]
+        sep = buf == _SEP
+        valid = ~(sep[:-2] | sep[1:-1] | sep[2:])
+        keys, key_owner = keys[valid], owner[:-2][valid]
+    else:
+        keys = key_owner = np.empty(0, dtype=np.uint64)
+    counts = np.bincount(key_owner.astype(np.int64), minlength=n)
+    has_keys = counts > 0
+    offsets = np.concatenate(([0], np.cumsum(counts[has_keys])[:-1]))
+
+    # Multiply-shift universal hashing; uint64 arithmetic wraps mod 2**64
+    rng = np.random.default_rng(seed)
+    perms = BANDS * ROWS
+    a = rng.integers(1, 1 << 63, size=perms, dtype=np.uint64) | np.uint64(1)
+    b = rng.integers(0, 1 << 63, size=perms, dtype=np.uint64)
+
+    # Texts without a shingle get a unique signature; callers treat them as short
+    signatures = np.empty((n, perms), dtype=np.uint64)
+    signatures[~has_keys] = (np.uint64(1) << np.uint64(40)) + np.flatnonzero(~has_keys).astype(np.uint64)[:, None]
+    if len(keys):
+        for p in range(perms):
+            hashed = (keys * a[p] + b[p]) >> np.uint64(32)
+            signatures[has_keys, p] = np.minimum.reduceat(hashed, offsets)
+    return signatures
+
+
+def _lsh_neighbours(texts: List[str], seed: int) -> List['np.ndarray']:
+    """For each (distinct) text, the sorted indices of the other texts sharing an LSH bucket."""
+    np = _numpy()
+    n = len(texts)
+    if n < 2:
+        return [np.empty(0, dtype=np.int64) for _ in range(n)]
+
+    signatures = _signatures(texts, seed)
+    # Fold each band's rows into one key, then pair texts with equal keys
+    band_keys = signatures.reshape(n, BANDS, ROWS)
+    band_keys = band_keys[:, :, 0] * np.uint64(0x9E3779B97F4A7C15) + band_keys[:, :, 1]
+    codes = []
+    for band in range(BANDS):
+        order = np.argsort(band_keys[:, band], kind='stable')
+        keys = band_keys[order, band]
+        same = keys[1:] == keys[:-1]
+        # Pair positions p and p + d while they stay in the same run of equal keys
+        d = 1
+        while same.any():
+            lo, hi = order[:-d][same], order[d:][same]
+            codes.append(np.minimum(lo, hi) * n + np.maximum(lo, hi))
+            same = same[:-1] & (keys[d + 1:] == keys[:-d - 1])
+            d += 1
+
+    # Texts too short to shingle meaningfully are compared with everything
+    short = np.flatnonzero(np.fromiter((len(t) < 2 * SHINGLE for t in texts), dtype=bool, count=n))
+    everyone = np.arange(n)
+    for s in short:
+        others = everyone[everyone != s]
+        codes.append(np.minimum(others, s) * n + np.maximum(others, s))
+
+    pairs = np.unique(np.concatenate(codes)) if codes else np.empty(0, dtype=np.int64)
+    lo, hi = pairs // n, pairs % n
+    src = np.concatenate((lo, hi))
+    dst = np.concatenate((hi, lo))
+    order = np.lexsort((dst, src))
+    bounds = np.searchsorted(src[order], np.arange(n + 1))
+    dst = dst[order]
+    return [dst[bounds[u]:bounds[u + 1]] for u in range(n)]
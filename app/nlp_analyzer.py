@@ -1,16 +1,80 @@
-from typing import List, Dict, Any, Optional, Tuple
+from typing import List, Dict, Any, Iterator, Optional, Tuple, Union
 import re
+import threading
+from collections import OrderedDict
 from collections import Counter
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
 import math
 import os
 import json
+import time
 from datetime import datetime, timedelta
-import unicodedata
 import difflib
-from dotenv import load_dotenv, find_dotenv, dotenv_values
+from app import executors
+from app.env import dotenv_value, load_env
+from app.prompt_builder import PromptBuilder, count_tokens, prepare_transcript
+from app.llm_router import NoHealthyProviderError, ProviderRouter, ProvidersThrottledError
+from app.extractive_summarizer import TextRankSummarizer, available as textrank_available, split_sentences
+from app.document import AnalyzedDocument
+from app.attendee_matcher import MentionIndex, attendee_stats, matcher_for, turn_at
+from app.rule_engine import PatternSet
+from app.near_duplicates import NearDuplicateIndex
+from app.corpus_idf import corpus_idf
+from app.rolling_summary import MAX_OPEN_ITEMS, RollingSummary, split_complete
+from app.chunk_analysis import chunk_transcript, index_cached, shift_spans
+from app.analysis_memo import AnalysisMemo
+from app.single_flight import SingleFlight, flight_key
+from app.degradation import EXTRACTIVE, FULL_LLM, LLM_SUMMARY, RULE_BASED, TierSelector
+from app.batch_extraction import (
+    BATCH_MAX_DOC_TOKENS, BATCH_MAX_DOCS, BATCH_MAX_TOKENS, BatchDocument,
+    pack_documents, render_documents, run_openai_batch, supports_batch_api,
+)
+from app.extraction_schema import (
+    ExtractionParseError, GeminiExtraction, OpenAIBatchExtraction, OpenAIExtraction,
+    gemini_generation_config, openai_response_format, parse_batch_extraction, parse_extraction, parse_stats,
+)
 
 # Load environment variables, ensuring .env overrides any existing env vars (fix invalid key precedence)
-load_dotenv(find_dotenv(), override=True)
+load_env()
+
+# Client not created yet (NLPAnalyzer.openai_client / gemini_client)
+_UNSET = object()
+
+# ============= Rule-Based Extraction Patterns =============
+# Compiled once; each PatternSet evaluates its rules in a single scan.
+
+_DECISION_PATTERNS = [
+    r'\b(decided|agreed|concluded|determined|resolved)\s+(?:to|that|on)\s+([^.!?]{10,100})',
+    r'\b(decision|resolution|agreement)[:]*\s*([^.!?]+)',
+    r'\b(we\s+will|let\'s|going\s+to|plan\s+to)\s+([^.!?]{10,100})',
+    r'\b(consensus|unanimous|majority)\s+(?:is|was|to)\s+([^.!?]{10,100})'
+]
+
+_TOPIC_PATTERNS = [
+    r'\b(discuss|talking\s+about|focus\s+on|regarding|concerning)\s+([^.!?]{5,50})',
+    r'\b(topic|subject|issue|matter|question)\s*[:]*\s*([^.!?]+)',
+    r'\b(main\s+point|key\s+issue|important\s+aspect)\s*[:]*\s*([^.!?]+)'
+]
+
+_DEADLINE_PATTERNS = [
+    r'by\s+(Monday|Tuesday|Wednesday|Thursday|Friday|Saturday|Sunday)',
+    r'by\s+(tomorrow|today|next week|next month|end of day|EOD|COB)',
+    r'by\s+(January|February|March|April|May|June|July|August|September|October|November|December)\s+\d+',
+    r'by\s+(\d{1,2}/\d{1,2}(?:/\d{2,4})?)',
+    r'before\s+(Monday|Tuesday|Wednesday|Thursday|Friday|Saturday|Sunday)',
+    r'deadline[:\s]+([\w\s]+?)(?:[,.]|$)',
+    r'due\s+([\w\s]+?)(?:[,.]|$)',
+]
+
+_DECISION_TOPIC_RULES = PatternSet(_DECISION_PATTERNS + _TOPIC_PATTERNS, re.IGNORECASE)
+_DEADLINE_RULES = PatternSet(_DEADLINE_PATTERNS, re.IGNORECASE)
+# Names (capitalized words) before action verbs
+_ASSIGNEE_RE = re.compile(r'\b([A-Z][a-z]+(?:\s+[A-Z][a-z]+)?)\s+(?:will|should|needs to|must|to)\s+')
+_FIRST_PERSON_RE = re.compile(r"\bI(?:'ll|\s+will|\s+need to|\s+am going to|'m going to|\s+can|\s+should)\b")
+_BULLET_PREFIX_RE = re.compile(r'^[-•*\s]+')
+_SEMICOLON_SPLIT_RE = re.compile(r";\s*")
+_OWNER_SPLIT_RE = re.compile(r",?\s+and\s+(?=[A-Z][a-z]+\b)")
+
 
 class NLPAnalyzer:
     """Enhanced NLP analyzer with summarization, action item extraction, and keyword extraction."""
@@ -18,10 +82,41 @@ class NLPAnalyzer:
     def __init__(self, model_name: str = "sshleifer/distilbart-cnn-12-6"):
         self.model_name = model_name
         self.summarizer = None
-        
-        # Initialize AI clients for action item extraction and summarization
-        self.openai_client = None
-        self.gemini_client = None
+        self.prompts = PromptBuilder()
+        # Recently analyzed transcripts, so one request's passes share a single AnalyzedDocument
+        self._docs: "OrderedDict[str, AnalyzedDocument]" = OrderedDict()
+        self._docs_lock = threading.Lock()
+        # Running summaries of live meetings, keyed by meeting id (least recently updated evicted first)
+        self._rolling: "OrderedDict[str, RollingSummary]" = OrderedDict()
+        self._rolling_lock = threading.Lock()
+        self.max_rolling_meetings = int(os.getenv('ROLLING_SUMMARY_MAX_MEETINGS', '256'))
+        self.router = ProviderRouter()
+        # Hedge slow summarize calls onto a second provider (see ProviderRouter.hedged_call)
+        self.hedging = os.getenv('LLM_HEDGING', 'false').lower() in ('1', 'true', 'yes')
+        # 'auto' routes to the LLM providers; 'textrank' serves offline extractive summaries only
+        self.summary_provider = os.getenv('SUMMARY_PROVIDER', 'auto').lower()
+        # Document frequencies across stored meetings, maintained by db_mongo
+        self.corpus_idf = corpus_idf
+        # Identical concurrent summarize/extract calls share one computation
+        self.flights = SingleFlight()
+        # Recent keyword/extraction results by analysis fingerprint, so /save can reuse /summarize's work
+        self.memo = AnalysisMemo(max_entries=int(os.getenv('ANALYSIS_MEMO_MAX_ENTRIES', '128')),
+                                 ttl_s=float(os.getenv('ANALYSIS_MEMO_TTL_S', '3600')))
+        # Multi-meeting extraction for backfills: packing limits, and whether to use the provider batch endpoint
+        self.batch_max_docs = int(os.getenv('EXTRACTION_BATCH_MAX_DOCS', str(BATCH_MAX_DOCS)))
+        self.batch_max_tokens = int(os.getenv('EXTRACTION_BATCH_MAX_TOKENS', str(BATCH_MAX_TOKENS)))
+        self.batch_max_doc_tokens = int(os.getenv('EXTRACTION_BATCH_MAX_DOC_TOKENS', str(BATCH_MAX_DOC_TOKENS)))
+        self.batch_api = os.getenv('EXTRACTION_BATCH_API', 'true').lower() in ('1', 'true', 'yes')
+        self.batch_poll_interval_s = float(os.getenv('EXTRACTION_BATCH_POLL_S', '30'))
+        self.batch_timeout_s = float(os.getenv('EXTRACTION_BATCH_TIMEOUT_S', '86400'))
+        self.batch_concurrency = int(os.getenv('EXTRACTION_BATCH_CONCURRENCY', '4'))
+        # Analysis tier (full LLM down to rule-based) picked per request from load and latency budget
+        self.tiers = TierSelector(self.router)
+        
+        # AI clients for action item extraction and summarization. The SDKs take longer to
+        # import than the rest of the app, so each client is built on first use (see openai_client)
+        self._clients_lock = threading.Lock()
+        self._gemini_models: Dict[str, Any] = {}
         
         # OpenAI configuration
         self.openai_api_key = os.getenv('OPENAI_API_KEY')
@@ -39,37 +134,8 @@ class NLPAnalyzer:
         except Exception:
             pass
         
-        # Initialize OpenAI client if API key is available
-        if self.openai_api_key:
-            try:
-                from openai import OpenAI
-                self.openai_client = OpenAI(api_key=self.openai_api_key)
-                print(f"OpenAI client initialized. Summary model: {self.openai_summary_model}, Action model: {self.openai_action_model}")
-            except ImportError:
-                print("OpenAI library not installed. Falling back to rule-based extraction.")
-            except Exception as e:
-                print(f"Failed to initialize OpenAI client: {e}. Falling back to rule-based extraction.")
-        
-        # Initialize Gemini client if API key is available
-        if self.gemini_api_key:
-            try:
-                import google.generativeai as genai
-                genai.configure(api_key=self.gemini_api_key)
-                self.gemini_client = genai.GenerativeModel(self.gemini_model)
-                print(f"Gemini client initialized. Model: {self.gemini_model}")
-            except ImportError:
-                print("Gemini library not installed. Falling back to rule-based extraction.")
-            except Exception as e:
-                try:
-                    # Fallback to a widely available default model if the configured one fails
-                    import google.generativeai as genai
-                    genai.configure(api_key=self.gemini_api_key)
-                    fallback_model = 'gemini-1.5-flash'
-                    self.gemini_client = genai.GenerativeModel(fallback_model)
-                    self.gemini_model = fallback_model
-                    print(f"Gemini client initialized with fallback model: {fallback_model}")
-                except Exception as e2:
-                    print(f"Failed to initialize Gemini client: {e}. Fallback error: {e2}. Falling back to rule-based extraction.")
+        self._openai_client = _UNSET if self.openai_api_key else None
+        self._gemini_client = _UNSET if self.gemini_api_key else None
         
         # Action item patterns for rule-based extraction
         self.action_patterns = [
@@ -84,6 +150,7 @@ class NLPAnalyzer:
             # Deadline patterns
             r'\b(complete|finish|deliver|submit)\s+(.+?)\s+by\s+([^.!?]+)',
         ]
+        self._action_rules = PatternSet(self.action_patterns, re.IGNORECASE)
         
         # Common stop words for keyword extraction
         self.stop_words = set([
@@ -98,116 +165,242 @@ class NLPAnalyzer:
             'same', 'so', 'than', 'too', 'very', 'just', 'now', 'also', 'about',
             'okay', 'ok', 'yeah', 'yes', 'no', 'um', 'uh', 'like', 'well'
         ])
+        self.textrank = TextRankSummarizer(stop_words=self.stop_words)
 
     def _load_summarizer(self):
         # Local LLM summarizer removed; using OpenAI only.
         return
 
-    def summarize(self, text: str, max_length: int = 500, min_length: int = 100) -> str:
+    @property
+    def openai_client(self):
+        """OpenAI client, created on first use when OPENAI_API_KEY is set; None when unavailable."""
+        if self._openai_client is _UNSET:
+            with self._clients_lock:
+                if self._openai_client is _UNSET:
+                    self._openai_client = self._create_openai_client()
+        return self._openai_client
+
+    @openai_client.setter
+    def openai_client(self, client):
+        self._openai_client = client
+
+    @property
+    def gemini_client(self):
+        """Gemini client for gemini_model, created on first use when GEMINI_API_KEY is set."""
+        if self._gemini_client is _UNSET:
+            with self._clients_lock:
+                if self._gemini_client is _UNSET:
+                    self._gemini_client = self._create_gemini_client()
+        return self._gemini_client
+
+    @gemini_client.setter
+    def gemini_client(self, client):
+        self._gemini_client = client
+
+    def _create_openai_client(self):
+        try:
+            from openai import OpenAI
+            client = OpenAI(api_key=self.openai_api_key)
+            print(f"OpenAI client initialized. Summary model: {self.openai_summary_model}, Action model: {self.openai_action_model}")
+            return client
+        except ImportError:
+            print("OpenAI library not installed. Falling back to rule-based extraction.")
+        except Exception as e:
+            print(f"Failed to initialize OpenAI client: {e}. Falling back to rule-based extraction.")
+        return None
+
+    def _create_gemini_client(self):
+        try:
+            import google.generativeai as genai
+            genai.configure(api_key=self.gemini_api_key)
+            client = genai.GenerativeModel(self.gemini_model)
+            print(f"Gemini client initialized. Model: {self.gemini_model}")
+            return client
+        except ImportError:
+            print("Gemini library not installed. Falling back to rule-based extraction.")
+        except Exception as e:
+            try:
+                # Fallback to a widely available default model if the configured one fails
+                import google.generativeai as genai
+                genai.configure(api_key=self.gemini_api_key)
+                fallback_model = 'gemini-1.5-flash'
+                client = genai.GenerativeModel(fallback_model)
+                self.gemini_model = fallback_model
+                print(f"Gemini client initialized with fallback model: {fallback_model}")
+                return client
+            except Exception as e2:
+                print(f"Failed to initialize Gemini client: {e}. Fallback error: {e2}. Falling back to rule-based extraction.")
+        return None
+
+    def analyze(self, text: Union[str, AnalyzedDocument]) -> AnalyzedDocument:
+        """Return the AnalyzedDocument for `text`, reusing one built for the same transcript recently.
+
+        All public methods accept either a string or the document returned here.
+        """
+        if isinstance(text, AnalyzedDocument):
+            return text
+        text = text or ''
+        with self._docs_lock:
+            doc = self._docs.get(text)
+            if doc is not None:
+                self._docs.move_to_end(text)
+                return doc
+        doc = AnalyzedDocument(text)
+        with self._docs_lock:
+            self._docs[text] = doc
+            while len(self._docs) > 4:
+                self._docs.popitem(last=False)
+        return doc
+
+    def _gemini_model_client(self, model: str = None):
+        """Return a Gemini client for `model`, built once per model name."""
+        model = model or self.gemini_model
+        if model == self.gemini_model and self.gemini_client is not None:
+            return self.gemini_client
+        client = self._gemini_models.get(model)
+        if client is None:
+            import google.generativeai as genai
+            genai.configure(api_key=self.gemini_api_key)
+            client = genai.GenerativeModel(model)
+            self._gemini_models[model] = client
+        return client
+
+    def _llm_targets(self, openai_model: str, prefer: str = 'gemini', gemini_model: str = None) -> List[Tuple[str, str]]:
+        """Candidate (provider, model) pairs in preference order, limited to configured clients."""
+        gemini = []
+        if self.gemini_client is not None:
+            gemini = [('gemini', gemini_model or self.gemini_model), ('gemini', 'gemini-1.5-flash')]
+        openai = [('openai', openai_model)] if self.openai_client is not None else []
+        targets = openai + gemini if prefer == 'openai' else gemini + openai
+        return list(dict.fromkeys(targets))
+
+    def _summarize_with(self, provider: str, model: str, text: str, max_words: int) -> str:
+        if provider == 'gemini':
+            return self._summarize_gemini(text, max_words=max_words, model=model)
+        return self._summarize_openai(text, max_words=max_words, model=model)
+
+    def _route_summary(self, targets: List[Tuple[str, str]], text: str, max_length: int, tenant: str = None):
+        def fn(provider: str, model: str) -> str:
+            return self._summarize_with(provider, model, text, max_length)
+        tokens = count_tokens(text)
+        if self.hedging:
+            return self.router.hedged_call(targets, fn, tenant=tenant or 'default', tokens=tokens)
+        return self.router.call(targets, fn, tokens=tokens)
+
+    @staticmethod
+    def _degraded_reason(exc: NoHealthyProviderError) -> str:
+        return 'rate_limited' if isinstance(exc, ProvidersThrottledError) else 'providers_unavailable'
+
+    def summarize(self, text: Union[str, AnalyzedDocument], max_length: int = 500, min_length: int = 100,
+                  tenant: str = None, provider: str = None) -> str:
         """Generate a summary of the text using available AI services."""
+        return self.summarize_with_info(text, max_length, tenant=tenant, provider=provider)[0]
+
+    def _use_textrank(self, provider: str = None) -> bool:
+        return (provider or self.summary_provider) == 'textrank' and textrank_available()
+
+    def summarize_with_info(self, text: Union[str, AnalyzedDocument], max_length: int = 500, tenant: str = None,
+                            provider: str = None) -> Tuple[str, Dict[str, Any]]:
+        """Like summarize(), but also return {'method', 'model', 'degraded_reason'}.
+
+        provider: 'textrank' for a zero-network extractive summary, otherwise
+        SUMMARY_PROVIDER decides. Concurrent identical calls share one computation.
+        """
+        doc = self.analyze(text)
+        key = flight_key('summary', doc.text, max_length, provider or self.summary_provider)
+        return self.flights.do(key, lambda: self._summarize_with_info(doc, max_length, tenant, provider))
+
+    def _summarize_with_info(self, doc: AnalyzedDocument, max_length: int, tenant: str = None,
+                             provider: str = None) -> Tuple[str, Dict[str, Any]]:
+        text = doc.text
         if not text:
-            return ''
-        
-        # Try Gemini first if available
-        if self.gemini_client:
-            try:
-                print(f"Using Gemini for summarization (max_words: {max_length})")
-                result = self._summarize_gemini(text, max_words=max_length)
-                print(f"Gemini summarization successful, length: {len(result)} characters")
-                return result
-            except Exception as e:
-                print(f"Gemini summarization failed on {self.gemini_model}: {e}. Retrying with gemini-1.5-flash...")
-                try:
-                    # One-shot retry with flash model
-                    import google.generativeai as genai
-                    genai.configure(api_key=self.gemini_api_key)
-                    client = genai.GenerativeModel('gemini-1.5-flash')
-                    prompt = f"Summarize the meeting transcript in {max_length//2}-{max_length} words focusing on key points, decisions, and action items.\n\nTranscript:\n{text}\n\nSummary:"
-                    resp = client.generate_content(prompt)
-                    if resp and resp.text:
-                        return resp.text.strip()
-                except Exception as e2:
-                    print(f"Gemini retry failed: {e2}. Trying OpenAI...")
-                # Check if it's a quota error
-                if "quota" in str(e).lower() or "429" in str(e):
-                    print("⚠️ Gemini quota exceeded - using enhanced fallback summarization")
-                    return self._summarize_fallback(text, max_length)
-                import traceback
-                traceback.print_exc()
-        
-        # Try OpenAI if available
-        if self.openai_client:
+            return '', {'method': 'none', 'model': None, 'degraded_reason': None}
+        if self._use_textrank(provider):
+            return self._summarize_textrank(doc, max_length), {'method': 'textrank', 'model': None,
+                                                              'degraded_reason': None}
+        
+        degraded_reason = None
+        targets = self._llm_targets(os.getenv('OPENAI_SUMMARY_MODEL', self.openai_summary_model))
+        if targets:
             try:
-                return self._summarize_openai(text, max_words=max_length)
-            except Exception as e:
-                print(f"OpenAI summarization failed: {e}. Falling back to heuristic summarizer.")
-                return self._summarize_fallback(text, max_length)
+                print(f"Routing summarization (max_words: {max_length})")
+                result, (provider, model) = self._route_summary(targets, text, max_length, tenant)
+                print(f"{provider} summarization successful on {model}, length: {len(result)} characters")
+                return result, {'method': provider, 'model': model, 'degraded_reason': None}
+            except NoHealthyProviderError as e:
+                degraded_reason = self._degraded_reason(e)
+                print(f"AI summarization unavailable ({degraded_reason}): {e}. Falling back to heuristic summarizer.")
         
         # If no AI clients available, return a better fallback summary
-        return self._summarize_fallback(text, max_length)
+        method = 'textrank' if textrank_available() else 'heuristic'
+        return self._summarize_fallback(doc, max_length), {'method': method, 'model': None,
+                                                           'degraded_reason': degraded_reason}
 
-    def summarize_force_ai(self, text: str, max_length: int = 500, prefer: str = 'gemini', model: str | None = None) -> str:
+    def summarize_force_ai(self, text: Union[str, AnalyzedDocument], max_length: int = 500, prefer: str = 'gemini',
+                           model: str | None = None, tenant: str = None) -> str:
         """Force AI summarization; raise on failure (no fallback). prefer in {'gemini','openai'}."""
+        text = self.analyze(text).text
         if not text:
             return ''
         prefer = (prefer or 'gemini').lower()
-        # Try preferred provider first
-        providers = [prefer]
-        if prefer == 'gemini':
-            providers.append('openai')
-        else:
-            providers.append('gemini')
-        last_err = None
-        for p in providers:
-            try:
-                if p == 'gemini' and self.gemini_api_key:
-                    import google.generativeai as genai
-                    genai.configure(api_key=self.gemini_api_key)
-                    mdl = model or self.gemini_model or 'gemini-1.5-flash'
-                    client = genai.GenerativeModel(mdl)
-                    prompt = f"Summarize the following meeting transcript. Include names and an Action Items list (Owner: <Name> — <Task> (Due: ...)). Keep to ~{max_length//2}-{max_length} words.\n\nTranscript:\n{text}\n\nSummary:"
-                    resp = client.generate_content(prompt)
-                    if resp and resp.text:
-                        return resp.text.strip()
-                    raise RuntimeError('Empty Gemini response')
-                if p == 'openai' and self.openai_client:
-                    return self._summarize_openai(text, max_words=max_length)
-            except Exception as e:
-                last_err = e
-                continue
-        raise RuntimeError(f"AI summarization failed: {last_err}")
+        key = flight_key('summary_ai', text, max_length, prefer, model)
+        return self.flights.do(key, lambda: self._summarize_force_ai(text, max_length, prefer, model, tenant))
+
+    def _summarize_force_ai(self, text: str, max_length: int, prefer: str, model: str = None,
+                            tenant: str = None) -> str:
+        targets = self._llm_targets(os.getenv('OPENAI_SUMMARY_MODEL', self.openai_summary_model),
+                                    prefer=prefer, gemini_model=model)
+        try:
+            result, _ = self._route_summary(targets, text, max_length, tenant)
+            return result
+        except NoHealthyProviderError as e:
+            raise RuntimeError(f"AI summarization failed: {e}") from e
 
-    def _summarize_fallback(self, text: str, max_length: int = 500) -> str:
+    def _summarize_textrank(self, text: Union[str, AnalyzedDocument], max_length: int = 500) -> str:
+        """Offline extractive summary; `max_length` is the LLM word target, so aim for half of it."""
+        doc = self.analyze(text)
+        return self.textrank.summarize_sentences([s.text for s in doc.segments], max_words=max(50, max_length // 2))
+
+    def _summarize_fallback(self, text: Union[str, AnalyzedDocument], max_length: int = 500) -> str:
         """Enhanced fallback summarization when AI services are unavailable."""
+        doc = self.analyze(text)
+        text = doc.text
         if not text:
             return ''
         
-        # Split into sentences
-        sentences = [s.strip() for s in text.split('.') if s.strip()]
+        if textrank_available():
+            summary = self._summarize_textrank(doc, max_length)
+            if summary:
+                return summary
+        
+        # Keyword heuristic when NumPy is unavailable
+        return self._summarize_heuristic(doc, max_length)
+
+    def _summarize_heuristic(self, text: Union[str, AnalyzedDocument], max_length: int = 500) -> str:
+        """Key-sentence summary from decision/action/timeline keywords; no NumPy, linear time."""
+        doc = self.analyze(text)
+        text = doc.text
+        if not text:
+            return ''
+        sentences = [s.text for s in doc.sentences]
         
         if len(sentences) <= 2:
             return text[:max_length*5]  # If very short, just truncate
         
-        # Extract key information using patterns
-        key_sentences = []
-        
-        # Look for decision-related sentences
+        # Extract key information using patterns, one pass over the sentences
         decision_keywords = ['decided', 'agreed', 'approved', 'resolved', 'concluded', 'determined']
-        for sentence in sentences:
-            if any(keyword in sentence.lower() for keyword in decision_keywords):
-                key_sentences.append(sentence)
-        
-        # Look for action-related sentences
         action_keywords = ['will', 'should', 'need to', 'must', 'have to', 'assigned', 'responsible']
-        for sentence in sentences:
-            if any(keyword in sentence.lower() for keyword in action_keywords):
-                key_sentences.append(sentence)
-        
-        # Look for timeline/budget-related sentences
         timeline_keywords = ['deadline', 'timeline', 'schedule', 'budget', 'cost', 'price', 'date']
-        for sentence in sentences:
-            if any(keyword in sentence.lower() for keyword in timeline_keywords):
-                key_sentences.append(sentence)
+        decision_sentences, action_sentences, timeline_sentences = [], [], []
+        for sentence in doc.sentences:
+            lower = doc.lower_of(sentence)
+            if any(keyword in lower for keyword in decision_keywords):
+                decision_sentences.append(sentence.text)
+            if any(keyword in lower for keyword in action_keywords):
+                action_sentences.append(sentence.text)
+            if any(keyword in lower for keyword in timeline_keywords):
+                timeline_sentences.append(sentence.text)
+        key_sentences = decision_sentences + action_sentences + timeline_sentences
         
         # If we found key sentences, use them
         if key_sentences:
@@ -239,37 +432,19 @@ class NLPAnalyzer:
         
         return summary
 
-    def _summarize_gemini(self, text: str, max_words: int = 500) -> str:
-        """Summarize using Gemini with flexible word count - let AI decide optimal length."""
-        print(f"Gemini summarization called with text length: {len(text)} characters, max_words: {max_words}")
+    def _gemini_summary_prompt(self, client, text: str, max_words: int):
+        """Build the final Gemini summary prompt.
+
+        Short transcripts go in as-is; long ones are summarized chunk by chunk first and
+        the synthesis prompt is returned along with the joined chunk summaries.
+        """
+        prepared = prepare_transcript(text)
+        text = prepared.model_text
         
         # Single-pass if short
         if len(text) <= 30000:  # Gemini has higher token limits
-            prompt = f"""Summarize the following meeting transcript. Include explicit person attributions wherever possible.
-
-Requirements:
-- Start with a tight executive summary (3-5 sentences).
-- Then list Action Items as bullets in the form: "Owner: <Name> — <Task> (Due: <date or n/a>)".
-- Call out Decisions with who proposed/approved when identifiable.
-- Prefer names exactly as they appear in the transcript; do not invent roles.
-- Keep it faithful and concise (~{max_words//2}-{max_words} words total).
-
-Transcript:
-{text}
-
-Summary:"""
-            
-            print("Calling Gemini API...")
-            response = self.gemini_client.generate_content(prompt)
-            print(f"Gemini API response received: {response is not None}")
-            
-            if response and response.text:
-                result = response.text.strip()
-                print(f"Gemini summary generated: {len(result)} characters")
-                return result
-            else:
-                print("No response text from Gemini")
-                raise Exception("No response from Gemini")
+            return self.prompts.build('gemini_summary', transcript=prepared,
+                                      min_words=max_words//2, max_words=max_words), None
         
         # Multi-pass for long text
         chunk_size = 30000
@@ -282,14 +457,11 @@ Summary:"""
         
         chunk_summaries: List[str] = []
         for idx, ch in enumerate(chunks, 1):
-            prompt = f"""Summarize chunk {idx}/{len(chunks)} of a meeting transcript. Focus on key decisions, action items, deadlines, and important outcomes. Be comprehensive but concise.
-
-Chunk:
-{ch}
-
-Summary:"""
+            # Chunks are cut from text that is already cleaned and normalized
+            prompt = self.prompts.build('gemini_summary_chunk', transcript=prepare_transcript(ch, remove_fillers=False),
+                                        index=idx, total=len(chunks))
             
-            response = self.gemini_client.generate_content(prompt)
+            response = client.generate_content(prompt.text)
             if response and response.text:
                 chunk_summaries.append(response.text.strip())
             else:
@@ -297,38 +469,63 @@ Summary:"""
         
         # Synthesize chunk summaries
         combined_summaries = "\n\n".join(chunk_summaries)
-        synthesis_prompt = f"""Synthesize these meeting summary chunks into a coherent, comprehensive summary. Create a well-structured summary that captures all key points, decisions, action items, and outcomes. Aim for approximately {max_words//2} to {max_words} words, but prioritize completeness and clarity over strict word count.
-
-{combined_summaries}
+        synthesis_prompt = self.prompts.build('gemini_summary_synthesis', summaries=combined_summaries,
+                                              min_words=max_words//2, max_words=max_words)
+        return synthesis_prompt, combined_summaries
 
-Final Summary:"""
+    def _summarize_gemini(self, text: str, max_words: int = 500, model: str = None) -> str:
+        """Summarize using Gemini with flexible word count - let AI decide optimal length."""
+        print(f"Gemini summarization called with text length: {len(text)} characters, max_words: {max_words}")
+        client = self._gemini_model_client(model)
+        prompt, combined_summaries = self._gemini_summary_prompt(client, text, max_words)
+        
+        print("Calling Gemini API...")
+        response = client.generate_content(prompt.text)
+        print(f"Gemini API response received: {response is not None}")
         
-        response = self.gemini_client.generate_content(synthesis_prompt)
         if response and response.text:
-            return response.text.strip()
-        else:
+            result = response.text.strip()
+            print(f"Gemini summary generated: {len(result)} characters")
+            return result
+        if combined_summaries is not None:
             return combined_summaries[:max_words*5]
+        print("No response text from Gemini")
+        raise Exception("No response from Gemini")
 
-    def _summarize_openai(self, text: str, max_words: int = 500) -> str:
-        """Summarize using OpenAI with flexible word count - let AI decide optimal length."""
-        model = os.getenv('OPENAI_SUMMARY_MODEL', self.openai_summary_model)
+    def _stream_gemini(self, text: str, max_words: int = 500, model: str = None) -> Iterator[str]:
+        """Yield summary text from Gemini's streaming API as it is generated."""
+        client = self._gemini_model_client(model)
+        prompt, _ = self._gemini_summary_prompt(client, text, max_words)
+        for chunk in client.generate_content(prompt.text, stream=True):
+            try:
+                piece = chunk.text
+            except ValueError:
+                # Chunks without text parts (e.g. the final finish_reason chunk)
+                continue
+            if piece:
+                yield piece
+
+    def _openai_complete(self, model: str, messages: List[Dict[str, str]], max_tokens: int) -> str:
+        resp = self.openai_client.chat.completions.create(
+            model=model,
+            messages=messages,
+            temperature=0,
+            max_tokens=max_tokens
+        )
+        content = resp.choices[0].message.content.strip()
+        # Strip code fences if any
+        if content.startswith('```') and content.endswith('```'):
+            content = content.split('\n',1)[1].rsplit('\n',1)[0].strip()
+        return content
+
+    def _openai_summary_prompt(self, model: str, text: str, max_words: int):
+        """Build the final OpenAI summary prompt (chunk summaries first for long transcripts)."""
+        prepared = prepare_transcript(text, model=model)
+        text = prepared.model_text
         # Single-pass if short
         if len(text) <= 3500:
-            messages = [
-                {"role": "system", "content": "You are an expert meeting summarizer. Attribute information to speakers when names are present and extract clear, owner-tagged action items."},
-                {"role": "user", "content": f"Summarize the following meeting transcript with named attributions and an action list.\nRequirements:\n- Executive summary (3-5 sentences).\n- Bulleted Action Items in the form: 'Owner: <Name> — <Task> (Due: <date or n/a>)'.\n- Decisions with proposer/approver if identifiable.\n- Use names exactly as they appear; do not invent roles.\n- ~{max_words//2}-{max_words} words total.\n\nTranscript:\n{text}"}
-            ]
-            resp = self.openai_client.chat.completions.create(
-                model=model,
-                messages=messages,
-                temperature=0,
-                max_tokens=800
-            )
-            content = resp.choices[0].message.content.strip()
-            # Strip code fences if any
-            if content.startswith('```') and content.endswith('```'):
-                content = content.split('\n',1)[1].rsplit('\n',1)[0].strip()
-            return content
+            return self.prompts.build('openai_summary', model=model, transcript=prepared,
+                                      min_words=max_words//2, max_words=max_words)
         
         # Multi-pass for long text
         chunk_size = 3500
@@ -341,38 +538,441 @@ Final Summary:"""
         
         chunk_summaries: List[str] = []
         for idx, ch in enumerate(chunks, 1):
-            messages = [
-                {"role": "system", "content": "You summarize meeting transcripts faithfully with speaker attributions and owner-tagged action items."},
-                {"role": "user", "content": f"Summarize chunk {idx}/{len(chunks)} in 80-120 words. Include names when present, decisions with attributions, and any action items in 'Owner: <Name> — <Task> (Due: <date or n/a>)' format.\n\nChunk:\n{ch}"}
-            ]
-            resp = self.openai_client.chat.completions.create(
-                model=model,
-                messages=messages,
-                temperature=0,
-                max_tokens=500
-            )
-            content = resp.choices[0].message.content.strip()
-            if content.startswith('```') and content.endswith('```'):
-                content = content.split('\n',1)[1].rsplit('\n',1)[0].strip()
-            chunk_summaries.append(content)
+            prompt = self.prompts.build('openai_summary_chunk', model=model,
+                                        transcript=prepare_transcript(ch, model=model, remove_fillers=False),
+                                        index=idx, total=len(chunks))
+            chunk_summaries.append(self._openai_complete(model, prompt.messages, max_tokens=500))
         
         synthesis_input = "\n\n".join(chunk_summaries)
-        synth_messages = [
-            {"role": "system", "content": "You are an expert meeting summarizer. Attribute items to named people where possible."},
-            {"role": "user", "content": f"Given these chunk summaries, write a single, coherent summary (~{max_words} words).\nInclude: executive summary, named attributions, and an 'Action Items' bullet list (Owner: <Name> — <Task> (Due: ...)). Avoid repetition.\n\nChunk summaries:\n{synthesis_input}"}
-        ]
-        final_resp = self.openai_client.chat.completions.create(
+        return self.prompts.build('openai_summary_synthesis', model=model,
+                                  summaries=synthesis_input, max_words=max_words)
+
+    def _summarize_openai(self, text: str, max_words: int = 500, model: str = None) -> str:
+        """Summarize using OpenAI with flexible word count - let AI decide optimal length."""
+        model = model or os.getenv('OPENAI_SUMMARY_MODEL', self.openai_summary_model)
+        prompt = self._openai_summary_prompt(model, text, max_words)
+        return self._openai_complete(model, prompt.messages, max_tokens=800)
+
+    def _stream_openai(self, text: str, max_words: int = 500, model: str = None) -> Iterator[str]:
+        """Yield summary text from OpenAI's streaming API as it is generated."""
+        model = model or os.getenv('OPENAI_SUMMARY_MODEL', self.openai_summary_model)
+        prompt = self._openai_summary_prompt(model, text, max_words)
+        stream = self.openai_client.chat.completions.create(
             model=model,
-            messages=synth_messages,
+            messages=prompt.messages,
             temperature=0,
-            max_tokens=800
+            max_tokens=800,
+            stream=True
         )
-        final_text = final_resp.choices[0].message.content.strip()
-        if final_text.startswith('```') and final_text.endswith('```'):
-            final_text = final_text.split('\n',1)[1].rsplit('\n',1)[0].strip()
-        return final_text
-    
-    def extract_action_items(self, text: str, meeting_date: str = None, attendees: List[str] = None) -> Dict[str, Any]:
+        for chunk in stream:
+            if chunk.choices and chunk.choices[0].delta.content:
+                yield chunk.choices[0].delta.content
+
+    def summarize_stream(self, text: Union[str, AnalyzedDocument], max_length: int = 500, tenant: str = None,
+                         model: str | None = None, require_ai: bool = False, provider: str = None) -> Iterator[str]:
+        """Yield the summary incrementally as the provider streams it.
+
+        The router picks the provider and reads the first chunk inside the routed call,
+        so quota and connection errors still fail over; the provider's limiter slot is
+        held until the stream ends. Without a healthy provider the
+        heuristic summary is yielded in one piece, or RuntimeError is raised if require_ai.
+        """
+        doc = self.analyze(text)
+        text = doc.text
+        if not text:
+            return
+        if not require_ai and self._use_textrank(provider):
+            yield self._summarize_textrank(doc, max_length)
+            return
+        targets = self._llm_targets(os.getenv('OPENAI_SUMMARY_MODEL', self.openai_summary_model), gemini_model=model)
+        if targets:
+            def open_stream(provider: str, model: str):
+                return (self._stream_gemini if provider == 'gemini' else self._stream_openai)(text, max_length, model)
+            try:
+                stream, (provider, model) = self.router.call(targets, open_stream, tokens=count_tokens(text),
+                                                             stream=True)
+            except NoHealthyProviderError as e:
+                if require_ai:
+                    raise RuntimeError(f"AI summarization failed: {e}") from e
+                print(f"AI summary streaming unavailable ({self._degraded_reason(e)}): {e}. Falling back to heuristic summarizer.")
+            else:
+                print(f"Streaming summary from {provider}/{model}")
+                yield from stream
+                return
+        elif require_ai:
+            raise RuntimeError("AI summarization failed: no AI provider configured")
+        yield self._summarize_fallback(doc, max_length)
+
+    def _rolling_state(self, meeting_id: str) -> RollingSummary:
+        with self._rolling_lock:
+            state = self._rolling.get(meeting_id)
+            if state is None:
+                state = self._rolling[meeting_id] = RollingSummary(meeting_id)
+                while len(self._rolling) > self.max_rolling_meetings:
+                    self._rolling.popitem(last=False)
+            else:
+                self._rolling.move_to_end(meeting_id)
+            return state
+
+    def _update_summary_with(self, provider: str, model: str, summary: str, delta: str, max_words: int) -> str:
+        if provider == 'gemini':
+            prompt = self.prompts.build('gemini_summary_update', transcript=prepare_transcript(delta),
+                                        summary=summary or '(none yet)', max_words=max_words)
+            response = self._gemini_model_client(model).generate_content(prompt.text)
+            if not (response and response.text):
+                raise Exception("No response from Gemini")
+            return response.text.strip()
+        prompt = self.prompts.build('openai_summary_update', model=model,
+                                    transcript=prepare_transcript(delta, model=model),
+                                    summary=summary or '(none yet)', max_words=max_words)
+        return self._openai_complete(model, prompt.messages, max_tokens=800)
+
+    def _fold_into_summary(self, summary: str, delta: AnalyzedDocument, max_length: int, tenant: str = None,
+                           provider: str = None) -> Tuple[str, str]:
+        """Return (updated summary, method) from the previous summary and the new sentences only."""
+        targets = self._llm_targets(os.getenv('OPENAI_SUMMARY_MODEL', self.openai_summary_model))
+        if targets and not self._use_textrank(provider):
+            def fn(provider: str, model: str) -> str:
+                return self._update_summary_with(provider, model, summary, delta.text, max_length)
+            try:
+                result, (provider, model) = self.router.call(
+                    targets, fn, tokens=count_tokens(summary) + count_tokens(delta.text))
+                return result, provider
+            except NoHealthyProviderError as e:
+                print(f"AI rolling summary unavailable ({self._degraded_reason(e)}): {e}. Using offline update.")
+        
+        # Offline: re-rank the previous summary's sentences together with the new ones
+        sentences = [s for _, _, s in split_sentences(summary)] + [s.text for s in delta.segments]
+        if textrank_available():
+            return self.textrank.summarize_sentences(sentences, max_words=max(50, max_length // 2)), 'textrank'
+        return self._summarize_fallback(AnalyzedDocument('\n'.join(sentences)), max_length), 'heuristic'
+
+    def update_rolling_summary(self, meeting_id: str, delta: str, max_length: int = 300, flush: bool = False,
+                               tenant: str = None, provider: str = None) -> Dict[str, Any]:
+        """Fold a new piece of a live transcript into the meeting's running summary and open action items.
+
+        Only the delta is processed; an unfinished last sentence is held until the
+        next delta (or `flush`) completes it. Returns the state as a dict.
+        """
+        state = self._rolling_state(meeting_id)
+        with state.lock:
+            complete, state.pending = split_complete(state.pending + (delta or ''))
+            if flush:
+                complete, state.pending = complete + state.pending, ''
+            if not complete.strip():
+                return state.to_dict()
+            
+            # A fresh document: deltas would only churn the analyze() cache
+            doc = AnalyzedDocument(complete)
+            state.summary, state.method = self._fold_into_summary(state.summary, doc, max_length,
+                                                                  tenant=tenant, provider=provider)
+            items = self._extract_action_items_rule_based(doc)
+            if items:
+                state.action_items = self._merge_similar_items(state.action_items + items)[-MAX_OPEN_ITEMS:]
+            state.consumed_chars += len(complete)
+            state.updates += 1
+            state.updated_at = time.time()
+            return state.to_dict()
+
+    def rolling_summary(self, meeting_id: str) -> Optional[Dict[str, Any]]:
+        """Current running summary of a live meeting, or None if it has none."""
+        with self._rolling_lock:
+            state = self._rolling.get(meeting_id)
+        if state is None:
+            return None
+        with state.lock:
+            return state.to_dict()
+
+    def end_rolling_summary(self, meeting_id: str, max_length: int = 300) -> Optional[Dict[str, Any]]:
+        """Flush any held-back text and drop the meeting's rolling state, returning the final state."""
+        with self._rolling_lock:
+            if meeting_id not in self._rolling:
+                return None
+        final = self.update_rolling_summary(meeting_id, '', max_length=max_length, flush=True)
+        with self._rolling_lock:
+            self._rolling.pop(meeting_id, None)
+        return final
+
+    def _summarize_chunk_with(self, provider: str, model: str, text: str, index: int, total: int) -> str:
+        if provider == 'gemini':
+            prompt = self.prompts.build('gemini_summary_chunk', transcript=prepare_transcript(text),
+                                        index=index, total=total)
+            response = self._gemini_model_client(model).generate_content(prompt.text)
+            if not (response and response.text):
+                raise Exception("No response from Gemini")
+            return response.text.strip()
+        prompt = self.prompts.build('openai_summary_chunk', model=model,
+                                    transcript=prepare_transcript(text, model=model), index=index, total=total)
+        return self._openai_complete(model, prompt.messages, max_tokens=500)
+
+    def _synthesize_with(self, provider: str, model: str, summaries: str, max_words: int) -> str:
+        if provider == 'gemini':
+            prompt = self.prompts.build('gemini_summary_synthesis', summaries=summaries,
+                                        min_words=max_words//2, max_words=max_words)
+            response = self._gemini_model_client(model).generate_content(prompt.text)
+            if not (response and response.text):
+                raise Exception("No response from Gemini")
+            return response.text.strip()
+        prompt = self.prompts.build('openai_summary_synthesis', model=model, summaries=summaries, max_words=max_words)
+        return self._openai_complete(model, prompt.messages, max_tokens=800)
+
+    def _analyze_chunk(self, text: str, index: int, total: int, targets: List[Tuple[str, str]],
+                       meeting_date: str = None, attendees: List[str] = None) -> Dict[str, Any]:
+        """Chunk summary and chunk-relative items, as stored under the chunk's hash."""
+        summary, method, degraded = None, 'textrank', False
+        if targets:
+            def fn(provider: str, model: str) -> str:
+                return self._summarize_chunk_with(provider, model, text, index, total)
+            try:
+                summary, (method, _) = self.router.call(targets, fn, tokens=count_tokens(text))
+            except NoHealthyProviderError as e:
+                degraded = True
+                print(f"AI chunk summary unavailable ({self._degraded_reason(e)}): {e}. Using offline summary.")
+        if summary is None:
+            summary = self._summarize_fallback(AnalyzedDocument(text), 120)
+            method = 'textrank' if textrank_available() else 'heuristic'
+        extraction = self.extract_action_items(text, meeting_date=meeting_date, attendees=attendees)
+        meta = extraction.get('metadata', {})
+        return {
+            'summary': summary,
+            'action_items': extraction.get('action_items', []),
+            'decisions': extraction.get('decisions', []),
+            'key_topics': extraction.get('key_topics', []),
+            'method': method,
+            'extraction_method': meta.get('method') or meta.get('extraction_method'),
+            'degraded': degraded or bool(meta.get('degraded_reason')),
+        }
+
+    def analyze_chunks(self, text: Union[str, AnalyzedDocument], cached_chunks: List[Dict[str, Any]] = None,
+                       meeting_date: str = None, attendees: List[str] = None,
+                       provider: str = None) -> Tuple[Dict[str, Any], List[Dict[str, Any]]]:
+        """Per-chunk summaries and items for `text`, reusing `cached_chunks` outputs by content hash.
+
+        Returns (items merged across chunks, in extract_action_items() shape;
+        chunk entries to store with the meeting). Saving these with a new
+        meeting lets its first edit re-analyze only the chunks that changed.
+        """
+        doc = self.analyze(text)
+        context = f"{meeting_date or ''}|{','.join(attendees or [])}"
+        chunks = chunk_transcript(doc.text, context)
+        cached = index_cached(cached_chunks)
+        summary_targets = self._chunk_summary_targets(provider)
+        
+        entries: List[Dict[str, Any]] = []
+        reanalyzed = 0
+        for idx, chunk in enumerate(chunks, 1):
+            entry = cached.get(chunk.hash)
+            # Outputs produced while providers were down are redone once a provider is configured
+            if entry is None or (entry.get('degraded') and summary_targets):
+                entry = dict(self._analyze_chunk(chunk.text, idx, len(chunks), summary_targets,
+                                                 meeting_date, attendees), hash=chunk.hash)
+                reanalyzed += 1
+            entries.append(entry)
+        print(f"Incremental analysis: {reanalyzed}/{len(chunks)} chunks re-analyzed")
+        
+        # Merge items, moving chunk-relative evidence spans to transcript offsets
+        action_items, decisions, key_topics = [], [], []
+        seen_decisions, seen_topics = set(), set()
+        for chunk, entry in zip(chunks, entries, strict=True):
+            action_items.extend(shift_spans(entry.get('action_items', []), chunk.start))
+            for item in shift_spans(entry.get('decisions', []), chunk.start):
+                key = str(item.get('decision', '')).strip().lower()
+                if key not in seen_decisions:
+                    seen_decisions.add(key)
+                    decisions.append(item)
+            for item in shift_spans(entry.get('key_topics', []), chunk.start):
+                key = str(item.get('topic', '')).strip().lower()
+                if key not in seen_topics:
+                    seen_topics.add(key)
+                    key_topics.append(item)
+        action_items = self._merge_similar_items([i for i in action_items if i.get('text')])
+        decisions.sort(key=lambda x: -x.get('confidence', 0))
+        key_topics.sort(key=lambda x: -x.get('confidence', 0))
+        
+        extraction = {
+            'action_items': action_items[:20],
+            'decisions': decisions[:15],
+            'key_topics': key_topics[:10],
+            'metadata': {
+                'method': 'incremental',
+                'chunks': len(chunks),
+                'chunks_reanalyzed': reanalyzed,
+            },
+        }
+        return extraction, entries
+
+    def _chunk_summary_targets(self, provider: str = None) -> List[Tuple[str, str]]:
+        if self._use_textrank(provider):
+            return []
+        return self._llm_targets(os.getenv('OPENAI_SUMMARY_MODEL', self.openai_summary_model))
+
+    def analyze_incremental(self, text: Union[str, AnalyzedDocument], cached_chunks: List[Dict[str, Any]] = None,
+                            max_length: int = 500, meeting_date: str = None, attendees: List[str] = None,
+                            tenant: str = None, provider: str = None) -> Tuple[Dict[str, Any], List[Dict[str, Any]]]:
+        """Summarize and extract `text` chunk by chunk, reusing `cached_chunks` outputs by content hash.
+
+        Only chunks whose hash is not cached are sent to the LLM; the summary is
+        then synthesized from the chunk summaries and the items are merged.
+        Returns (result in /summarize response shape, chunk entries to store).
+        """
+        doc = self.analyze(text)
+        extraction, entries = self.analyze_chunks(doc, cached_chunks, meeting_date=meeting_date,
+                                                  attendees=attendees, provider=provider)
+        summary_targets = self._chunk_summary_targets(provider)
+        
+        # Synthesize the summary from chunk summaries (small input, one call)
+        summaries = [e.get('summary') or '' for e in entries]
+        summary, summary_info = '', {'method': 'none', 'model': None, 'degraded_reason': None}
+        if summary_targets and summaries:
+            def fn(provider: str, model: str) -> str:
+                return self._synthesize_with(provider, model, '\n\n'.join(summaries), max_length)
+            try:
+                summary, (method, model) = self.router.call(
+                    summary_targets, fn, tokens=sum(count_tokens(s) for s in summaries))
+                summary_info = {'method': method, 'model': model, 'degraded_reason': None}
+            except NoHealthyProviderError as e:
+                summary_info['degraded_reason'] = self._degraded_reason(e)
+        if summaries and not summary:
+            sentences = [s for part in summaries for _, _, s in split_sentences(part)]
+            if textrank_available():
+                summary = self.textrank.summarize_sentences(sentences, max_words=max(50, max_length // 2))
+            else:
+                summary = self._summarize_fallback(AnalyzedDocument('\n'.join(sentences)), max_length)
+            summary_info['method'] = 'textrank' if textrank_available() else 'heuristic'
+        
+        result = {
+            'summary': summary,
+            'keywords': self.extract_keywords(doc),
+            'action_items': extraction['action_items'],
+            'decisions': extraction['decisions'],
+            'key_topics': extraction['key_topics'],
+            'extraction_metadata': dict(extraction['metadata'], summary=summary_info),
+        }
+        return result, entries
+
+    def _submit_llm(self, stage: str, fn, used_llm):
+        """Run an LLM stage reserved by tiers.choose() on the llm pool; None if the pool refused it.
+
+        The reservation is released when the call finishes, and its latency
+        feeds the tier estimates even if the caller gave up on it.
+        """
+        submitted = time.monotonic()
+
+        def done(future):
+            self.tiers.end_llm()
+            if not future.cancelled() and future.exception() is None and used_llm(future.result()):
+                self.tiers.record(stage, time.monotonic() - submitted)
+        try:
+            future = executors.pool('llm').submit(fn)
+        except executors.ExecutorSaturated:
+            # Only when the selector's capacity was set above the pool's limit
+            self.tiers.end_llm()
+            return None
+        future.add_done_callback(done)
+        return future
+
+    def _run_local(self, stage: str, chars: int, fn):
+        started = time.monotonic()
+        result = fn()
+        self.tiers.record(stage, time.monotonic() - started, chars)
+        return result
+
+    def analyze_within_budget(self, text: Union[str, AnalyzedDocument], max_length: int = 500,
+                              meeting_date: str = None, attendees: List[str] = None,
+                              latency_budget_s: float = None, tenant: str = None) -> Dict[str, Any]:
+        """Summary plus extraction at the richest tier expected to finish within the latency budget.
+
+        The tier (see app.degradation) is chosen before any call from provider
+        latency, queue depth and `latency_budget_s` (default
+        ANALYSIS_LATENCY_BUDGET_S). An LLM stage that still overruns is
+        abandoned at the deadline and replaced by its local counterpart.
+
+        Returns {'summary', 'action_items', 'decisions', 'key_topics', 'metadata'};
+        metadata.method is the tier that produced the result, metadata.tier the
+        up-front decision, metadata.extraction_method and metadata.summary how
+        each part was made.
+        """
+        started = time.monotonic()
+        doc = self.analyze(text)
+        chars = len(doc.text)
+        targets = [] if self.summary_provider == 'textrank' else \
+            self._llm_targets(os.getenv('OPENAI_SUMMARY_MODEL', self.openai_summary_model))
+        decision = self.tiers.choose(chars, targets, latency_budget_s, textrank=textrank_available())
+        deadline = started + decision.budget_s
+        degraded_reason = None
+
+        summary_future = extraction_future = None
+        if decision.tier in (FULL_LLM, LLM_SUMMARY):
+            summary_future = self._submit_llm(
+                'summary', lambda: self.summarize_with_info(doc, max_length, tenant=tenant),
+                lambda result: result[1]['method'] in ('openai', 'gemini'))
+        if decision.tier == FULL_LLM:
+            extraction_future = self._submit_llm(
+                'extraction', lambda: self.extract_action_items(doc, meeting_date, attendees),
+                lambda result: result.get('metadata', {}).get('method') in ('openai', 'gemini'))
+        if decision.llm_calls and (summary_future is None or (decision.tier == FULL_LLM and extraction_future is None)):
+            degraded_reason = 'queue_depth'
+
+        def rule_extraction():
+            return self._run_local('rules', chars,
+                                   lambda: self._extract_enhanced_items_rule_based(doc, meeting_date, attendees))
+
+        def local_summary():
+            if decision.tier != RULE_BASED and textrank_available():
+                summary = self._run_local('textrank', chars, lambda: self._summarize_textrank(doc, max_length))
+                if summary:
+                    return summary, {'method': 'textrank', 'model': None, 'degraded_reason': degraded_reason}
+            summary = self._run_local('heuristic', chars, lambda: self._summarize_heuristic(doc, max_length))
+            return summary, {'method': 'heuristic', 'model': None, 'degraded_reason': degraded_reason}
+
+        def wait(future, reserve_s: float):
+            nonlocal degraded_reason
+            try:
+                return future.result(timeout=max(0.0, deadline - time.monotonic() - reserve_s))
+            except FutureTimeoutError:
+                # A call that never started is dropped; one in flight finishes and still feeds the estimates
+                future.cancel()
+                degraded_reason = 'deadline'
+            except Exception as e:
+                print(f"LLM stage failed in tiered analysis: {e}")
+                degraded_reason = 'error'
+            return None
+
+        # Local extraction runs while the LLM stages are in flight
+        extraction = rule_extraction() if extraction_future is None else None
+        reserve = self.tiers.local_estimate('rules', chars) + self.tiers.local_estimate('heuristic', chars)
+        summary_result = wait(summary_future, reserve) if summary_future is not None else None
+        if extraction_future is not None:
+            extraction = wait(extraction_future, reserve)
+            if extraction is None:
+                extraction = rule_extraction()
+        summary, summary_info = summary_result if summary_result is not None else local_summary()
+
+        extraction_method = extraction.get('metadata', {}).get('method')
+        if summary_info['method'] in ('openai', 'gemini'):
+            tier = FULL_LLM if extraction_method in ('openai', 'gemini') else LLM_SUMMARY
+        else:
+            tier = EXTRACTIVE if summary_info['method'] == 'textrank' else RULE_BASED
+        metadata = dict(extraction.get('metadata', {}))
+        metadata.update({
+            'method': tier,
+            'extraction_method': extraction_method,
+            'tier': decision.to_dict(),
+            'summary': summary_info,
+            'elapsed_s': round(time.monotonic() - started, 3),
+        })
+        if degraded_reason:
+            metadata['degraded_reason'] = degraded_reason
+        return {
+            'summary': summary,
+            'action_items': extraction.get('action_items', []),
+            'decisions': extraction.get('decisions', []),
+            'key_topics': extraction.get('key_topics', []),
+            'metadata': metadata,
+        }
+
+    def extract_action_items(self, text: Union[str, AnalyzedDocument], meeting_date: str = None,
+                             attendees: List[str] = None) -> Dict[str, Any]:
         """Extract action items, decisions, and key topics from text using OpenAI API or rule-based patterns as fallback.
         
         Returns a dictionary with:
@@ -380,7 +980,16 @@ Final Summary:"""
         - decisions: List of decisions made during the meeting
         - key_topics: List of main topics discussed
         - metadata: Extraction metadata (confidence, method used, etc.)
+        
+        Concurrent identical calls share one computation.
         """
+        doc = self.analyze(text)
+        key = flight_key('extract', doc.text, meeting_date, list(attendees or []))
+        return self.flights.do(key, lambda: self._extract_action_items(doc, meeting_date, attendees))
+
+    def _extract_action_items(self, doc: AnalyzedDocument, meeting_date: str = None,
+                              attendees: List[str] = None) -> Dict[str, Any]:
+        text = doc.text
         if not text:
             return {
                 'action_items': [],
@@ -389,36 +998,175 @@ Final Summary:"""
                 'metadata': {'method': 'none', 'confidence': 0.0, 'extraction_time': None}
             }
         
-        # Try Gemini extraction first
-        if self.gemini_client:
+        targets = self._llm_targets(os.getenv('OPENAI_ACTION_MODEL', self.openai_action_model))
+        if targets:
+            def attempt(provider: str, model: str) -> Dict[str, Any]:
+                started = time.monotonic()
+                try:
+                    if provider == 'gemini':
+                        return self._extract_enhanced_items_gemini(text, meeting_date, attendees, model=model)
+                    return self._extract_enhanced_items_openai(text, meeting_date, attendees, model=model)
+                except Exception:
+                    parse_stats.record_retry(started)
+                    raise
             try:
-                result = self._extract_enhanced_items_gemini(text, meeting_date, attendees)
-                print(f"Gemini enhanced extraction successful: {len(result.get('action_items', []))} actions, {len(result.get('decisions', []))} decisions, {len(result.get('key_topics', []))} topics")
+                result, (provider, model) = self.router.call(targets, attempt, tokens=count_tokens(text))
+                print(f"{provider} enhanced extraction successful on {model}: {len(result.get('action_items', []))} actions, {len(result.get('decisions', []))} decisions, {len(result.get('key_topics', []))} topics")
                 return result
-            except Exception as e:
-                import traceback
-                print(f"Gemini enhanced extraction failed: {e}")
-                print(f"Traceback: {traceback.format_exc()}")
-                print("Falling back to OpenAI extraction.")
-        
-        # Try OpenAI extraction
-        if self.openai_client:
-            try:
-                result = self._extract_enhanced_items_openai(text, meeting_date, attendees)
-                print(f"OpenAI enhanced extraction successful: {len(result.get('action_items', []))} actions, {len(result.get('decisions', []))} decisions, {len(result.get('key_topics', []))} topics")
+            except NoHealthyProviderError as e:
+                reason = self._degraded_reason(e)
+                print(f"LLM extraction unavailable ({reason}): {e}. Falling back to rule-based extraction.")
+                result = self._extract_enhanced_items_rule_based(doc, meeting_date, attendees)
+                result['metadata']['degraded_reason'] = reason
                 return result
-            except Exception as e:
-                import traceback
-                print(f"OpenAI enhanced extraction failed: {e}")
-                print(f"Traceback: {traceback.format_exc()}")
-                print("Falling back to rule-based extraction.")
         
         # Fallback to rule-based extraction
-        return self._extract_enhanced_items_rule_based(text, meeting_date, attendees)
+        return self._extract_enhanced_items_rule_based(doc, meeting_date, attendees)
     
-    def _extract_enhanced_items_gemini(self, text: str, meeting_date: str = None, attendees: List[str] = None) -> Dict[str, Any]:
-        """Extract action items, decisions, and key topics using Gemini API (robust parsing + retry)."""
-        import json
+    def extract_action_items_batch(self, documents: List[BatchDocument],
+                                   use_batch_api: bool = None) -> Dict[str, Dict[str, Any]]:
+        """Extract items for many meetings at once, packing short ones several to a request.
+
+        Returns extraction results by document id, in the same shape as
+        extract_action_items(). Meetings too long to pack, and any the batched
+        reply skipped or that failed, are extracted one by one as usual.
+        `use_batch_api` (default EXTRACTION_BATCH_API) submits the packed
+        requests as one OpenAI Batch API job, which can take minutes to hours.
+        """
+        if not documents:
+            return {}
+        action_model = os.getenv('OPENAI_ACTION_MODEL', self.openai_action_model)
+        prepared = [prepare_transcript(d.text, model=action_model) for d in documents]
+        # Empty transcripts are never packed; extract_action_items() answers them without a call
+        sizes = [p.clean_tokens if p.clean.strip() else math.inf for p in prepared]
+        groups = pack_documents(sizes, self.batch_max_docs, self.batch_max_tokens, self.batch_max_doc_tokens)
+
+        batches: Dict[str, Tuple[List[int], List[str], Any]] = {}
+        targets = self._llm_targets(action_model)
+        if targets:
+            for n, group in enumerate(groups):
+                if len(group) < 2:
+                    continue
+                ids = [f"M{k + 1}" for k in range(len(group))]
+                block = render_documents(ids, [prepared[i].model_text for i in group], [documents[i] for i in group])
+                prompt = self.prompts.build('extraction_batch', model=action_model, count=len(group), documents=block)
+                batches[f"batch-{n}"] = (group, ids, prompt)
+
+        replies = self._run_extraction_batches(batches, targets, action_model,
+                                               self.batch_api if use_batch_api is None else use_batch_api)
+
+        results: Dict[str, Dict[str, Any]] = {}
+        for custom_id, (group, ids, prompt) in batches.items():
+            reply = replies.get(custom_id)
+            if reply is None:
+                continue
+            parsed, meta = reply
+            for i, doc_id in zip(group, ids, strict=True):
+                if doc_id not in parsed:
+                    continue
+                validated = self._validate_prepared(parsed[doc_id], prepared[i], documents[i].attendees)
+                validated['metadata'] = dict(meta, prompt=prompt.stats(), batch_size=len(group),
+                                             extraction_time=meta['extraction_time'] / len(group))
+                results[documents[i].id] = validated
+
+        leftovers = [d for d in documents if d.id not in results]
+        if batches:
+            print(f"Batched extraction: {len(results)} meetings in {len(batches)} requests, {len(leftovers)} extracted individually")
+        for doc in leftovers:
+            results[doc.id] = self.extract_action_items(doc.text, meeting_date=doc.meeting_date, attendees=doc.attendees)
+        return results
+
+    def _batch_request_body(self, model: str, prompt, count: int) -> Dict[str, Any]:
+        return {
+            'model': model,
+            'messages': prompt.messages,
+            'max_tokens': min(16000, 1500 * count),
+            'temperature': 0.1,
+            'response_format': openai_response_format(OpenAIBatchExtraction, name='meeting_batch_extraction'),
+        }
+
+    def _extract_batch_with(self, provider: str, model: str, prompt, doc_ids: List[str]):
+        if provider == 'gemini':
+            resp = self._gemini_model_client(model).generate_content(
+                prompt.text, generation_config=gemini_generation_config(OpenAIBatchExtraction))
+            if not resp or not getattr(resp, 'text', None):
+                raise Exception('No response from Gemini')
+            raw = resp.text
+        else:
+            response = self.openai_client.chat.completions.create(**self._batch_request_body(model, prompt, len(doc_ids)))
+            raw = response.choices[0].message.content
+        return parse_batch_extraction(raw, doc_ids)
+
+    def _run_extraction_batches(self, batches: Dict[str, Tuple[List[int], List[str], Any]],
+                                targets: List[Tuple[str, str]], model: str,
+                                use_batch_api: bool) -> Dict[str, Tuple[Dict[str, Dict[str, Any]], Dict[str, Any]]]:
+        """Run packed requests; returns ({doc_id: raw result}, metadata) by batch id, omitting failed ones."""
+        if not batches:
+            return {}
+        replies = {}
+        if use_batch_api and supports_batch_api(self.openai_client):
+            started = time.monotonic()
+            try:
+                raw = run_openai_batch(
+                    self.openai_client,
+                    {cid: self._batch_request_body(model, prompt, len(ids)) for cid, (_, ids, prompt) in batches.items()},
+                    poll_interval_s=self.batch_poll_interval_s, timeout_s=self.batch_timeout_s)
+            except Exception as e:
+                print(f"OpenAI batch job failed: {e}. Sending packed requests directly.")
+            else:
+                elapsed = time.monotonic() - started
+                for cid, text in raw.items():
+                    if cid not in batches:
+                        continue
+                    try:
+                        parsed, repaired = parse_batch_extraction(text, batches[cid][1])
+                    except ExtractionParseError as e:
+                        print(f"Unparseable reply for {cid} in OpenAI batch job: {e}")
+                        continue
+                    replies[cid] = (parsed, {'method': 'openai', 'model': model, 'confidence': 0.85,
+                                             'batched': True, 'batch_api': True, 'json_repaired': repaired,
+                                             'extraction_time': elapsed,
+                                             'processing_timestamp': datetime.now().isoformat()})
+                return replies
+
+        def run(cid: str):
+            _, ids, prompt = batches[cid]
+            started = time.monotonic()
+
+            def attempt(provider: str, model: str):
+                try:
+                    return self._extract_batch_with(provider, model, prompt, ids)
+                except Exception:
+                    parse_stats.record_retry(started)
+                    raise
+            (parsed, repaired), (provider, used_model) = self.router.call(targets, attempt, tokens=prompt.prompt_tokens)
+            return parsed, {'method': provider, 'model': used_model, 'confidence': 0.85,
+                            'batched': True, 'batch_api': False, 'json_repaired': repaired,
+                            'extraction_time': time.monotonic() - started,
+                            'processing_timestamp': datetime.now().isoformat()}
+
+        with ThreadPoolExecutor(max_workers=max(1, min(self.batch_concurrency, len(batches))),
+                                thread_name_prefix='extract-batch') as pool:
+            futures = {cid: pool.submit(run, cid) for cid in batches}
+            for cid, future in futures.items():
+                try:
+                    replies[cid] = future.result()
+                except Exception as e:
+                    print(f"Packed extraction {cid} failed: {e}. Its meetings will be extracted individually.")
+        return replies
+
+    def _validate_prepared(self, result: Dict[str, Any], prepared, attendees: List[str] = None) -> Dict[str, Any]:
+        """Verify evidence against the text the model was sent and map spans back to the original."""
+        validated = self._validate_and_enhance_extraction(result, self.analyze(prepared.model_text), attendees)
+        if prepared.fillers.removed_count or prepared.model_offsets is not None:
+            for key in ('action_items', 'decisions', 'key_topics'):
+                for item in validated[key]:
+                    item['char_start'], item['char_end'] = prepared.to_original_span(item['char_start'], item['char_end'])
+        return validated
+
+    def _extract_enhanced_items_gemini(self, text: str, meeting_date: str = None, attendees: List[str] = None,
+                                       model: str = None) -> Dict[str, Any]:
+        """Extract action items, decisions, and key topics using Gemini API (schema-constrained output)."""
         from datetime import datetime
         
         start_time = datetime.now()
@@ -430,104 +1178,24 @@ Final Summary:"""
         if attendees:
             context_info += f"Attendees: {', '.join(attendees)}\n"
         
-        prompt = f"""Extract action items, decisions, and key topics from this meeting transcript. Return ONLY valid JSON in this exact format:
-
-{{
-  "action_items": [
-    {{
-      "task": "specific task description",
-      "owner": "person responsible",
-      "assignee": "person assigned",
-      "deadline": "deadline or timeframe",
-      "priority": "high/medium/low",
-      "status": "pending"
-    }}
-  ],
-  "decisions": [
-    {{
-      "decision": "what was decided",
-      "context": "background or reasoning",
-      "impact": "expected impact or outcome"
-    }}
-  ],
-  "key_topics": [
-    {{
-      "topic": "main topic discussed",
-      "summary": "brief summary of discussion",
-      "importance": "high/medium/low"
-    }}
-  ]
-}}
-
-{context_info}
-
-Meeting Transcript:
-{text}
-
-JSON Response:"""
-        
-        def _parse_json_text(raw: str):
-            s = (raw or '').strip()
-            if s.startswith('```json'):
-                s = s[7:]
-            if s.startswith('```'):
-                s = s[3:]
-            if s.endswith('```'):
-                s = s[:-3]
-            s = s.strip()
-            try:
-                return json.loads(s)
-            except json.JSONDecodeError:
-                first = s.find('{')
-                last = s.rfind('}')
-                if first != -1 and last != -1 and last > first:
-                    return json.loads(s[first:last+1])
-                raise
+        prepared = prepare_transcript(text)
+        used_model = model or self.gemini_model
+        prompt_obj = self.prompts.build('gemini_extraction', model=used_model,
+                                        transcript=prepared, context_info=context_info)
+        prompt = prompt_obj.text
         
-        def _try_with_model(model_name: str):
-            import google.generativeai as genai
-            mdl = model_name if model_name else self.gemini_model
-            client = self.gemini_client if mdl == self.gemini_model else genai.GenerativeModel(mdl)
-            resp = client.generate_content(prompt)
-            if not resp or not getattr(resp, 'text', None):
-                raise Exception('No response from Gemini')
-            return _parse_json_text(resp.text)
+        generation_config = gemini_generation_config(GeminiExtraction)
         
-        try:
-            result = _try_with_model(self.gemini_model)
-        except Exception as e:
-            print(f"Gemini extraction primary attempt failed on model {self.gemini_model}: {e}")
-            # Retry with a more permissive/faster model
-            try:
-                result = _try_with_model('gemini-1.5-flash')
-                # If successful, remember we used fallback model for metadata
-                used_model = 'gemini-1.5-flash'
-            except Exception as e2:
-                print(f"Gemini extraction fallback attempt failed: {e2}")
-                raise
-        else:
-            used_model = self.gemini_model
-        
-        # Validate and clean the result
-        action_items = result.get('action_items', [])
-        decisions = result.get('decisions', [])
-        key_topics = result.get('key_topics', [])
-        
-        for item in action_items:
-            item.setdefault('task', '')
-            item.setdefault('owner', '')
-            item.setdefault('assignee', '')
-            item.setdefault('deadline', '')
-            item.setdefault('priority', 'medium')
-            item.setdefault('status', 'pending')
-        for decision in decisions:
-            decision.setdefault('decision', '')
-            decision.setdefault('context', '')
-            decision.setdefault('impact', '')
-        for topic in key_topics:
-            topic.setdefault('topic', '')
-            topic.setdefault('summary', '')
-            topic.setdefault('importance', 'medium')
+        # Provider failover and retries are handled by the router
+        resp = self._gemini_model_client(used_model).generate_content(prompt, generation_config=generation_config)
+        if not resp or not getattr(resp, 'text', None):
+            raise Exception('No response from Gemini')
+        result, repaired = parse_extraction(resp.text, GeminiExtraction)
+        
+        # Items are already validated and defaulted by the schema
+        action_items = result['action_items']
+        decisions = result['decisions']
+        key_topics = result['key_topics']
         
         extraction_time = (datetime.now() - start_time).total_seconds()
         return {
@@ -538,11 +1206,14 @@ JSON Response:"""
                 'method': 'gemini',
                 'confidence': 0.9,
                 'extraction_time': extraction_time,
-                'model': used_model
+                'model': used_model,
+                'json_repaired': repaired,
+                'prompt': prompt_obj.stats()
             }
         }
 
-    def _extract_enhanced_items_openai(self, text: str, meeting_date: str = None, attendees: List[str] = None) -> Dict[str, Any]:
+    def _extract_enhanced_items_openai(self, text: str, meeting_date: str = None, attendees: List[str] = None,
+                                       model: str = None) -> Dict[str, Any]:
         """Extract action items, decisions, and key topics using OpenAI API with enhanced prompting."""
         from datetime import datetime
         start_time = datetime.now()
@@ -550,161 +1221,44 @@ JSON Response:"""
         meeting_date = meeting_date or datetime.now().isoformat()
         attendees_str = ", ".join(attendees) if attendees else "Unknown attendees"
         
-        system_prompt = """You are an expert meeting assistant that extracts concrete, actionable tasks, decisions, and key topics from meeting transcripts.
-You must return ONLY valid JSON matching the specified schema. Be precise and don't invent facts not present in the transcript."""
-        
-        def _normalize_for_model(t: str) -> str:
-            if not t:
-                return t
-            t = unicodedata.normalize('NFKC', t)
-            t = t.replace('\u2014', '-').replace('\u2013', '-')
-            t = t.replace('\u2018', "'").replace('\u2019', "'")
-            t = t.replace('\u201c', '"').replace('\u201d', '"')
-            return t
-            
-        text_for_model = _normalize_for_model(text)
-        
-        user_prompt = f"""Extract action items, decisions, and key topics from this meeting transcript.
-
-Meeting Context:
-- Date/Time: {meeting_date}
-- Attendees: {attendees_str}
-
-Transcript:\n{text_for_model}\n
-{text}
-
-Instructions:
-1. **ACTION ITEMS**: Extract concrete, actionable tasks with clear deliverables
-   - Must have verb + object (what needs to be done)
-   - Resolve pronouns to actual names when possible
-   - Convert relative dates to ISO dates using meeting date as reference
-   - Include confidence score (0-1) based on clarity
-   - Priority: P1 (urgent/critical), P2 (important), P3 (routine)
-   - Categories: UX, Infra, GTM, Ops, Research, Admin, Other
-
-2. **DECISIONS**: Extract explicit decisions made during the meeting
-   - Clear resolution or conclusion reached
-   - Decision rationale when mentioned
-   - Impact assessment if discussed
-   - Who made the decision (if stated)
-
-3. **KEY TOPICS**: Extract main discussion themes and subjects
-   - Primary topics that consumed significant discussion time
-   - Important themes or areas of focus
-   - Strategic topics or areas of concern
-   - Exclude trivial or very brief mentions
-
-4. **EVIDENCE**: All items must include exact quotes from transcript
-   - Quote must be verbatim from the source
-   - If you cannot provide a verbatim quote, omit the item
-   - Quotes should be 3-30 words for context
-
-Return ONLY a JSON object matching this exact schema:
-{{
-  "action_items": [
-    {{
-      "text": "Clear, imperative description of the task",
-      "owner": "Person name or null if unclear",
-      "due_date_iso": "YYYY-MM-DD or null if not specified",
-      "priority": "P1|P2|P3",
-      "confidence": 0.95,
-      "evidence_quote": "Exact quote from transcript",
-      "char_start": 0,
-      "char_end": 100,
-      "category": "UX|Infra|GTM|Ops|Research|Admin|Other",
-      "urgency_indicators": ["list of words/phrases indicating urgency"]
-    }}
-  ],
-  "decisions": [
-    {{
-      "decision": "Clear statement of what was decided",
-      "rationale": "Why this decision was made (if mentioned)",
-      "decision_maker": "Person or group who made decision",
-      "impact": "Expected impact or implications",
-      "confidence": 0.90,
-      "evidence_quote": "Exact quote supporting this decision",
-      "char_start": 0,
-      "char_end": 100,
-      "category": "Strategic|Operational|Technical|Process|Other"
-    }}
-  ],
-  "key_topics": [
-    {{
-      "topic": "Main topic or theme discussed",
-      "description": "Brief summary of what was discussed",
-      "duration_indicators": ["phrases suggesting extended discussion"],
-      "importance_level": "High|Medium|Low",
-      "confidence": 0.85,
-      "evidence_quote": "Quote showing this topic was discussed",
-      "char_start": 0,
-      "char_end": 100,
-      "category": "Strategic|Technical|Process|Business|Other"
-    }}
-  ],
-  "metadata": {{
-    "extraction_method": "openai",
-    "model_used": "{os.getenv('OPENAI_ACTION_MODEL', self.openai_action_model)}",
-    "total_confidence": 0.90,
-    "processing_notes": ["Any relevant processing observations"]
-  }}
-}}
-
-Rules:
-- Focus on future actions, not past accomplishments
-- Merge similar/duplicate items
-- Exclude completed items ("already done", "finished", etc.)
-- Limit to 20 most important items per category
-- Every item MUST have a verbatim evidence quote
-"""
+        action_model = model or os.getenv('OPENAI_ACTION_MODEL', self.openai_action_model)
+        # Send the (filler-stripped) transcript once; spans are verified against the
+        # cleaned text and mapped back to the original afterwards.
+        prepared = prepare_transcript(text, model=action_model)
+        prompt = self.prompts.build('openai_extraction', model=action_model, transcript=prepared,
+                                    meeting_date=meeting_date, attendees=attendees_str)
+        system_prompt, user_prompt = prompt.system, prompt.user
         
         try:
-            action_model = os.getenv('OPENAI_ACTION_MODEL', self.openai_action_model)
             print(f"Using OpenAI enhanced extraction model: {action_model}")
             
             response = self.openai_client.chat.completions.create(
                 model=action_model,
-                messages=[
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": user_prompt}
-                ],
+                messages=prompt.messages,
                 max_tokens=3000,
                 temperature=0.1,
-                response_format={"type": "json_object"}
+                response_format=openai_response_format(OpenAIExtraction)
             )
             
             response_text = response.choices[0].message.content.strip()
             
-            # Parse JSON response
+            # Schema-constrained output; malformed replies are repaired locally
             try:
-                if response_text.startswith('```json'):
-                    response_text = response_text[7:]
-                elif response_text.startswith('```'):
-                    response_text = response_text[3:]
-                if response_text.endswith('```'):
-                    response_text = response_text[:-3]
-                response_text = response_text.strip()
-                
-                try:
-                    result = json.loads(response_text)
-                except json.JSONDecodeError:
-                    first = response_text.find('{')
-                    last = response_text.rfind('}')
-                    if first != -1 and last != -1 and last > first:
-                        result = json.loads(response_text[first:last+1])
-                    else:
-                        raise
-            except json.JSONDecodeError as e:
+                result, repaired = parse_extraction(response_text, OpenAIExtraction)
+            except ExtractionParseError as e:
                 print(f"Failed to parse OpenAI response as JSON: {e}")
                 print(f"Raw response: {response_text}")
                 raise
             
             # Validate and enhance the response
-            validated_result = self._validate_and_enhance_extraction(result, text, attendees)
+            validated_result = self._validate_prepared(result, prepared, attendees)
             
             # Add processing metadata
             processing_time = (datetime.now() - start_time).total_seconds()
             validated_result['metadata']['extraction_time'] = processing_time
             validated_result['metadata']['processing_timestamp'] = datetime.now().isoformat()
+            validated_result['metadata']['json_repaired'] = repaired
+            validated_result['metadata']['prompt'] = prompt.stats()
             
             return validated_result
             
@@ -719,7 +1273,7 @@ Rules:
             msg = str(e)
             if '401' in msg or 'invalid_api_key' in msg.lower():
                 try:
-                    new_key = (dotenv_values(find_dotenv()) or {}).get('OPENAI_API_KEY')
+                    new_key = dotenv_value('OPENAI_API_KEY')
                     if new_key and new_key != self.openai_api_key:
                         from openai import OpenAI
                         self.openai_api_key = new_key
@@ -824,25 +1378,27 @@ Rules:
             print(f"OpenAI API call failed: {e}")
             raise
     
-    def _extract_action_items_rule_based(self, text: str) -> List[Dict[str, Any]]:
+    def _extract_action_items_rule_based(self, text: Union[str, AnalyzedDocument],
+                                         attendees: List[str] = None) -> List[Dict[str, Any]]:
         """Extract action items from text using rule-based patterns (fallback method)."""
-        if not text:
+        doc = self.analyze(text)
+        if not doc.text:
             return []
+        # Every attendee mention, found in one pass up front
+        matcher = matcher_for(attendees)
+        mentions = MentionIndex(matcher.document_mentions(doc)) if matcher else None
         
         action_items = []
         seen_items = set()  # To avoid duplicates
         
-        # Split text into sentences
-        sentences = re.split(r'[.!?]+', text)
-        
-        for sentence in sentences:
-            sentence = sentence.strip()
-            if not sentence or len(sentence) < 10:
+        for span in doc.sentences:
+            sentence = span.text
+            if len(sentence) < 10:
                 continue
+            sentence_completed = None
                 
-            # Check each pattern
-            for pattern in self.action_patterns:
-                matches = re.finditer(pattern, sentence, re.IGNORECASE)
+            # One scan of the sentence finds every pattern's matches, visited in pattern order
+            for matches in self._action_rules.scan(doc.text, span.start, span.end):
                 for match in matches:
                     # Extract the action text
                     action_text = ''
@@ -857,31 +1413,28 @@ Rules:
                         continue
                     
                     # Clean up the action text
-                    action_text = re.sub(r'^[-•*\s]+', '', action_text)
+                    action_text = _BULLET_PREFIX_RE.sub('', action_text)
                     action_text = action_text.strip()
                     
                     # Split multi-owner/commitment fragments
-                    fragments = re.split(r";\s*", action_text)
+                    fragments = _SEMICOLON_SPLIT_RE.split(action_text)
                     refined: List[str] = []
                     for frag in fragments:
-                        parts = re.split(r",?\s+and\s+(?=[A-Z][a-z]+\b)", frag)
+                        parts = _OWNER_SPLIT_RE.split(frag)
                         refined.extend([p.strip() for p in parts if p.strip()])
                     if not refined:
                         refined = [action_text]
                     
                     for frag in refined:
                         # Skip items that look already completed
-                        if self._is_completed_statement(sentence) or self._is_completed_statement(frag):
+                        if sentence_completed is None:
+                            sentence_completed = self._is_completed_statement(sentence)
+                        if sentence_completed or self._is_completed_statement(frag):
                             continue
                         # Skip if too short or already seen
                         key = frag.lower()
                         if len(frag) > 10 and key not in seen_items:
-                            # Try to extract assignee from the fragment first, then from full sentence
-                            assignee = None
-                            for token in (frag, sentence):
-                                assignee = assignee or self._extract_assignee(token)
-                                if assignee:
-                                    break
+                            assignee = self._attribute_assignee(doc, span, frag, matcher, mentions)
                             # Try to extract deadline from the fragment
                             deadline = self._extract_deadline(frag) or self._extract_deadline(sentence)
                             action_item = {
@@ -896,39 +1449,39 @@ Rules:
         
         return action_items
     
-    def _validate_and_enhance_extraction(self, result: Dict[str, Any], text: str, attendees: List[str] = None) -> Dict[str, Any]:
+    def _attribute_assignee(self, doc: AnalyzedDocument, span, frag: str, matcher=None,
+                            mentions: MentionIndex = None) -> Optional[str]:
+        """Owner of an action fragment, looked for in the fragment first, then the full sentence.
+
+        A named subject ("Bob will ...") wins; with attendees it is mapped to
+        the attendee it refers to, an attendee mentioned nearby comes next,
+        and a first-person commitment goes to the speaker of that turn.
+        """
+        frag_start = doc.text.find(frag, span.start, span.end)
+        for token, start, end in ((frag, frag_start, frag_start + len(frag)), (span.text, span.start, span.end)):
+            name = self._extract_assignee(token)
+            if name:
+                return (matcher.canonical(name) or name) if matcher else name
+            if matcher is not None and start >= 0:
+                mentioned = mentions.first_within(start, end)
+                if mentioned:
+                    return mentioned
+        if matcher is not None:
+            first_person = _FIRST_PERSON_RE.search(span.text)
+            turn = turn_at(doc.speaker_turns, span.start + first_person.start()) if first_person else None
+            if turn is not None:
+                return matcher.canonical(turn.speaker) or turn.speaker
+        return None
+    
+    def _validate_and_enhance_extraction(self, result: Dict[str, Any], text: Union[str, AnalyzedDocument],
+                                         attendees: List[str] = None) -> Dict[str, Any]:
         """Validate and enhance the extracted items with evidence verification and quality checks."""
-        transcript = text or ""
-        transcript_lower = transcript.lower()
-        attendee_set = set(attendees or [])
-        
-        def _build_flexible_regex(ev: str) -> Optional[re.Pattern]:
-            tokens = [t for t in re.findall(r"\w+", ev) if t]
-            if len(tokens) < 2 or len(tokens) > 25:
-                return None
-            parts = [r"\b" + re.escape(tok) + r"\b" for tok in tokens]
-            sep = r"[\s\.,;:!\?\-–—'\"/\\()\[\]]+"
-            pattern = sep.join(parts)
-            try:
-                return re.compile(pattern, re.IGNORECASE)
-            except Exception:
-                return None
-        
-        def find_span(ev: str):
-            if not ev:
-                return None
-            ev_norm = ev.strip()
-            # Simple case-insensitive exact match first
-            idx = transcript_lower.find(ev_norm.lower())
-            if idx >= 0:
-                return idx, idx + len(ev_norm)
-            # Flexible regex match
-            regex = _build_flexible_regex(ev_norm)
-            if regex:
-                m = regex.search(transcript)
-                if m:
-                    return m.start(), m.end()
-            return None
+        doc = self.analyze(text)
+        matcher = matcher_for(attendees)
+        mentions = matcher.document_mentions(doc) if matcher else []
+        mention_index = MentionIndex(mentions)
+        # Exact match first, then word-by-word ignoring punctuation/whitespace (indexed lookup)
+        find_span = doc.find_evidence
         
         validated_result = {
             'action_items': [],
@@ -946,9 +1499,13 @@ Rules:
                     continue
                 
                 start, end = span
+                owner = item.get('owner')
+                if matcher is not None:
+                    # "Bob" -> "Robert Smith"; an unnamed owner falls to the attendee named in the evidence
+                    owner = matcher.canonical(owner) or owner or mention_index.first_within(start, end)
                 enhanced_item = {
                     'text': str(item.get('text', '')),
-                    'owner': item.get('owner') or 'Unassigned',
+                    'owner': owner or 'Unassigned',
                     'due_date_iso': item.get('due_date_iso') or None,
                     'priority': item.get('priority', 'P3'),
                     'confidence': float(item.get('confidence', 0.7)),
@@ -957,7 +1514,7 @@ Rules:
                     'char_end': end,
                     'category': item.get('category', 'Other'),
                     'urgency_indicators': item.get('urgency_indicators', []),
-                    'assignee': item.get('owner') or 'Unassigned',  # Legacy compatibility
+                    'assignee': owner or 'Unassigned',  # Legacy compatibility
                     'deadline': item.get('due_date_iso') or 'No deadline specified'  # Legacy compatibility
                 }
                 
@@ -1019,10 +1576,18 @@ Rules:
         validated_result['decisions'] = validated_result['decisions'][:15]
         validated_result['key_topics'] = validated_result['key_topics'][:10]
         
+        if matcher is not None:
+            validated_result['metadata'] = {
+                **validated_result['metadata'],
+                'attendee_stats': attendee_stats(doc, matcher, mentions, validated_result['action_items']),
+            }
         return validated_result
     
-    def _extract_enhanced_items_rule_based(self, text: str, meeting_date: str = None, attendees: List[str] = None) -> Dict[str, Any]:
+    def _extract_enhanced_items_rule_based(self, text: Union[str, AnalyzedDocument], meeting_date: str = None,
+                                           attendees: List[str] = None) -> Dict[str, Any]:
         """Enhanced rule-based extraction for action items, decisions, and topics as fallback."""
+        doc = self.analyze(text)
+        text = doc.text
         if not text:
             return {
                 'action_items': [],
@@ -1035,19 +1600,16 @@ Rules:
         start_time = datetime.now()
         
         # Use legacy rule-based action item extraction
-        legacy_action_items = self._extract_action_items_rule_based(text)
+        legacy_action_items = self._extract_action_items_rule_based(doc, attendees)
         
-        # Extract decisions using rule-based patterns
-        decision_patterns = [
-            r'\b(decided|agreed|concluded|determined|resolved)\s+(?:to|that|on)\s+([^.!?]{10,100})',
-            r'\b(decision|resolution|agreement)[:]*\s*([^.!?]+)',
-            r'\b(we\s+will|let\'s|going\s+to|plan\s+to)\s+([^.!?]{10,100})',
-            r'\b(consensus|unanimous|majority)\s+(?:is|was|to)\s+([^.!?]{10,100})'
-        ]
+        # Decision and topic patterns share one scan of the transcript
+        scanned = _DECISION_TOPIC_RULES.scan(text)
+        decision_matches = scanned[:len(_DECISION_PATTERNS)]
+        topic_matches = scanned[len(_DECISION_PATTERNS):]
         
+        # Extract decisions using rule-based patterns
         decisions = []
-        for pattern in decision_patterns:
-            matches = re.finditer(pattern, text, re.IGNORECASE)
+        for matches in decision_matches:
             for match in matches:
                 decision_text = match.group(2).strip() if len(match.groups()) >= 2 else match.group(1).strip()
                 if len(decision_text) > 10:
@@ -1064,16 +1626,9 @@ Rules:
                     })
         
         # Extract key topics using rule-based patterns
-        topic_patterns = [
-            r'\b(discuss|talking\s+about|focus\s+on|regarding|concerning)\s+([^.!?]{5,50})',
-            r'\b(topic|subject|issue|matter|question)\s*[:]*\s*([^.!?]+)',
-            r'\b(main\s+point|key\s+issue|important\s+aspect)\s*[:]*\s*([^.!?]+)'
-        ]
-        
         topics = []
         topic_set = set()
-        for pattern in topic_patterns:
-            matches = re.finditer(pattern, text, re.IGNORECASE)
+        for matches in topic_matches:
             for match in matches:
                 topic_text = match.group(2).strip() if len(match.groups()) >= 2 else match.group(1).strip()
                 topic_key = topic_text.lower()[:50]
@@ -1092,17 +1647,21 @@ Rules:
                     })
         
         processing_time = (datetime.now() - start_time).total_seconds()
+        metadata = {
+            'method': 'rule_based',
+            'confidence': 0.5,
+            'extraction_time': processing_time,
+            'processing_timestamp': datetime.now().isoformat()
+        }
+        matcher = matcher_for(attendees)
+        if matcher is not None:
+            metadata['attendee_stats'] = attendee_stats(doc, matcher, matcher.document_mentions(doc), legacy_action_items)
         
         return {
             'action_items': legacy_action_items,
             'decisions': decisions[:15],
             'key_topics': topics[:10],
-            'metadata': {
-                'method': 'rule_based',
-                'confidence': 0.5,
-                'extraction_time': processing_time,
-                'processing_timestamp': datetime.now().isoformat()
-            }
+            'metadata': metadata
         }
     
     def _is_completed_statement(self, text: str) -> bool:
@@ -1128,6 +1687,10 @@ Rules:
         
         merged = []
         processed_indices = set()
+        texts = [item['text'].lower() for item in items]
+        # MinHash/LSH narrows each item's comparisons to likely near-duplicates
+        index = NearDuplicateIndex(texts)
+        matcher = difflib.SequenceMatcher(None)
         
         for i, item1 in enumerate(items):
             if i in processed_indices:
@@ -1136,16 +1699,19 @@ Rules:
             # Start with the current item
             merged_item = item1.copy()
             similar_items = [item1]
+            matcher.set_seq1(texts[i])
             
             # Find similar items
-            for j, item2 in enumerate(items[i+1:], start=i+1):
+            for j in index.candidates(i):
                 if j in processed_indices:
                     continue
+                item2 = items[j]
                     
-                # Calculate similarity
-                similarity = difflib.SequenceMatcher(None, 
-                    item1['text'].lower(), 
-                    item2['text'].lower()).ratio()
+                # Calculate similarity (quick_ratio is an upper bound, so it can only rule pairs out)
+                matcher.set_seq2(texts[j])
+                if matcher.real_quick_ratio() <= 0.7 or matcher.quick_ratio() <= 0.7:
+                    continue
+                similarity = matcher.ratio()
                 
                 # If similar enough, merge
                 if similarity > 0.7:
@@ -1224,9 +1790,7 @@ Rules:
     
     def _extract_assignee(self, text: str) -> str:
         """Extract assignee from text."""
-        # Look for names (capitalized words) before action verbs
-        pattern = r'\b([A-Z][a-z]+(?:\s+[A-Z][a-z]+)?)\s+(?:will|should|needs to|must|to)\s+'
-        match = re.search(pattern, text)
+        match = _ASSIGNEE_RE.search(text)
         if match:
             name = match.group(1)
             # Filter out common non-name words
@@ -1236,33 +1800,20 @@ Rules:
     
     def _extract_deadline(self, text: str) -> str:
         """Extract deadline from text."""
-        # Look for date patterns
-        patterns = [
-            r'by\s+(Monday|Tuesday|Wednesday|Thursday|Friday|Saturday|Sunday)',
-            r'by\s+(tomorrow|today|next week|next month|end of day|EOD|COB)',
-            r'by\s+(January|February|March|April|May|June|July|August|September|October|November|December)\s+\d+',
-            r'by\s+(\d{1,2}/\d{1,2}(?:/\d{2,4})?)',
-            r'before\s+(Monday|Tuesday|Wednesday|Thursday|Friday|Saturday|Sunday)',
-            r'deadline[:\s]+([\w\s]+?)(?:[,.]|$)',
-            r'due\s+([\w\s]+?)(?:[,.]|$)',
-        ]
-        
-        for pattern in patterns:
-            match = re.search(pattern, text, re.IGNORECASE)
-            if match:
-                return match.group(1).strip()
+        # Earliest-listed date pattern wins, as if each were tried in turn
+        match = _DEADLINE_RULES.first(text)
+        if match:
+            return match.group(1).strip()
         return None
     
-    def extract_keywords(self, text: str, num_keywords: int = 10) -> List[str]:
+    def extract_keywords(self, text: Union[str, AnalyzedDocument], num_keywords: int = 10) -> List[str]:
         """Extract keywords using TF-IDF."""
-        if not text:
+        doc = self.analyze(text)
+        if not doc.text:
             return []
         
-        # Tokenize and clean text
-        words = re.findall(r'\b[a-z]+\b', text.lower())
-        
         # Filter out stop words and short words
-        words = [w for w in words if w not in self.stop_words and len(w) > 3]
+        words = [w for w in doc.words if w not in self.stop_words and len(w) > 3]
         
         if not words:
             return []
@@ -1271,12 +1822,16 @@ Rules:
         word_freq = Counter(words)
         total_words = len(words)
         
-        # Calculate TF-IDF scores (simplified version)
+        # Calculate TF-IDF scores, with IDF from the stored meetings when there are enough of them
         tfidf_scores = {}
+        corpus = self.corpus_idf if self.corpus_idf is not None and self.corpus_idf.ready else None
         for word, freq in word_freq.items():
             tf = freq / total_words
-            # Simple IDF: penalize very common words
-            idf = math.log(total_words / (1 + freq)) if freq < total_words * 0.5 else 0.1
+            if corpus is not None:
+                idf = corpus.idf(word)
+            else:
+                # Simple IDF: penalize very common words
+                idf = math.log(total_words / (1 + freq)) if freq < total_words * 0.5 else 0.1
             tfidf_scores[word] = tf * idf
         
         # Get top keywords
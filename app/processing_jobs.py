@@ -0,0 +1,118 @@
+"""
+In-process registry of long-running processing jobs.
+
+POST /meetings/process returns a job id straight away and runs upload ->
+transcript -> analysis -> saved meeting on the server. The pipeline
+reports its stage and progress here, and GET /jobs/{job_id} reads it, so
+the transcript never has to travel back to the browser and forth again.
+Finished jobs are kept for JOB_RETENTION_S seconds.
+
+Queued jobs hold their upload in memory until a processing slot frees
+up, so at most PROCESS_JOB_MAX_ACTIVE jobs may be queued or running at
+once; create() refuses more with JobQueueFull (served as 503).
+"""
+
+import asyncio
+import os
+import threading
+import time
+import uuid
+from dataclasses import dataclass, field
+from typing import Any, Dict, Optional
+
+QUEUED = 'queued'
+RUNNING = 'running'
+DONE = 'done'
+FAILED = 'failed'
+
+
+class JobQueueFull(RuntimeError):
+    """Raised by create() when as many jobs are queued or running as the registry admits."""
+
+
+@dataclass
+class ProcessingJob:
+    id: str
+    user_id: str
+    kind: str
+    status: str = QUEUED
+    stage: Optional[str] = None
+    progress: float = 0.0
+    result: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+    created_at: float = field(default_factory=time.time)
+    updated_at: float = field(default_factory=time.time)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'job_id': self.id,
+            'kind': self.kind,
+            'status': self.status,
+            'stage': self.stage,
+            'progress': round(self.progress, 3),
+            'result': self.result,
+            'error': self.error,
+            'created_at': self.created_at,
+            'updated_at': self.updated_at,
+        }
+
+
+class JobRegistry:
+    """Thread-safe job table; pipelines update it from the event loop or worker threads."""
+
+    def __init__(self, retention_s: float = None, max_active: int = None):
+        self.retention_s = retention_s if retention_s is not None else float(os.getenv('JOB_RETENTION_S', '3600'))
+        self.max_active = max_active or int(os.getenv('PROCESS_JOB_MAX_ACTIVE', '10'))
+        self._jobs: Dict[str, ProcessingJob] = {}
+        self._tasks: Dict[str, asyncio.Task] = {}
+        self._lock = threading.Lock()
+
+    def create(self, user_id: str, kind: str) -> ProcessingJob:
+        job = ProcessingJob(id=uuid.uuid4().hex, user_id=user_id, kind=kind)
+        with self._lock:
+            self._prune(time.time())
+            active = sum(1 for j in self._jobs.values() if j.status in (QUEUED, RUNNING))
+            if active >= self.max_active:
+                raise JobQueueFull(f"{active} processing jobs already queued or running")
+            self._jobs[job.id] = job
+        return job
+
+    def track(self, job_id: str, task: asyncio.Task):
+        """Hold a reference to the job's task (the loop only keeps weak ones) until it finishes."""
+        self._tasks[job_id] = task
+        task.add_done_callback(lambda _: self._tasks.pop(job_id, None))
+
+    async def cancel_all(self):
+        tasks = list(self._tasks.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    def get(self, job_id: str) -> Optional[ProcessingJob]:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def update(self, job_id: str, **changes) -> Optional[ProcessingJob]:
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return None
+            for key, value in changes.items():
+                setattr(job, key, value)
+            job.updated_at = time.time()
+            return job
+
+    def stage(self, job_id: str, stage: str, progress: float):
+        self.update(job_id, status=RUNNING, stage=stage, progress=progress)
+
+    def finish(self, job_id: str, result: Dict[str, Any]):
+        self.update(job_id, status=DONE, stage=DONE, progress=1.0, result=result)
+
+    def fail(self, job_id: str, error: str):
+        self.update(job_id, status=FAILED, error=error)
+
+    def _prune(self, now: float):
+        expired = [jid for jid, job in self._jobs.items()
+                   if job.status in (DONE, FAILED) and now - job.updated_at > self.retention_s]
+        for jid in expired:
+            del self._jobs[jid]
@@ -0,0 +1,586 @@
+"""
+Prompt construction for LLM providers.
+
+Assembles every provider prompt from a named template, strips ASR filler
+("um", "uh", stuttered repeats) with a reversible mapping, and counts tokens
+before the request is sent so each call can report what it cost and saved.
+"""
+
+import bisect
+import re
+import threading
+import unicodedata
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+
+# ============= Token Counting =============
+
+@lru_cache(maxsize=16)
+def _get_encoding(model: Optional[str]):
+    """Return a tiktoken encoding for the model, or None if tiktoken is unavailable."""
+    try:
+        import tiktoken
+    except ImportError:
+        return None
+    try:
+        return tiktoken.encoding_for_model(model) if model else tiktoken.get_encoding('cl100k_base')
+    except Exception:
+        return tiktoken.get_encoding('cl100k_base')
+
+
+def count_tokens(text: str, model: Optional[str] = None) -> int:
+    """Count tokens for a prompt.
+
+    Uses tiktoken when installed; otherwise falls back to the common
+    ~4 characters per token estimate, which is close enough for budgeting.
+    """
+    if not text:
+        return 0
+    encoding = _get_encoding(model)
+    if encoding is not None:
+        return len(encoding.encode(text, disallowed_special=()))
+    return max(1, (len(text) + 3) // 4)
+
+
+# ============= Filler Removal =============
+
+_FILLER_OR_STUTTER_RE = re.compile(
+    r"(?P<lead>[ \t]*)\b(?P<filler>(?:u+m+|u+h+|e+r+m+|h+m+|m{2,}|a+h+))\b,?"
+    r"|\b(?P<word>[A-Za-z']+)(?P<repeat>(?:(?:[ \t]*[,\-][ \t]*|[ \t]+)(?P=word)\b)+)",
+    re.IGNORECASE,
+)
+_REPEAT_SEP_RE = re.compile(r"[ \t]*[,\-][ \t]*|[ \t]+")
+# Words that are doubled only by a stutter. Others ("that that", "had had",
+# "bye bye") can be grammatical, so their doubles are kept; runs of three or
+# more, and cut-off restarts ("I- I"), are stutters whatever the word.
+_STUTTER_WORDS = frozenset({
+    'a', 'an', 'the', 'i', "i'm", 'we', 'you', 'he', 'she', 'they', 'it', "it's", 'my', 'our', 'your',
+    'to', 'of', 'in', 'on', 'at', 'for', 'with', 'and', 'but', 'or', 'so', 'if', 'this', 'will', 'can',
+})
+
+
+@dataclass
+class FillerMap:
+    """Reversible record of what was removed from a transcript.
+
+    `removed` holds (original_start, original_end) spans in ascending order.
+    """
+    original: str
+    removed: List[Tuple[int, int]] = field(default_factory=list)
+    _clean_starts: List[int] = field(default_factory=list, repr=False)
+    _orig_starts: List[int] = field(default_factory=list, repr=False)
+
+    def __post_init__(self):
+        # Kept segments, recorded as parallel (clean offset, original offset) lists
+        clean_pos = 0
+        orig_pos = 0
+        for start, end in self.removed:
+            self._clean_starts.append(clean_pos)
+            self._orig_starts.append(orig_pos)
+            clean_pos += start - orig_pos
+            orig_pos = end
+        self._clean_starts.append(clean_pos)
+        self._orig_starts.append(orig_pos)
+
+    @property
+    def removed_count(self) -> int:
+        return len(self.removed)
+
+    def to_original_offset(self, clean_offset: int) -> int:
+        """Map an offset in the cleaned text back to the original transcript."""
+        idx = bisect.bisect_right(self._clean_starts, clean_offset) - 1
+        idx = max(idx, 0)
+        return self._orig_starts[idx] + (clean_offset - self._clean_starts[idx])
+
+    def to_original_span(self, start: int, end: int) -> Tuple[int, int]:
+        """Map a [start, end) span in the cleaned text back to the original transcript."""
+        if end <= start:
+            orig = self.to_original_offset(start)
+            return orig, orig
+        return self.to_original_offset(start), self.to_original_offset(end - 1) + 1
+
+    def restore(self, clean: str) -> str:
+        """Re-insert the removed filler into `clean`, reproducing the original transcript."""
+        parts: List[str] = []
+        for idx, (start, end) in enumerate(self.removed):
+            parts.append(clean[self._clean_starts[idx]:self._clean_starts[idx + 1]])
+            parts.append(self.original[start:end])
+        parts.append(clean[self._clean_starts[-1]:])
+        return ''.join(parts)
+
+
+def _kept_text_before(text: str, removed: List[Tuple[int, int]], pos: int) -> str:
+    """Text before `pos` as it will read once the adjacent removed spans are gone, trailing blanks trimmed."""
+    i = len(removed) - 1
+    while i >= 0 and removed[i][1] >= pos:
+        pos = min(pos, removed[i][0])
+        i -= 1
+    return text[:pos].rstrip(' \t')
+
+
+def strip_fillers(text: str) -> Tuple[str, FillerMap]:
+    """Remove filler words and repeated ASR stutters in a single scan.
+
+    Returns the cleaned text and a FillerMap that maps cleaned offsets back
+    to the original text.
+    """
+    if not text:
+        return text or '', FillerMap(original=text or '')
+
+    removed: List[Tuple[int, int]] = []
+    last_end = 0
+    for m in _FILLER_OR_STUTTER_RE.finditer(text):
+        if m.group('filler'):
+            start, end = m.start(), m.end()
+            # Filler at the start of a line: also drop the whitespace that follows it
+            if not m.group('lead'):
+                while end < len(text) and text[end] in ' \t':
+                    end += 1
+            if end < len(text) and text[end] in '.!?':
+                before = _kept_text_before(text, removed, start)
+                if before[-1:] in ('', '.', '!', '?', '\n'):
+                    # A filler that was the whole sentence ("Bye. Mm, hmm.") takes its full stop with it
+                    end += 1
+                elif before.endswith(',') and len(before) > last_end:
+                    # "No, uh." -> "No." rather than "No,."
+                    start = len(before) - 1
+        else:
+            repeat = m.group('repeat')
+            seps = _REPEAT_SEP_RE.findall(repeat)
+            if len(seps) < 2 and '-' not in repeat and m.group('word').lower() not in _STUTTER_WORDS:
+                continue
+            # Keep the first occurrence of a stuttered word, drop the repeats
+            start, end = m.start('repeat'), m.end('repeat')
+        start = max(start, last_end)
+        if start < end:
+            removed.append((start, end))
+            last_end = end
+
+    if not removed:
+        return text, FillerMap(original=text)
+
+    parts: List[str] = []
+    pos = 0
+    for start, end in removed:
+        parts.append(text[pos:start])
+        pos = end
+    parts.append(text[pos:])
+    return ''.join(parts), FillerMap(original=text, removed=removed)
+
+
+_MODEL_CHARS = {'—': '-', '–': '-', '‘': "'", '’': "'", '“': '"', '”': '"'}
+
+
+def _normalize_with_offsets(text: str) -> Tuple[str, Optional[List[int]]]:
+    """normalize_for_model(text), plus the offset in `text` each output character came from.
+
+    Offsets are None when the text comes back unchanged; otherwise they end
+    with len(text). Characters are normalized with their combining marks, so
+    NFKC can change lengths (ligatures, ellipses) without losing track.
+    """
+    if not text or text.isascii():
+        return text, None
+    parts: List[str] = []
+    offsets: List[int] = []
+    i, n = 0, len(text)
+    while i < n:
+        j = i + 1
+        while j < n and unicodedata.combining(text[j]):
+            j += 1
+        cluster = ''.join(_MODEL_CHARS.get(c, c) for c in unicodedata.normalize('NFKC', text[i:j]))
+        parts.append(cluster)
+        offsets.extend([i] * len(cluster))
+        i = j
+    normalized = ''.join(parts)
+    if normalized == text:
+        return text, None
+    offsets.append(n)
+    return normalized, offsets
+
+
+def normalize_for_model(text: str) -> str:
+    """Normalize typography so the model sees plain ASCII dashes and quotes."""
+    return _normalize_with_offsets(text)[0]
+
+
+@dataclass
+class PreparedTranscript:
+    """A transcript ready to be embedded in prompts."""
+    original: str
+    clean: str
+    model_text: str
+    fillers: FillerMap
+    original_tokens: int
+    clean_tokens: int
+    # Offset in `clean` of each model_text character (None when they are the same text)
+    model_offsets: Optional[List[int]] = None
+
+    @property
+    def tokens_saved(self) -> int:
+        return max(0, self.original_tokens - self.clean_tokens)
+
+    def to_original_span(self, start: int, end: int) -> Tuple[int, int]:
+        """Map a [start, end) span in model_text (what the model quoted from) back to the original transcript."""
+        offsets = self.model_offsets
+        if offsets is not None:
+            last = len(offsets) - 1
+            start, end = min(max(start, 0), last), min(max(end, 0), last)
+            if end <= start:
+                start = end = offsets[start]
+            else:
+                # A span ending inside one character's expansion still covers that character
+                start, end = offsets[start], max(offsets[end], offsets[end - 1] + 1)
+        return self.fillers.to_original_span(start, end) if self.fillers.removed_count else (start, end)
+
+
+def prepare_transcript(text: str, model: Optional[str] = None, remove_fillers: bool = True) -> PreparedTranscript:
+    """Strip fillers and normalize a transcript once per request."""
+    text = text or ''
+    if remove_fillers:
+        clean, fillers = strip_fillers(text)
+    else:
+        clean, fillers = text, FillerMap(original=text)
+    original_tokens = count_tokens(text, model)
+    clean_tokens = original_tokens if clean is text else count_tokens(clean, model)
+    model_text, model_offsets = _normalize_with_offsets(clean)
+    return PreparedTranscript(
+        original=text,
+        clean=clean,
+        model_text=model_text,
+        fillers=fillers,
+        original_tokens=original_tokens,
+        clean_tokens=clean_tokens,
+        model_offsets=model_offsets,
+    )
+
+
+# ============= Templates =============
+
+@dataclass(frozen=True)
+class PromptTemplate:
+    """A named prompt. `user` is formatted with str.format; literal braces are doubled."""
+    name: str
+    user: str
+    system: Optional[str] = None
+
+
+_SUMMARY_SYSTEM = "You are an expert meeting summarizer. Attribute information to speakers when names are present and extract clear, owner-tagged action items."
+
+TEMPLATES: Dict[str, PromptTemplate] = {t.name: t for t in [
+    PromptTemplate(
+        name='gemini_summary',
+        user="""Summarize the following meeting transcript. Include explicit person attributions wherever possible.
+
+Requirements:
+- Start with a tight executive summary (3-5 sentences).
+- Then list Action Items as bullets in the form: "Owner: <Name> — <Task> (Due: <date or n/a>)".
+- Call out Decisions with who proposed/approved when identifiable.
+- Prefer names exactly as they appear in the transcript; do not invent roles.
+- Keep it faithful and concise (~{min_words}-{max_words} words total).
+
+Transcript:
+{transcript}
+
+Summary:""",
+    ),
+    PromptTemplate(
+        name='gemini_summary_chunk',
+        user="""Summarize chunk {index}/{total} of a meeting transcript. Focus on key decisions, action items, deadlines, and important outcomes. Be comprehensive but concise.
+
+Chunk:
+{transcript}
+
+Summary:""",
+    ),
+    PromptTemplate(
+        name='gemini_summary_synthesis',
+        user="""Synthesize these meeting summary chunks into a coherent, comprehensive summary. Create a well-structured summary that captures all key points, decisions, action items, and outcomes. Aim for approximately {min_words} to {max_words} words, but prioritize completeness and clarity over strict word count.
+
+{summaries}
+
+Final Summary:""",
+    ),
+    PromptTemplate(
+        name='openai_summary',
+        system=_SUMMARY_SYSTEM,
+        user="Summarize the following meeting transcript with named attributions and an action list.\nRequirements:\n- Executive summary (3-5 sentences).\n- Bulleted Action Items in the form: 'Owner: <Name> — <Task> (Due: <date or n/a>)'.\n- Decisions with proposer/approver if identifiable.\n- Use names exactly as they appear; do not invent roles.\n- ~{min_words}-{max_words} words total.\n\nTranscript:\n{transcript}",
+    ),
+    PromptTemplate(
+        name='openai_summary_chunk',
+        system="You summarize meeting transcripts faithfully with speaker attributions and owner-tagged action items.",
+        user="Summarize chunk {index}/{total} in 80-120 words. Include names when present, decisions with attributions, and any action items in 'Owner: <Name> — <Task> (Due: <date or n/a>)' format.\n\nChunk:\n{transcript}",
+    ),
+    PromptTemplate(
+        name='openai_summary_synthesis',
+        system="You are an expert meeting summarizer. Attribute items to named people where possible.",
+        user="Given these chunk summaries, write a single, coherent summary (~{max_words} words).\nInclude: executive summary, named attributions, and an 'Action Items' bullet list (Owner: <Name> — <Task> (Due: ...)). Avoid repetition.\n\nChunk summaries:\n{summaries}",
+    ),
+    PromptTemplate(
+        name='gemini_summary_update',
+        user="""You are keeping a running summary of a meeting that is still in progress. Update the summary below with the new part of the transcript.
+
+Requirements:
+- Keep everything in the current summary that is still true; revise points the new part changes.
+- Keep the structure: executive summary, then Action Items as "Owner: <Name> — <Task> (Due: <date or n/a>)", then Decisions.
+- Prefer names exactly as they appear in the transcript; do not invent roles.
+- Stay within ~{max_words} words total.
+
+Current summary:
+{summary}
+
+New transcript:
+{transcript}
+
+Updated summary:""",
+    ),
+    PromptTemplate(
+        name='openai_summary_update',
+        system=_SUMMARY_SYSTEM,
+        user="Update the running summary of an in-progress meeting with the new part of the transcript.\nRequirements:\n- Keep points that are still true; revise what the new part changes.\n- Keep the structure: executive summary, Action Items as 'Owner: <Name> — <Task> (Due: <date or n/a>)', Decisions.\n- Use names exactly as they appear; do not invent roles.\n- ~{max_words} words total.\n\nCurrent summary:\n{summary}\n\nNew transcript:\n{transcript}",
+    ),
+    PromptTemplate(
+        name='gemini_extraction',
+        user="""Extract action items, decisions, and key topics from this meeting transcript. Return ONLY valid JSON in this exact format:
+
+{{
+  "action_items": [
+    {{
+      "task": "specific task description",
+      "owner": "person responsible",
+      "assignee": "person assigned",
+      "deadline": "deadline or timeframe",
+      "priority": "high/medium/low",
+      "status": "pending"
+    }}
+  ],
+  "decisions": [
+    {{
+      "decision": "what was decided",
+      "context": "background or reasoning",
+      "impact": "expected impact or outcome"
+    }}
+  ],
+  "key_topics": [
+    {{
+      "topic": "main topic discussed",
+      "summary": "brief summary of discussion",
+      "importance": "high/medium/low"
+    }}
+  ]
+}}
+
+{context_info}
+
+Meeting Transcript:
+{transcript}
+
+JSON Response:""",
+    ),
+    PromptTemplate(
+        name='openai_extraction',
+        system="""You are an expert meeting assistant that extracts concrete, actionable tasks, decisions, and key topics from meeting transcripts.
+You must return ONLY valid JSON matching the specified schema. Be precise and don't invent facts not present in the transcript.""",
+        user="""Extract action items, decisions, and key topics from this meeting transcript.
+
+Meeting Context:
+- Date/Time: {meeting_date}
+- Attendees: {attendees}
+
+Transcript:
+{transcript}
+
+Instructions:
+1. **ACTION ITEMS**: Extract concrete, actionable tasks with clear deliverables
+   - Must have verb + object (what needs to be done)
+   - Resolve pronouns to actual names when possible
+   - Convert relative dates to ISO dates using meeting date as reference
+   - Include confidence score (0-1) based on clarity
+   - Priority: P1 (urgent/critical), P2 (important), P3 (routine)
+   - Categories: UX, Infra, GTM, Ops, Research, Admin, Other
+
+2. **DECISIONS**: Extract explicit decisions made during the meeting
+   - Clear resolution or conclusion reached
+   - Decision rationale when mentioned
+   - Impact assessment if discussed
+   - Who made the decision (if stated)
+
+3. **KEY TOPICS**: Extract main discussion themes and subjects
+   - Primary topics that consumed significant discussion time
+   - Important themes or areas of focus
+   - Strategic topics or areas of concern
+   - Exclude trivial or very brief mentions
+
+4. **EVIDENCE**: All items must include exact quotes from transcript
+   - Quote must be verbatim from the source
+   - If you cannot provide a verbatim quote, omit the item
+   - Quotes should be 3-30 words for context
+
+Return ONLY a JSON object matching this exact schema:
+{{
+  "action_items": [
+    {{
+      "text": "Clear, imperative description of the task",
+      "owner": "Person name or null if unclear",
+      "due_date_iso": "YYYY-MM-DD or null if not specified",
+      "priority": "P1|P2|P3",
+      "confidence": 0.95,
+      "evidence_quote": "Exact quote from transcript",
+      "char_start": 0,
+      "char_end": 100,
+      "category": "UX|Infra|GTM|Ops|Research|Admin|Other",
+      "urgency_indicators": ["list of words/phrases indicating urgency"]
+    }}
+  ],
+  "decisions": [
+    {{
+      "decision": "Clear statement of what was decided",
+      "rationale": "Why this decision was made (if mentioned)",
+      "decision_maker": "Person or group who made decision",
+      "impact": "Expected impact or implications",
+      "confidence": 0.90,
+      "evidence_quote": "Exact quote supporting this decision",
+      "char_start": 0,
+      "char_end": 100,
+      "category": "Strategic|Operational|Technical|Process|Other"
+    }}
+  ],
+  "key_topics": [
+    {{
+      "topic": "Main topic or theme discussed",
+      "description": "Brief summary of what was discussed",
+      "duration_indicators": ["phrases suggesting extended discussion"],
+      "importance_level": "High|Medium|Low",
+      "confidence": 0.85,
+      "evidence_quote": "Quote showing this topic was discussed",
+      "char_start": 0,
+      "char_end": 100,
+      "category": "Strategic|Technical|Process|Business|Other"
+    }}
+  ],
+  "metadata": {{
+    "extraction_method": "openai",
+    "model_used": "{model}",
+    "total_confidence": 0.90,
+    "processing_notes": ["Any relevant processing observations"]
+  }}
+}}
+
+Rules:
+- Focus on future actions, not past accomplishments
+- Merge similar/duplicate items
+- Exclude completed items ("already done", "finished", etc.)
+- Limit to 20 most important items per category
+- Every item MUST have a verbatim evidence quote
+""",
+    ),
+    PromptTemplate(
+        name='extraction_batch',
+        system="""You are an expert meeting assistant that extracts concrete, actionable tasks, decisions, and key topics from meeting transcripts.
+You must return ONLY valid JSON matching the specified schema. Be precise and don't invent facts not present in the transcript.""",
+        user="""Below are {count} separate meeting transcripts. Each one starts with a line "<<<MEETING id>>>" followed by its date and attendees, and ends with "<<<END MEETING id>>>". Treat every meeting independently: never carry names, tasks or context from one meeting into another.
+
+For each meeting extract:
+1. **ACTION ITEMS**: concrete tasks (verb + object); resolve pronouns to names; convert relative dates to ISO dates using that meeting's date; confidence 0-1; priority P1 (urgent/critical), P2 (important), P3 (routine); category UX|Infra|GTM|Ops|Research|Admin|Other.
+2. **DECISIONS**: explicit resolutions with rationale, impact and decision maker when stated; category Strategic|Operational|Technical|Process|Other.
+3. **KEY TOPICS**: main discussion themes, excluding brief mentions; importance High|Medium|Low; category Strategic|Technical|Process|Business|Other.
+4. **EVIDENCE**: every item needs a verbatim 3-30 word quote from the same meeting's transcript; char_start/char_end are offsets into that meeting's transcript alone. Omit items you cannot quote.
+
+Return ONLY a JSON object with one entry per meeting, in the order given:
+{{
+  "documents": [
+    {{
+      "doc_id": "the id from the meeting's <<<MEETING id>>> line",
+      "action_items": [{{"text": "...", "owner": "name or null", "due_date_iso": "YYYY-MM-DD or null", "priority": "P1|P2|P3", "confidence": 0.9, "evidence_quote": "...", "char_start": 0, "char_end": 100, "category": "...", "urgency_indicators": []}}],
+      "decisions": [{{"decision": "...", "rationale": "... or null", "decision_maker": "... or null", "impact": "... or null", "confidence": 0.9, "evidence_quote": "...", "char_start": 0, "char_end": 100, "category": "..."}}],
+      "key_topics": [{{"topic": "...", "description": "... or null", "duration_indicators": [], "importance_level": "High|Medium|Low", "confidence": 0.8, "evidence_quote": "...", "char_start": 0, "char_end": 100, "category": "..."}}]
+    }}
+  ]
+}}
+
+Rules:
+- Focus on future actions, not past accomplishments; exclude completed items
+- Merge duplicates within a meeting
+- Limit to 20 most important items per category per meeting
+- Include every meeting, with empty lists if it has nothing to extract
+
+{documents}
+""",
+    ),
+]}
+
+
+# ============= Builder =============
+
+@dataclass
+class BuiltPrompt:
+    """A fully rendered prompt with its token accounting."""
+    template: str
+    system: Optional[str]
+    user: str
+    prompt_tokens: int
+    tokens_saved: int = 0
+    fillers_removed: int = 0
+
+    @property
+    def messages(self) -> List[Dict[str, str]]:
+        """Chat-style messages (OpenAI)."""
+        msgs = []
+        if self.system:
+            msgs.append({"role": "system", "content": self.system})
+        msgs.append({"role": "user", "content": self.user})
+        return msgs
+
+    @property
+    def text(self) -> str:
+        """Single-string prompt (Gemini)."""
+        return f"{self.system}\n\n{self.user}" if self.system else self.user
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            'prompt_tokens': self.prompt_tokens,
+            'tokens_saved': self.tokens_saved,
+            'fillers_removed': self.fillers_removed,
+        }
+
+
+class PromptBuilder:
+    """Renders provider prompts from TEMPLATES and keeps running token totals."""
+
+    def __init__(self, templates: Optional[Dict[str, PromptTemplate]] = None):
+        self.templates = templates or TEMPLATES
+        self.totals = {'requests': 0, 'prompt_tokens': 0, 'tokens_saved': 0}
+        # Prompts are built on many analysis threads at once
+        self._totals_lock = threading.Lock()
+
+    def build(self, name: str, model: Optional[str] = None,
+              transcript: Optional[PreparedTranscript] = None, **fields) -> BuiltPrompt:
+        """Render template `name`.
+
+        When `transcript` is given, its model text fills the `{transcript}`
+        slot and the filler savings are attributed to this prompt.
+        """
+        template = self.templates[name]
+        if transcript is not None:
+            fields['transcript'] = transcript.model_text
+        fields.setdefault('model', model or '')
+        user = template.user.format(**fields)
+        prompt_tokens = count_tokens(user, model) + count_tokens(template.system or '', model)
+        built = BuiltPrompt(
+            template=name,
+            system=template.system,
+            user=user,
+            prompt_tokens=prompt_tokens,
+            tokens_saved=transcript.tokens_saved if transcript is not None else 0,
+            fillers_removed=transcript.fillers.removed_count if transcript is not None else 0,
+        )
+        with self._totals_lock:
+            self.totals['requests'] += 1
+            self.totals['prompt_tokens'] += built.prompt_tokens
+            self.totals['tokens_saved'] += built.tokens_saved
+        print(f"Prompt '{name}': {built.prompt_tokens} tokens (saved {built.tokens_saved}, fillers removed {built.fillers_removed})")
+        return built
+
+    def stats(self) -> Dict[str, int]:
+        with self._totals_lock:
+            return dict(self.totals)
@@ -0,0 +1,55 @@
+"""
+Per-meeting state for incremental (rolling) summaries.
+
+A live meeting sends its transcript in deltas. Each update folds only the
+new complete sentences into the running summary and open action items, so
+the cost of an update depends on the size of the delta and the (bounded)
+summary, not on how long the meeting has been running. Text after the
+last sentence boundary is held back until the next delta completes it.
+"""
+
+import re
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Tuple
+
+# Last sentence terminator or line break in a delta
+_BOUNDARY_RE = re.compile(r'[.!?\n](?=[^.!?\n]*\Z)')
+# Open action items kept per meeting; the oldest are dropped first
+MAX_OPEN_ITEMS = 50
+
+
+def split_complete(buffer: str) -> Tuple[str, str]:
+    """Split `buffer` into (complete sentences, unfinished tail)."""
+    m = _BOUNDARY_RE.search(buffer)
+    if m is None:
+        return '', buffer
+    return buffer[:m.end()], buffer[m.end():]
+
+
+@dataclass
+class RollingSummary:
+    """Running summary of one meeting."""
+    meeting_id: str
+    summary: str = ''
+    action_items: List[Dict[str, Any]] = field(default_factory=list)
+    pending: str = ''  # unfinished sentence carried to the next update
+    consumed_chars: int = 0  # transcript characters folded into the summary
+    updates: int = 0
+    method: str = 'none'
+    updated_at: float = field(default_factory=time.time)
+    # Serializes updates to one meeting; different meetings update concurrently
+    lock: threading.Lock = field(default_factory=threading.Lock, repr=False, compare=False)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'meeting_id': self.meeting_id,
+            'summary': self.summary,
+            'action_items': list(self.action_items),
+            'consumed_chars': self.consumed_chars,
+            'pending_chars': len(self.pending),
+            'updates': self.updates,
+            'method': self.method,
+            'updated_at': self.updated_at,
+        }
@@ -0,0 +1,55 @@
+"""
+Precompiled, single-scan matching for the rule-based extractors.
+
+A PatternSet compiles a list of regexes once, plus a zero-width union of all
+of them. One left-to-right pass of the union finds every position where at
+least one rule can match; only there is each rule tried with `match()`. The
+per-rule results are exactly what separate `re.finditer` calls would return
+(leftmost, non-overlapping, same groups and offsets), so outputs don't change
+while the text is scanned once instead of once per rule.
+
+Patterns must not use numbered backreferences, since group numbers shift in
+the union.
+"""
+
+import re
+from typing import List, Optional, Sequence
+
+
+class PatternSet:
+    """Several regexes evaluated in one scan, with per-pattern finditer semantics."""
+
+    def __init__(self, patterns: Sequence[str], flags: int = 0):
+        self.patterns = [re.compile(p, flags) for p in patterns]
+        self._any = re.compile('(?=%s)' % '|'.join(f'(?:{p.pattern})' for p in self.patterns), flags)
+
+    def scan(self, text: str, pos: int = 0, endpos: Optional[int] = None) -> List[List[re.Match]]:
+        """Return, for each pattern, the matches `pattern.finditer(text, pos, endpos)` would give."""
+        endpos = len(text) if endpos is None else endpos
+        found: List[List[re.Match]] = [[] for _ in self.patterns]
+        next_start = [pos] * len(self.patterns)
+        for candidate in self._any.finditer(text, pos, endpos):
+            at = candidate.start()
+            for i, pattern in enumerate(self.patterns):
+                # finditer resumes after the previous match, so overlapping starts are skipped
+                if at < next_start[i]:
+                    continue
+                m = pattern.match(text, at, endpos)
+                if m:
+                    found[i].append(m)
+                    next_start[i] = m.end() if m.end() > at else at + 1
+        return found
+
+    def first(self, text: str) -> Optional[re.Match]:
+        """The match of the earliest-listed pattern that matches anywhere (like trying re.search in order)."""
+        best_index, best = len(self.patterns), None
+        for candidate in self._any.finditer(text):
+            at = candidate.start()
+            for i in range(best_index):
+                m = self.patterns[i].match(text, at)
+                if m:
+                    best_index, best = i, m
+                    break
+            if best_index == 0:
+                break
+        return best
@@ -0,0 +1,79 @@
+"""
+Single-flight coalescing of identical concurrent calls.
+
+When several requests ask for the same analysis at once (attendees of a
+shared meeting all pressing "summarize"), the first caller for a key runs
+the computation and the others block until it finishes and receive the
+same result, or the same exception. Nothing is cached afterwards: a call
+that starts after the flight has landed runs again.
+"""
+
+import copy
+import hashlib
+import threading
+from typing import Any, Callable, Dict, TypeVar
+
+T = TypeVar('T')
+
+
+def flight_key(kind: str, *parts: Any) -> str:
+    """Stable key for a call: `kind` plus a digest of its inputs."""
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(repr(part).encode('utf-8') if not isinstance(part, str) else part.encode('utf-8'))
+        digest.update(b'\x00')
+    return f"{kind}:{digest.hexdigest()}"
+
+
+class _Flight:
+    __slots__ = ('done', 'result', 'error', 'waiters')
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+        self.waiters = 0
+
+
+class SingleFlight:
+    """Thread-safe; followers get deep copies so callers can mutate results freely."""
+
+    def __init__(self):
+        self._flights: Dict[str, _Flight] = {}
+        self._lock = threading.Lock()
+        self.stats = {'leaders': 0, 'coalesced': 0}
+
+    def do(self, key: str, fn: Callable[[], T]) -> T:
+        with self._lock:
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = _Flight()
+                self.stats['leaders'] += 1
+            else:
+                flight.waiters += 1
+                self.stats['coalesced'] += 1
+
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return copy.deepcopy(flight.result)
+
+        try:
+            flight.result = fn()
+            return flight.result
+        except BaseException as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                self._flights.pop(key, None)
+            # Deep-copy for followers before the leader's caller can mutate the result
+            if flight.waiters and flight.error is None:
+                flight.result = copy.deepcopy(flight.result)
+            flight.done.set()
+
+    def in_flight(self) -> int:
+        with self._lock:
+            return len(self._flights)
@@ -0,0 +1,122 @@
+"""
+Per-speaker turn index stored with each meeting.
+
+Transcripts written as "Speaker (Role): text" lines are parsed once, when
+the meeting is saved, into a compact index kept beside the transcript:
+
+    {'version': 1,
+     'speakers': ['Alice', 'John'],          # first-appearance order
+     'keys': ['alice', 'john'],              # lowercase, indexed for per-speaker queries
+     'roles': ['PM', 'Engineering'],         # first role given, or None
+     'turns': [[speaker, start, end, words, t_start, t_end], ...]}
+
+`speaker` is a position in `speakers`; start/end are the character offsets
+of the utterance (after the "Name (Role): " label); t_start/t_end are
+seconds taken from the ASR segments the turn overlaps, or None for pasted
+text. Talk-time stats and per-speaker filtering read only the index;
+speaker-scoped search slices just that speaker's turns out of the
+transcript instead of re-parsing it.
+"""
+
+import re
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from app.document import AnalyzedDocument
+
+INDEX_VERSION = 1
+
+_WORD_RE = re.compile(r"\w+")
+
+
+def _segment_spans(transcript: str, segments: Sequence[Dict[str, Any]]) -> List[Tuple[int, int, float, float]]:
+    """(char start, char end, t_start, t_end) for each ASR segment found, in order, in the transcript."""
+    spans = []
+    cursor = 0
+    for seg in segments or ():
+        text = (seg.get('text') or '').strip()
+        if not text or seg.get('start') is None or seg.get('end') is None:
+            continue
+        at = transcript.find(text, cursor)
+        if at < 0:
+            continue
+        spans.append((at, at + len(text), float(seg['start']), float(seg['end'])))
+        cursor = at + len(text)
+    return spans
+
+
+def build_speaker_index(transcript: str, segments: Sequence[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """Parse speaker turns (and their times, when ASR segments are given) into the stored index."""
+    speakers: List[str] = []
+    roles: List[Optional[str]] = []
+    positions: Dict[str, int] = {}
+    turns: List[list] = []
+    seg_spans = _segment_spans(transcript or '', segments)
+    seg_i = 0
+    for turn in AnalyzedDocument(transcript or '').speaker_turns:
+        pos = positions.get(turn.speaker.lower())
+        if pos is None:
+            pos = positions[turn.speaker.lower()] = len(speakers)
+            speakers.append(turn.speaker)
+            roles.append(turn.role)
+        elif roles[pos] is None and turn.role:
+            roles[pos] = turn.role
+        # Both lists are in text order, so the segment cursor only moves forward
+        while seg_i < len(seg_spans) and seg_spans[seg_i][1] <= turn.start:
+            seg_i += 1
+        t_start = t_end = None
+        j = seg_i
+        while j < len(seg_spans) and seg_spans[j][0] < turn.end:
+            t_start = seg_spans[j][2] if t_start is None else t_start
+            t_end = seg_spans[j][3]
+            j += 1
+        turns.append([pos, turn.start, turn.end, len(_WORD_RE.findall(turn.text)), t_start, t_end])
+    return {
+        'version': INDEX_VERSION,
+        'speakers': speakers,
+        'keys': [s.lower() for s in speakers],
+        'roles': roles,
+        'turns': turns,
+    }
+
+
+def _turn_dict(index: Dict[str, Any], turn: list) -> Dict[str, Any]:
+    pos, start, end, words, t_start, t_end = turn
+    return {'speaker': index['speakers'][pos], 'role': index['roles'][pos], 'start': start, 'end': end,
+            'words': words, 't_start': t_start, 't_end': t_end}
+
+
+def talk_time(index: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Turns, words, characters and (when timed) seconds per speaker, most talkative first."""
+    rows = [{'speaker': name, 'role': role, 'turns': 0, 'words': 0, 'chars': 0, 'seconds': None}
+            for name, role in zip(index.get('speakers', []), index.get('roles', []), strict=True)]
+    for pos, start, end, words, t_start, t_end in index.get('turns', []):
+        row = rows[pos]
+        row['turns'] += 1
+        row['words'] += words
+        row['chars'] += end - start
+        if t_start is not None and t_end is not None:
+            row['seconds'] = round((row['seconds'] or 0.0) + max(0.0, t_end - t_start), 3)
+    total_words = sum(r['words'] for r in rows) or 1
+    for row in rows:
+        row['share'] = round(row['words'] / total_words, 4)
+    return sorted(rows, key=lambda r: -r['words'])
+
+
+def turns_for(index: Dict[str, Any], speakers: Iterable[str] = None) -> List[Dict[str, Any]]:
+    """Turns by the given speakers (case-insensitive; all turns when None), in transcript order."""
+    keys = index.get('keys', [])
+    wanted = None if speakers is None else {keys.index(s.lower()) for s in speakers if s.lower() in keys}
+    return [_turn_dict(index, t) for t in index.get('turns', []) if wanted is None or t[0] in wanted]
+
+
+def search_turns(transcript: str, index: Dict[str, Any], speaker: str, query: str,
+                 snippet_chars: int = 160) -> List[Dict[str, Any]]:
+    """Turns by `speaker` containing every word of `query`, with a snippet of each."""
+    terms = [t.lower() for t in _WORD_RE.findall(query or '')]
+    hits = []
+    for turn in turns_for(index, [speaker]):
+        text = transcript[turn['start']:turn['end']]
+        words = set(_WORD_RE.findall(text.lower()))
+        if all(term in words for term in terms):
+            hits.append(dict(turn, snippet=text[:snippet_chars]))
+    return hits
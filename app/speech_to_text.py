@@ -1,6 +1,9 @@
+import hashlib
 import os
 from typing import Dict, List
 
+from app.single_flight import SingleFlight
+
 class SpeechToText:
     """ASR wrapper: prefer faster-whisper, fall back to Vosk if available.
 
@@ -17,6 +20,8 @@ class SpeechToText:
         self.backend = None  # 'faster-whisper' or 'vosk'
         self.vosk_model_path = vosk_model_path or os.environ.get('VOSK_MODEL_PATH')
         self.cache_dir = cache_dir
+        # Concurrent uploads of the same audio share one transcription
+        self.flights = SingleFlight()
 
     @classmethod
     def probe_backends(cls) -> Dict:
@@ -89,8 +94,21 @@ class SpeechToText:
             "For Vosk, set environment variable VOSK_MODEL_PATH to the model directory."
         )
 
+    @staticmethod
+    def _audio_digest(wav_path: str) -> str:
+        digest = hashlib.sha256()
+        with open(wav_path, 'rb') as f:
+            for block in iter(lambda: f.read(1 << 20), b''):
+                digest.update(block)
+        return digest.hexdigest()
+
     def transcribe(self, wav_path: str) -> Dict:
         self._ensure_model()
+        # Keyed by content, not path: every request converts into its own temp file
+        key = f"asr:{self.backend}:{self.model_name}:{self._audio_digest(wav_path)}"
+        return self.flights.do(key, lambda: self._transcribe(wav_path))
+
+    def _transcribe(self, wav_path: str) -> Dict:
         if self.backend == 'faster-whisper':
             return self._transcribe_faster_whisper(wav_path)
         elif self.backend == 'vosk':
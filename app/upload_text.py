@@ -0,0 +1,69 @@
+"""
+Text extraction for uploaded documents (text, PDF, DOCX).
+
+Kept apart from app.api so process-pool workers can import it without
+loading the web app: PDF and DOCX parsing is pure Python that holds the
+GIL for as long as the document takes, so /transcribe and
+/meetings/process run it in the 'process' executor (see app.executors).
+"""
+
+import io
+
+# Parsed by a library (CPU-heavy); plain text is just decoded
+PARSED_EXTENSIONS = frozenset({'.pdf', '.docx'})
+
+
+class UploadError(Exception):
+    """An uploaded file that can't be used, with the HTTP status to report."""
+    def __init__(self, message: str, status: int = 400):
+        super().__init__(message)
+        self.message = message
+        self.status = status
+
+    def __reduce__(self):
+        # Keeps the status when the error is raised in a process-pool worker
+        return (type(self), (self.message, self.status))
+
+
+def document_text(ext: str, content: bytes):
+    """(text, message) for text/PDF/DOCX uploads, None for media that needs transcription."""
+    # Handle text files directly (no transcription needed)
+    if ext in {'.txt', '.md', '.rtf'}:
+        try:
+            # Try to decode as UTF-8
+            return content.decode('utf-8'), 'Text file loaded directly - no transcription needed'
+        except UnicodeDecodeError:
+            try:
+                # Try other encodings
+                return content.decode('latin-1'), 'Text file loaded directly - no transcription needed'
+            except UnicodeDecodeError as e:
+                raise UploadError('Unable to decode text file. Please ensure it\'s a valid text file.') from e
+
+    # Handle PDF files
+    if ext == '.pdf':
+        try:
+            import PyPDF2
+            pdf_reader = PyPDF2.PdfReader(io.BytesIO(content))
+            text_content = ""
+            for page in pdf_reader.pages:
+                text_content += page.extract_text() + "\n"
+            return text_content.strip(), 'PDF text extracted directly - no transcription needed'
+        except ImportError as e:
+            raise UploadError('PDF processing requires PyPDF2 library. Please install it.', 500) from e
+        except Exception as e:
+            raise UploadError(f'Failed to extract text from PDF: {str(e)}') from e
+
+    # Handle DOCX files
+    if ext == '.docx':
+        try:
+            from docx import Document
+            doc = Document(io.BytesIO(content))
+            text_content = ""
+            for paragraph in doc.paragraphs:
+                text_content += paragraph.text + "\n"
+            return text_content.strip(), 'DOCX text extracted directly - no transcription needed'
+        except ImportError as e:
+            raise UploadError('DOCX processing requires python-docx library. Please install it.', 500) from e
+        except Exception as e:
+            raise UploadError(f'Failed to extract text from DOCX: {str(e)}') from e
+    return None
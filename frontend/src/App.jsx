@@ -1,6 +1,7 @@
 import React, { useState, useRef, useCallback, useEffect } from 'react'
 import axios from 'axios'
 import axiosInstance from './utils/axios'
+import { postEventStream } from './utils/sse'
 import toast from 'react-hot-toast'
 import Layout from './components/Layout'
 import { Button, Card, CardHeader, CardBody, Badge, Spinner, SkeletonCard } from './components/ui'
@@ -415,8 +416,21 @@ export default function App() {
       form.append('text', transcript)
       form.append('require_ai', 'true')
       form.append('ai_model', 'gemini-1.5-flash')
-      const r = await axiosInstance.post('/summarize', form)
-      setSummary(r.data.summary)
+      // Stream the summary so text appears as soon as the first tokens arrive
+      let streamError = null
+      setSummary('')
+      await postEventStream('/summarize/stream', form, (event, data) => {
+        if (event === 'summary_delta') {
+          setSummary(prev => prev + data.text)
+        } else if (event === 'summary_done') {
+          setSummary(data.summary)
+        } else if (event === 'error' && data.stage === 'summary') {
+          streamError = data.error
+        }
+      })
+      if (streamError) {
+        throw new Error(streamError)
+      }
       // Only update the summary here. Action items/decisions/topics are extracted via the separate button.
       toast.success(`Summary generated! (${formatTime(summarizeTime)})`)
       scheduleAutosave('summary')
@@ -0,0 +1,44 @@
+import { AXIOS_API_ROOT, USE_COOKIE_AUTH } from './axios';
+
+// POST a form and dispatch Server-Sent Events to onEvent(event, data) as they arrive
+export async function postEventStream(path, form, onEvent) {
+  const headers = { 'Content-Type': 'application/x-www-form-urlencoded' };
+  if (!USE_COOKIE_AUTH) {
+    const token = localStorage.getItem('token');
+    if (token) {
+      headers.Authorization = `Bearer ${token}`;
+    }
+  }
+
+  const response = await fetch(`${AXIOS_API_ROOT}${path}`, {
+    method: 'POST',
+    headers,
+    body: form.toString(),
+    credentials: USE_COOKIE_AUTH ? 'include' : 'same-origin',
+  });
+  if (!response.ok || !response.body) {
+    const detail = await response.text().catch(() => '');
+    throw new Error(`Request failed with status ${response.status}${detail ? `: ${detail}` : ''}`);
+  }
+
+  const reader = response.body.getReader();
+  const decoder = new TextDecoder();
+  let buffer = '';
+  for (;;) {
+    const { done, value } = await reader.read();
+    if (done) break;
+    buffer += decoder.decode(value, { stream: true });
+    let boundary;
+    while ((boundary = buffer.indexOf('\n\n')) !== -1) {
+      const raw = buffer.slice(0, boundary);
+      buffer = buffer.slice(boundary + 2);
+      let event = 'message';
+      let data = '';
+      for (const line of raw.split('\n')) {
+        if (line.startsWith('event: ')) event = line.slice(7);
+        else if (line.startsWith('data: ')) data += line.slice(6);
+      }
+      onEvent(event, data ? JSON.parse(data) : null);
+    }
+  }
+}
@@ -0,0 +1,37 @@
+"""Tests for analysis fingerprints and the analysis memo."""
+import json
+
+from app.analysis_memo import AnalysisMemo, analysis_fingerprint, stored_options
+
+
+def test_fingerprint_covers_transcript_and_options():
+    base = analysis_fingerprint('Alice will send the deck.', '2026-01-05', ['Alice', 'Bob'])
+
+    assert base == analysis_fingerprint('Alice will send the deck.', '2026-01-05', ['Alice', 'Bob'])
+    assert base != analysis_fingerprint('Alice will send the decks.', '2026-01-05', ['Alice', 'Bob'])
+    assert base != analysis_fingerprint('Alice will send the deck.', '2026-01-06', ['Alice', 'Bob'])
+    assert base != analysis_fingerprint('Alice will send the deck.', '2026-01-05', ['Alice'])
+    assert analysis_fingerprint('x', '', []) == analysis_fingerprint('x', None, None)
+
+
+def test_memo_evicts_and_expires():
+    memo = AnalysisMemo(max_entries=2, ttl_s=60)
+    memo.put('a', {'keywords': ['a']})
+    memo.put('b', {'keywords': ['b']})
+    assert memo.get('a') == {'keywords': ['a']}
+    memo.put('c', {'keywords': ['c']})  # evicts 'b', the least recently used
+    assert memo.get('b') is None
+    assert memo.get('a') is not None and memo.get('c') is not None
+    assert memo.get(None) is None
+
+    expired = AnalysisMemo(ttl_s=-1)
+    expired.put('a', {})
+    assert expired.get('a') is None
+
+
+def test_stored_options_tolerate_missing_or_bad_meta():
+    options = {'meeting_date': '2026-01-05', 'attendees': ['Alice'], 'extract_items': True}
+
+    assert stored_options(json.dumps({'decisions': [], 'analysis_options': options})) == options
+    assert stored_options(json.dumps({'decisions': []})) == {}
+    assert stored_options('not json') == stored_options('[]') == stored_options(None) == {}
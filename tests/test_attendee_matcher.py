@@ -0,0 +1,91 @@
+"""Tests for Aho-Corasick attendee matching and its use in assignee attribution."""
+from app.attendee_matcher import (
+    AhoCorasick,
+    AttendeeMatcher,
+    attendee_stats,
+    name_variants,
+    parse_attendee,
+)
+from app.document import AnalyzedDocument
+from app.nlp_analyzer import NLPAnalyzer
+
+ATTENDEES = ['Robert Smith', 'Sarah Lee (Sal)', 'William Chen']
+
+
+def test_automaton_finds_overlapping_patterns_in_one_pass():
+    patterns = ['he', 'she', 'his', 'hers']
+    text = 'ushers and his shed'
+
+    found = sorted((patterns[i], s, e) for i, s, e in AhoCorasick(patterns).iter(text))
+
+    assert found == [('he', 2, 4), ('he', 16, 18), ('hers', 2, 6), ('his', 11, 14), ('she', 1, 4), ('she', 15, 18)]
+
+
+def test_variants_cover_first_names_nicknames_and_aliases():
+    assert parse_attendee('Sarah Lee (Sal, S.L.)') == ('Sarah Lee', ['Sal', 'S.L.'])
+    variants = name_variants('Robert Smith')
+    assert {'robert smith', 'robert', 'bob', 'bobby', 'bob smith'} <= set(variants)
+    assert 'robert' in name_variants('Bob Jones')
+
+
+def test_mentions_resolve_to_canonical_attendees():
+    matcher = AttendeeMatcher(ATTENDEES)
+    text = "Bob Smith and Sal met. Bobby will call Will; we will see. Robertson is not here."
+
+    mentions = matcher.mentions(text)
+
+    assert [(m.name, text[m.start:m.end]) for m in mentions] == [
+        ('Robert Smith', 'Bob Smith'), ('Sarah Lee', 'Sal'), ('Robert Smith', 'Bobby'), ('William Chen', 'Will')]
+    assert matcher.canonical('bob') == 'Robert Smith'
+    assert matcher.canonical('Nobody') is None
+
+
+def test_shared_first_names_only_match_in_full():
+    matcher = AttendeeMatcher(['John Park', 'John Ortiz'])
+
+    assert matcher.canonical('John') is None
+    assert [m.name for m in matcher.mentions('John said John Ortiz would help.')] == ['John Ortiz']
+
+
+def test_rule_based_assignees_use_attendees():
+    nlp = NLPAnalyzer()
+    text = ("Bob will send the revised budget to finance. "
+            "Next steps: sal needs to book the venue for the offsite.\n"
+            "William Chen: I will draft the hiring plan for review.")
+
+    without = {i['text']: i['assignee'] for i in nlp._extract_action_items_rule_based(text)}
+    result = nlp._extract_enhanced_items_rule_based(text, attendees=ATTENDEES)
+    assignees = {i['text']: i['assignee'] for i in result['action_items']}
+
+    assert without['send the revised budget to finance'] == 'Bob'
+    assert assignees['send the revised budget to finance'] == 'Robert Smith'
+    assert assignees['book the venue for the offsite'] == 'Sarah Lee'
+    assert assignees['draft the hiring plan for review'] == 'William Chen'
+    stats = result['metadata']['attendee_stats']
+    assert stats['William Chen']['turns'] == 1 and stats['William Chen']['mentions'] == 0
+    assert stats['Robert Smith'] == {'mentions': 1, 'turns': 0, 'chars_spoken': 0, 'action_items': 1}
+
+
+def test_llm_owners_are_canonicalized_and_filled_from_evidence():
+    nlp = NLPAnalyzer()
+    text = "Bob will send the budget. The venue booking goes to Sal by Friday."
+    result = {'action_items': [
+        {'text': 'Send the budget', 'owner': 'bob', 'evidence_quote': 'Bob will send the budget'},
+        {'text': 'Book the venue', 'owner': None, 'evidence_quote': 'The venue booking goes to Sal by Friday'},
+    ]}
+
+    validated = nlp._validate_and_enhance_extraction(result, text, ATTENDEES)
+
+    owners = {i['text']: i['owner'] for i in validated['action_items']}
+    assert owners == {'Send the budget': 'Robert Smith', 'Book the venue': 'Sarah Lee'}
+    assert validated['metadata']['attendee_stats']['Sarah Lee']['action_items'] == 1
+
+
+def test_stats_skip_speaker_labels():
+    matcher = AttendeeMatcher(ATTENDEES)
+    doc = AnalyzedDocument("Sarah Lee: Thanks Bob.\nRobert Smith: Sure.")
+
+    stats = attendee_stats(doc, matcher, matcher.document_mentions(doc))
+
+    assert stats['Robert Smith']['mentions'] == 1 and stats['Sarah Lee']['mentions'] == 0
+    assert stats['Sarah Lee']['chars_spoken'] == len('Thanks Bob.')
@@ -0,0 +1,147 @@
+"""Tests for the resumable bulk re-analysis backfill."""
+import json
+
+import pytest
+from bson import ObjectId
+
+from app.analysis_memo import analysis_fingerprint
+from app.backfill import Checkpoint, run_backfill
+
+TRANSCRIPT = ("Alice will prepare the quarterly budget report by Friday. "
+              "We decided to postpone the product launch until March. "
+              "Bob needs to review the deployment checklist before the release.")
+
+
+class FakeCursor:
+    def __init__(self, docs):
+        self.docs = docs
+
+    def sort(self, key, direction):
+        self.docs = sorted(self.docs, key=lambda d: d[key], reverse=direction < 0)
+        return self
+
+    def batch_size(self, n):
+        return self
+
+    def limit(self, n):
+        self.docs = self.docs[:n]
+        return self
+
+    def __iter__(self):
+        return iter([dict(d) for d in self.docs])
+
+
+class FakeCollection:
+    """In-memory stand-in for the few pymongo calls the backfill makes."""
+
+    def __init__(self, docs):
+        self.docs = {d['_id']: d for d in docs}
+        self.writes = 0
+        self.fail_after = None
+
+    def find(self, query, projection=None):
+        docs = list(self.docs.values())
+        after = (query.get('_id') or {}).get('$gt')
+        if after is not None:
+            docs = [d for d in docs if d['_id'] > after]
+        skip = (query.get('analysis_status') or {}).get('$nin', [])
+        return FakeCursor([d for d in docs if d.get('analysis_status') not in skip])
+
+    def bulk_write(self, ops, ordered=True):
+        if self.fail_after is not None and self.writes >= self.fail_after:
+            raise RuntimeError('connection lost')
+        self.writes += 1
+        matched = 0
+        for op in ops:
+            doc = self.docs.get(op._filter['_id'])
+            if doc is not None and doc.get('transcript') == op._filter['transcript']:
+                doc.update(op._doc['$set'])
+                matched += 1
+        return type('Result', (), {'matched_count': matched})()
+
+
+def _meetings(n):
+    meta = json.dumps({'analysis_options': {'meeting_date': '2026-01-05', 'attendees': ['Alice', 'Bob']}})
+    return [{'_id': ObjectId(), 'transcript': f"{TRANSCRIPT} Meeting number {i}.", 'meta': meta,
+             'analysis_status': 'done'} for i in range(n)]
+
+
+def test_backfill_updates_every_meeting(tmp_path):
+    docs = _meetings(5)
+    docs[2]['analysis_status'] = 'pending'
+    collection = FakeCollection(docs)
+
+    stats = run_backfill(collection, ['keywords', 'extraction'], Checkpoint(str(tmp_path / 'cp.json')),
+                         workers=0, page_size=2)
+
+    assert stats.processed == stats.updated == 4
+    assert collection.writes == 2
+    done = [d for d in collection.docs.values() if d['analysis_status'] == 'done']
+    assert all(d['keywords'] and d['action_items'] and d['analysis_fingerprint'] for d in done)
+    assert json.loads(done[0]['meta'])['extraction_metadata']['backfilled']
+    assert 'keywords' not in docs[2]
+
+
+def test_fingerprint_is_kept_when_no_options_are_stored():
+    docs = _meetings(2)
+    docs[0].update(meta='{}', analysis_fingerprint='from-save')
+    collection = FakeCollection(docs)
+
+    run_backfill(collection, ['extraction'], workers=0)
+
+    assert collection.docs[docs[0]['_id']]['analysis_fingerprint'] == 'from-save'
+    assert collection.docs[docs[1]['_id']]['analysis_fingerprint'] == analysis_fingerprint(
+        docs[1]['transcript'], '2026-01-05', ['Alice', 'Bob'])
+
+
+def test_backfill_resumes_from_checkpoint(tmp_path):
+    collection = FakeCollection(_meetings(6))
+    checkpoint = Checkpoint(str(tmp_path / 'cp.json'))
+    collection.fail_after = 1
+
+    with pytest.raises(RuntimeError):
+        run_backfill(collection, ['keywords'], checkpoint, workers=0, page_size=2)
+    first_page = sorted(collection.docs)[:2]
+    assert all('keywords' in collection.docs[i] for i in first_page)
+
+    collection.fail_after = None
+    stats = run_backfill(collection, ['keywords'], checkpoint, workers=0, page_size=2)
+
+    assert stats.processed == 6
+    # Only the pages after the checkpoint were written again
+    assert collection.writes == 3
+    assert all('keywords' in d for d in collection.docs.values())
+
+
+def test_checkpoint_for_other_tasks_is_rejected(tmp_path):
+    collection = FakeCollection(_meetings(2))
+    checkpoint = Checkpoint(str(tmp_path / 'cp.json'))
+    run_backfill(collection, ['keywords'], checkpoint, workers=0)
+
+    with pytest.raises(ValueError):
+        run_backfill(collection, ['summary'], checkpoint, workers=0)
+
+
+def test_meetings_edited_during_the_run_are_skipped():
+    docs = _meetings(2)
+    collection = FakeCollection(docs)
+    real_bulk_write = collection.bulk_write
+
+    def edit_then_write(ops, ordered=True):
+        docs[0]['transcript'] = 'Edited while the backfill was running.'
+        return real_bulk_write(ops, ordered)
+    collection.bulk_write = edit_then_write
+
+    stats = run_backfill(collection, ['summary'], workers=0)
+
+    assert (stats.updated, stats.skipped) == (1, 1)
+    assert 'summary' not in docs[0] and docs[1]['summary']
+
+
+def test_process_pool_workers():
+    collection = FakeCollection(_meetings(4))
+
+    stats = run_backfill(collection, ['keywords', 'summary'], workers=2, page_size=3)
+
+    assert stats.updated == 4
+    assert all(d['keywords'] and d['summary'] for d in collection.docs.values())
@@ -0,0 +1,155 @@
+"""Tests for packing several meetings into one extraction request."""
+import json
+from types import SimpleNamespace
+
+import pytest
+
+from app.batch_extraction import (
+    BatchDocument,
+    batch_request_lines,
+    pack_documents,
+    parse_batch_output,
+    render_documents,
+)
+from app.extraction_schema import parse_batch_extraction
+from app.nlp_analyzer import NLPAnalyzer
+
+ALICE = "Alice will send the budget report to finance by Friday. We reviewed the roadmap."
+BOB = "Okay so Bob will update the deployment scripts before the release. The team agreed to delay the launch."
+
+
+def _reply(*doc_ids):
+    quotes = {
+        'M1': 'Alice will send the budget report to finance by Friday',
+        'M2': 'Bob will update the deployment scripts before the release',
+        'M9': 'Nobody said this',
+    }
+    return json.dumps({'documents': [
+        {'doc_id': d, 'action_items': [{'text': quotes[d], 'evidence_quote': quotes[d], 'priority': 'P2'}],
+         'decisions': [], 'key_topics': []}
+        for d in doc_ids
+    ]})
+
+
+def _completion(content):
+    return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content))])
+
+
+class FakeChat:
+    def __init__(self, replies):
+        self.replies = list(replies)
+        self.calls = []
+        self.completions = self
+
+    def create(self, **kwargs):
+        self.calls.append(kwargs)
+        return _completion(self.replies.pop(0))
+
+
+class FakeBatchClient:
+    """Just enough of the OpenAI client's files/batches surface for one job."""
+
+    def __init__(self, replies):
+        self.chat = FakeChat([])
+        self.replies = replies
+        self.uploaded = None
+        self.files = SimpleNamespace(create=self._upload, content=self._content)
+        self.batches = SimpleNamespace(create=self._create, retrieve=self._retrieve, cancel=lambda _id: None)
+
+    def _upload(self, file, purpose):
+        self.uploaded = [json.loads(line) for line in file.read().decode('utf-8').splitlines()]
+        return SimpleNamespace(id='file-in')
+
+    def _create(self, input_file_id, endpoint, completion_window):
+        return SimpleNamespace(id='batch-1', status='in_progress', output_file_id=None)
+
+    def _retrieve(self, batch_id):
+        return SimpleNamespace(id=batch_id, status='completed', output_file_id='file-out')
+
+    def _content(self, file_id):
+        lines = [json.dumps({'custom_id': r['custom_id'],
+                             'response': {'status_code': 200, 'body': {'choices': [{'message': {'content': reply}}]}}})
+                 for r, reply in zip(self.uploaded, self.replies, strict=True)]
+        return SimpleNamespace(text='\n'.join(lines))
+
+
+@pytest.fixture
+def analyzer():
+    nlp = NLPAnalyzer()
+    nlp.gemini_client = None
+    nlp.batch_poll_interval_s = 0
+    return nlp
+
+
+def _docs():
+    return [BatchDocument('a', ALICE, '2025-01-06', ['Alice']), BatchDocument('b', BOB, '2025-01-07', ['Bob'])]
+
+
+def test_pack_documents_respects_limits_and_isolates_long_documents():
+    groups = pack_documents([100, 100, 5000, 100, 100, 100], max_docs=2, max_tokens=1000, max_doc_tokens=4000)
+
+    assert sorted(groups) == [[0, 1], [2], [3, 4], [5]]
+    assert pack_documents([600, 600], max_docs=8, max_tokens=1000) == [[0], [1]]
+
+
+def test_render_documents_delimits_each_meeting():
+    block = render_documents(['M1', 'M2'], [ALICE, BOB], _docs())
+
+    assert block.index('<<<MEETING M1>>>') < block.index(ALICE) < block.index('<<<END MEETING M1>>>')
+    assert block.index('<<<MEETING M2>>>') < block.index(BOB) < block.index('<<<END MEETING M2>>>')
+    assert 'Date/Time: 2025-01-07' in block
+
+
+def test_parse_batch_extraction_keeps_only_requested_ids():
+    results, repaired = parse_batch_extraction(_reply('M1', 'M9'), ['M1', 'M2'])
+
+    assert not repaired
+    assert set(results) == {'M1'}
+    assert results['M1']['action_items'][0]['priority'] == 'P2'
+
+
+def test_parse_batch_output_skips_failed_requests():
+    ok = {'custom_id': 'a', 'response': {'status_code': 200, 'body': {'choices': [{'message': {'content': '{}'}}]}}}
+    failed = {'custom_id': 'b', 'response': {'status_code': 500, 'body': {}}}
+    errored = {'custom_id': 'c', 'error': {'message': 'boom'}}
+
+    assert parse_batch_output('\n'.join(json.dumps(r) for r in (ok, failed, errored))) == {'a': '{}'}
+    assert json.loads(batch_request_lines({'a': {'model': 'm'}}))['url'] == '/v1/chat/completions'
+
+
+def test_packed_request_is_split_back_per_meeting(analyzer):
+    analyzer.openai_client = SimpleNamespace(chat=FakeChat([_reply('M1', 'M2')]))
+
+    results = analyzer.extract_action_items_batch(_docs())
+
+    assert len(analyzer.openai_client.chat.calls) == 1
+    for doc_id, text in (('a', ALICE), ('b', BOB)):
+        item = results[doc_id]['action_items'][0]
+        # Spans point into each meeting's own transcript, fillers included
+        assert text[item['char_start']:item['char_end']] == item['evidence_quote']
+        meta = results[doc_id]['metadata']
+        assert meta['batched'] and meta['batch_size'] == 2 and not meta['batch_api']
+
+
+def test_batch_api_is_used_when_available(analyzer):
+    analyzer.openai_client = FakeBatchClient([_reply('M1', 'M2')])
+
+    results = analyzer.extract_action_items_batch(_docs())
+
+    assert analyzer.openai_client.chat.calls == []
+    assert len(analyzer.openai_client.uploaded) == 1
+    assert results['a']['metadata']['batch_api'] and results['b']['metadata']['batch_api']
+    # No owner in the reply; the attendee named in the evidence is used
+    assert results['b']['action_items'][0]['owner'] == 'Bob'
+
+
+def test_meetings_missing_from_the_reply_are_extracted_individually(analyzer):
+    single = json.dumps({'action_items': [{'text': 'Update scripts', 'evidence_quote': 'Bob will update the deployment scripts'}]})
+    analyzer.openai_client = SimpleNamespace(chat=FakeChat([_reply('M1'), single]))
+
+    results = analyzer.extract_action_items_batch(_docs())
+
+    assert results['a']['metadata']['batched']
+    assert 'batched' not in results['b']['metadata']
+    assert results['b']['action_items'][0]['text'] == 'Update scripts'
+    assert len(analyzer.openai_client.chat.calls) == 2
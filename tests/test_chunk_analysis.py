@@ -0,0 +1,70 @@
+"""Tests for content-defined chunking and incremental re-analysis."""
+from pathlib import Path
+
+import pytest
+
+from app.chunk_analysis import MAX_CHUNK_CHARS, chunk_transcript
+from app.nlp_analyzer import NLPAnalyzer
+
+TRANSCRIPT = Path(__file__).resolve().parents[1] / 'data' / 'transcripts' / 'one_hour_meeting.txt'
+
+
+@pytest.fixture(scope='module')
+def analyzer():
+    return NLPAnalyzer()
+
+
+@pytest.fixture(scope='module')
+def text():
+    return TRANSCRIPT.read_text(encoding='utf-8-sig')
+
+
+def test_chunks_cover_the_transcript(text):
+    chunks = chunk_transcript(text)
+
+    assert len(chunks) > 3
+    assert ''.join(c.text for c in chunks) == text
+    assert all(text[c.start:c.end] == c.text for c in chunks)
+    assert all(len(c.text) <= MAX_CHUNK_CHARS + 1000 for c in chunks)
+
+
+def test_local_edit_changes_few_chunks(text):
+    pos = len(text) // 2
+    edited = text[:pos] + 'X' + text[pos:]
+
+    before = {c.hash for c in chunk_transcript(text)}
+    after = chunk_transcript(edited)
+    changed = [c for c in after if c.hash not in before]
+
+    assert 1 <= len(changed) <= 2
+    assert any(c.start <= pos < c.end for c in changed)
+
+
+def test_typo_fix_reuses_cached_chunks(analyzer, text):
+    result, chunks = analyzer.analyze_incremental(text, provider='textrank')
+    meta = result['extraction_metadata']
+    assert meta['chunks_reanalyzed'] == meta['chunks'] == len(chunks)
+    assert result['summary']
+    assert result['action_items']
+
+    pos = text.index(' the ', len(text) // 3)
+    edited = text[:pos] + ' teh ' + text[pos + 5:]
+    result, _ = analyzer.analyze_incremental(edited, cached_chunks=chunks, provider='textrank')
+    meta = result['extraction_metadata']
+    assert meta['chunks'] > 3
+    assert 1 <= meta['chunks_reanalyzed'] <= 2
+    # Evidence spans point into the edited transcript
+    for item in result['decisions']:
+        assert 0 <= item['char_start'] <= item['char_end'] <= len(edited)
+
+
+def test_chunks_stored_at_save_make_the_first_edit_cheap(analyzer, text):
+    # What /meetings/process and background enrichment store with a new meeting
+    extraction, stored = analyzer.analyze_chunks(text, provider='textrank')
+    assert extraction['action_items'] and extraction['metadata']['chunks'] == len(stored)
+
+    pos = text.index(' the ', len(text) // 3)
+    edited = text[:pos] + ' teh ' + text[pos + 5:]
+    result, _ = analyzer.analyze_incremental(edited, cached_chunks=stored, provider='textrank')
+
+    assert 1 <= result['extraction_metadata']['chunks_reanalyzed'] <= 2
@@ -0,0 +1,82 @@
+"""Tests for the incrementally maintained corpus IDF table."""
+from app.corpus_idf import CorpusIdf, Recount
+from app.document import AnalyzedDocument
+from app.nlp_analyzer import NLPAnalyzer
+
+MEETINGS = [
+    'We reviewed the budget and the roadmap.',
+    'The roadmap slipped; the budget is fine.',
+    'Hiring plan for the budget review.',
+    'Kubernetes migration kickoff for the platform team.',
+]
+
+
+def test_incremental_updates_match_rebuild():
+    incremental = CorpusIdf()
+    for text in MEETINGS:
+        incremental.add(text)
+    incremental.replace(MEETINGS[1], 'The roadmap is on track.')
+    incremental.remove(MEETINGS[3])
+
+    rebuilt = CorpusIdf()
+    rebuilt.rebuild([MEETINGS[0], 'The roadmap is on track.', MEETINGS[2]])
+
+    assert incremental.documents == rebuilt.documents == 3
+    for term in ('the', 'budget', 'roadmap', 'slipped', 'kubernetes', 'track'):
+        assert incremental.document_frequency(term) == rebuilt.document_frequency(term)
+        assert incremental.idf(term) == rebuilt.idf(term)
+    assert incremental.document_frequency('kubernetes') == 0
+
+
+def test_keywords_prefer_terms_rare_in_the_corpus():
+    corpus = CorpusIdf()
+    corpus.rebuild(MEETINGS[:3] + ['Budget sync.', 'Budget follow-up.'])
+    analyzer = NLPAnalyzer.__new__(NLPAnalyzer)
+    analyzer.stop_words = {'the', 'and', 'for', 'we'}
+    analyzer.corpus_idf = corpus
+
+    # 'budget' is the most frequent word here but appears in every stored meeting
+    doc = AnalyzedDocument('Budget budget review. Kubernetes cluster migration.')
+    keywords = analyzer.extract_keywords(doc, num_keywords=5)
+    assert set(keywords[:3]) == {'kubernetes', 'cluster', 'migration'}
+    assert keywords.index('budget') > 2
+
+
+def test_batched_recount_matches_rebuild():
+    rebuilt = CorpusIdf()
+    rebuilt.rebuild(MEETINGS)
+
+    streamed = CorpusIdf()
+    recount = Recount()
+    recount.add(MEETINGS[:3])
+    recount.add([MEETINGS[3], None])
+    assert streamed.documents == 0  # nothing changes until the recount is installed
+    streamed.install(recount)
+
+    assert streamed.documents == rebuilt.documents == 4
+    for term in ('the', 'budget', 'kubernetes'):
+        assert streamed.document_frequency(term) == rebuilt.document_frequency(term)
+
+
+def test_writes_during_a_recount_are_replayed_when_the_scan_passed_them():
+    live = CorpusIdf()
+    for key, text in enumerate(MEETINGS[:3], 1):
+        live.add(text, key)
+    recount = live.begin_recount()
+    recount.position = 1
+    recount.add([MEETINGS[0]])
+
+    live.replace(MEETINGS[0], 'Kubernetes budget review.', key=1)  # already scanned: replayed
+    live.remove(MEETINGS[2], key=3)  # not reached yet: the scan never sees it
+    live.add(MEETINGS[3], key=4)  # not reached yet: the scan reads it
+    recount.position = 2
+    recount.add([MEETINGS[1]])
+    recount.position = 4
+    recount.add([MEETINGS[3]])
+    live.install(recount)
+
+    expected = CorpusIdf()
+    expected.rebuild(['Kubernetes budget review.', MEETINGS[1], MEETINGS[3]])
+    assert live.documents == expected.documents == 3
+    for term in ('the', 'budget', 'roadmap', 'kubernetes', 'hiring', 'reviewed'):
+        assert live.document_frequency(term) == expected.document_frequency(term)
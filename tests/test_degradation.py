@@ -0,0 +1,147 @@
+"""Tests for up-front analysis tier selection."""
+import json
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from app.degradation import EXTRACTIVE, FULL_LLM, LLM_SUMMARY, RULE_BASED, TierSelector
+from app.llm_router import ProviderRouter
+from app.nlp_analyzer import NLPAnalyzer
+
+TARGETS = [('openai', 'gpt-test')]
+TEXT = ("Alice will prepare the quarterly budget report by Friday. "
+        "We decided to postpone the product launch until March. "
+        "Bob needs to review the deployment checklist before the release. ") * 5
+
+
+@pytest.fixture
+def selector():
+    return TierSelector(ProviderRouter(), capacity=4, default_budget_s=30)
+
+
+def test_full_llm_when_healthy_and_within_budget(selector):
+    decision = selector.choose(len(TEXT), TARGETS)
+
+    assert decision.tier == FULL_LLM
+    assert decision.reason == 'within_budget'
+    assert decision.target == TARGETS[0]
+
+
+def test_tight_budget_drops_to_summary_only_then_local(selector):
+    selector.record('summary', 2.0)
+    selector.record('extraction', 10.0)
+
+    assert selector.choose(len(TEXT), TARGETS, budget_s=5).tier == LLM_SUMMARY
+    decision = selector.choose(len(TEXT), TARGETS, budget_s=1)
+    assert decision.tier == EXTRACTIVE
+    assert decision.reason == 'provider_latency'
+
+
+def test_slow_provider_latency_is_seen_before_any_call(selector):
+    for _ in range(10):
+        selector.router.record_success(TARGETS[0], 45.0)
+
+    decision = selector.choose(len(TEXT), TARGETS)
+
+    assert decision.tier == EXTRACTIVE
+    assert decision.estimates[FULL_LLM] >= 45.0
+
+
+def test_open_breaker_and_queue_depth(selector):
+    selector.begin_llm(4)
+    assert selector.choose(len(TEXT), TARGETS).reason == 'queue_depth'
+
+    selector.router.health(TARGETS[0]).trip(time.monotonic())
+    assert selector.choose(len(TEXT), TARGETS).reason == 'no_healthy_provider'
+
+
+def test_choose_reserves_the_calls_of_the_tier_it_picks(selector):
+    assert [selector.choose(len(TEXT), TARGETS).llm_calls for _ in range(3)] == [2, 2, 0]
+    assert selector.pending == 4
+
+    selector.end_llm()
+    decision = selector.choose(len(TEXT), TARGETS)
+    assert (decision.tier, decision.reason, selector.pending) == (LLM_SUMMARY, 'queue_depth', 4)
+
+
+def test_one_slow_run_does_not_pin_the_local_tiers(monkeypatch):
+    clock = [1000.0]
+    monkeypatch.setattr('app.degradation.time.monotonic', lambda: clock[0])
+    selector = TierSelector(ProviderRouter(), capacity=4, default_budget_s=30, half_life_s=300, probe_after_s=60)
+    selector.record('summary', 45.0)
+
+    assert selector.choose(len(TEXT), TARGETS).reason == 'provider_latency'
+
+    # Nothing has timed the provider for a while: one analysis probes it, the next ones wait
+    clock[0] += 61
+    probe = selector.choose(len(TEXT), TARGETS)
+    assert (probe.tier, probe.reason, probe.target) == (LLM_SUMMARY, 'probe', TARGETS[0])
+    assert selector.choose(len(TEXT), TARGETS).tier == EXTRACTIVE
+
+    # Without any fresh sample the old one fades back toward the default
+    clock[0] += 1800
+    assert selector.stats()['stage_s']['summary'] < 7.0
+    assert selector.choose(len(TEXT), TARGETS).tier == FULL_LLM
+
+
+def test_rule_based_when_textrank_unavailable_or_too_slow(selector):
+    assert selector.choose(len(TEXT), [], textrank=False).tier == RULE_BASED
+    assert selector.choose(len(TEXT), []).reason == 'no_llm_configured'
+
+
+class SlowOpenAI:
+    """Answers summaries with plain text and extraction (structured output) with JSON, after `delay_s`."""
+
+    def __init__(self, delay_s):
+        self.delay_s = delay_s
+        self.chat = SimpleNamespace(completions=self)
+
+    def create(self, **kwargs):
+        time.sleep(self.delay_s)
+        if 'response_format' in kwargs:
+            content = json.dumps({'action_items': [{
+                'text': 'Prepare the quarterly budget report',
+                'evidence_quote': 'Alice will prepare the quarterly budget report by Friday'}]})
+        else:
+            content = 'Alice owns the budget report; the launch moves to March.'
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content))])
+
+
+def _analyzer(delay_s):
+    nlp = NLPAnalyzer()
+    nlp.summary_provider = 'auto'
+    nlp.gemini_client = None
+    nlp.openai_client = SlowOpenAI(delay_s)
+    return nlp
+
+
+def test_healthy_provider_gives_full_llm_tier():
+    result = _analyzer(0.0).analyze_within_budget(TEXT, latency_budget_s=30)
+
+    assert result['metadata']['method'] == FULL_LLM
+    assert result['metadata']['extraction_method'] == 'openai'
+    assert result['summary'].startswith('Alice owns')
+
+
+def test_overrunning_provider_is_abandoned_at_the_deadline():
+    nlp = _analyzer(2.0)
+    # Recent history says the provider is fast, so the full tier is chosen
+    nlp.tiers.record('summary', 0.01)
+    nlp.tiers.record('extraction', 0.01)
+
+    started = time.monotonic()
+    result = nlp.analyze_within_budget(TEXT, latency_budget_s=0.3)
+    elapsed = time.monotonic() - started
+
+    assert elapsed < 1.0
+    meta = result['metadata']
+    assert meta['tier']['tier'] == FULL_LLM
+    assert meta['method'] == EXTRACTIVE
+    assert meta['degraded_reason'] == 'deadline'
+    assert result['summary'] and meta['extraction_method'] == 'rule_based'
+
+    # The late replies still land and teach the selector how slow the provider is
+    time.sleep(2.5)
+    assert nlp.tiers.stats()['stage_s']['summary'] > 0.3
+    assert nlp.analyze_within_budget(TEXT, latency_budget_s=0.3)['metadata']['tier']['reason'] == 'provider_latency'
@@ -0,0 +1,48 @@
+"""Tests for the shared AnalyzedDocument views."""
+import re
+
+from app.document import AnalyzedDocument
+
+TEXT = "Sarah (Infra): We ship Friday!  John: Alice will test it... OK?\nLisa: Done"
+
+
+def test_sentences_match_legacy_split_with_offsets():
+    doc = AnalyzedDocument(TEXT)
+
+    legacy = [s.strip() for s in re.split(r'[.!?]+', TEXT) if s.strip()]
+    assert [s.text for s in doc.sentences] == legacy
+    assert all(TEXT[s.start:s.end] == s.text for s in doc.sentences)
+    assert all(doc.lower_of(s) == s.text.lower() for s in doc.sentences)
+
+
+def test_words_and_speaker_turns():
+    doc = AnalyzedDocument(TEXT)
+
+    assert doc.words == re.findall(r'\b[a-z]+\b', TEXT.lower())
+    assert [(t.speaker, t.role) for t in doc.speaker_turns] == [('Sarah', 'Infra'), ('Lisa', None)]
+    assert TEXT[doc.speaker_turns[0].start:doc.speaker_turns[0].end] == "We ship Friday!  John: Alice will test it... OK?"
+
+
+def _legacy_find_span(text, quote):
+    idx = text.lower().find(quote.lower())
+    if idx >= 0:
+        return idx, idx + len(quote)
+    words = re.findall(r"\w+", quote)
+    if len(words) < 2 or len(words) > 25:
+        return None
+    sep = r"[\s\.,;:!\?\-–—'\"/\\()\[\]]+"
+    m = re.search(sep.join(r"\b" + re.escape(w) + r"\b" for w in words), text, re.IGNORECASE)
+    return m.span() if m else None
+
+
+def test_find_evidence_matches_linear_search():
+    text = ("Alice (PM): Let's ship the beta on Friday. John: Sure -- I'll update the docs; "
+            "then ship the beta! Sarah: The BETA ships Friday, right?\nLisa: (ship) the beta...")
+    doc = AnalyzedDocument(text)
+    quotes = [
+        "ship the beta", "SHIP THE BETA on friday", "ll update the docs", "update docs",
+        "the beta ships friday right", "ship, the beta", "beta on Monday", "Friday",
+        "Lisa ship the beta", "hip the bet", "   ", "x",
+    ]
+    for quote in quotes:
+        assert doc.find_evidence(quote) == _legacy_find_span(text, quote.strip()), quote
@@ -0,0 +1,80 @@
+"""Tests for the background enrichment worker's queueing and retries."""
+from types import SimpleNamespace
+
+import pytest
+
+from app import enrichment
+from app.enrichment import EnrichmentJob, EnrichmentWorker
+from app.nlp_analyzer import NLPAnalyzer
+
+
+@pytest.mark.asyncio
+async def test_failed_jobs_are_retried_until_they_succeed():
+    calls = []
+
+    async def process(job):
+        calls.append((job.meeting_id, job.attempts))
+        if job.meeting_id == 'flaky' and job.attempts < 3:
+            raise RuntimeError('provider timeout')
+
+    worker = EnrichmentWorker(process, workers=2, max_attempts=5, backoff_s=0.001)
+    worker.start()
+    worker.submit(EnrichmentJob('flaky'))
+    worker.submit(EnrichmentJob('ok'))
+    await worker.join()
+    await worker.stop()
+
+    assert ('ok', 1) in calls
+    assert [a for m, a in calls if m == 'flaky'] == [1, 2, 3]
+
+
+@pytest.mark.asyncio
+async def test_last_failure_is_reported():
+    failed = []
+
+    async def process(job):
+        raise RuntimeError(f'boom {job.attempts}')
+
+    async def on_failure(job):
+        failed.append((job.meeting_id, job.attempts, job.errors[-1]))
+
+    worker = EnrichmentWorker(process, on_failure=on_failure, workers=1, max_attempts=2, backoff_s=0.001)
+    worker.start()
+    worker.submit(EnrichmentJob('m1'))
+    await worker.join()
+    await worker.stop()
+
+    assert failed == [('m1', 2, 'boom 2')]
+
+
+@pytest.mark.asyncio
+async def test_enrichment_stores_chunk_entries(monkeypatch):
+    meeting = SimpleNamespace(transcript="Alice: I will send the budget report by Friday. We decided to ship.",
+                              meta='', action_items=[])
+    updates, statuses = [], []
+
+    async def get_meeting(meeting_id):
+        return meeting
+
+    async def update_meeting(meeting_id, **fields):
+        updates.append(fields)
+        return True
+
+    async def set_analysis_status(meeting_id, status, error=None):
+        statuses.append(status)
+
+    monkeypatch.setattr(enrichment.db, 'get_meeting', get_meeting)
+    monkeypatch.setattr(enrichment.db, 'update_meeting', update_meeting)
+    monkeypatch.setattr(enrichment.db, 'set_analysis_status', set_analysis_status)
+    nlp = NLPAnalyzer()
+    monkeypatch.setattr(nlp, '_llm_targets', lambda *a, **k: [])
+
+    await enrichment.enrich_meeting(EnrichmentJob('m1'), nlp)
+    assert statuses == [enrichment.RUNNING, enrichment.DONE]
+    assert updates[-1]['analysis_chunks'] and updates[-1]['action_items']
+
+    # Items supplied by the client: keywords only, no per-chunk LLM pass; the first edit builds the chunks
+    updates.clear()
+    monkeypatch.setattr(nlp, 'analyze_chunks', lambda *a, **k: pytest.fail('chunks analyzed for keywords'))
+    await enrichment.enrich_meeting(EnrichmentJob('m1', extract_items=False), nlp)
+    assert sorted(updates[-1]) == ['analysis_fingerprint', 'keywords', 'meta']
@@ -0,0 +1,113 @@
+"""Tests for the bounded executors that keep blocking work off the event loop."""
+import asyncio
+import contextvars
+import pickle
+import threading
+import time
+
+import pytest
+
+from app import executors
+from app.upload_text import UploadError, document_text
+
+
+@pytest.fixture(autouse=True)
+def fresh_pools():
+    yield
+    executors.shutdown()
+
+
+def test_pool_refuses_work_past_its_limit():
+    pool = executors.BoundedPool('test', workers=1, queue=1)
+    release = threading.Event()
+    running = [pool.submit(release.wait), pool.submit(release.wait)]
+
+    with pytest.raises(executors.ExecutorSaturated) as exc:
+        pool.submit(release.wait)
+    assert exc.value.pool == 'test' and exc.value.limit == 2
+    stats = pool.stats()
+    assert stats['saturated'] and stats['rejected'] == 1 and stats['queued'] >= 1
+
+    # Clean-up is admitted even when the pool is full
+    cleanup = pool.submit_required(lambda: 'cleaned')
+    release.set()
+    assert cleanup.result(timeout=5) == 'cleaned'
+    for future in running:
+        future.result(timeout=5)
+
+    stats = pool.stats()
+    assert (stats['running'], stats['queued'], stats['saturated']) == (0, 0, False)
+    assert stats['completed'] == 3 and stats['submitted'] == 3 and stats['max_outstanding'] == 3
+    assert stats['wait_ms']['max'] > 0
+    pool.shutdown()
+
+
+async def test_blocking_work_leaves_the_loop_responsive():
+    ticks = 0
+
+    async def ticker():
+        nonlocal ticks
+        while True:
+            await asyncio.sleep(0.01)
+            ticks += 1
+
+    task = asyncio.create_task(ticker())
+    await executors.run('cpu', time.sleep, 0.3)
+    task.cancel()
+
+    # Had the sleep run on the loop the ticker would not have run at all
+    assert ticks >= 10
+    assert executors.stats()['pools']['cpu']['completed'] == 1
+
+
+async def test_thread_pools_see_the_callers_context():
+    request_id = contextvars.ContextVar('request_id', default=None)
+    request_id.set('req-1')
+
+    assert await executors.run('io', request_id.get) == 'req-1'
+
+
+async def test_document_parsing_runs_in_worker_processes():
+    text, _ = await executors.run('process', document_text, '.txt', 'héllo'.encode('utf-8'))
+    assert text == 'héllo'
+    assert executors.stats()['pools']['process']['kind'] == 'process'
+
+    error = pickle.loads(pickle.dumps(UploadError('needs PyPDF2', 500)))
+    assert (error.message, error.status) == ('needs PyPDF2', 500)
+
+
+def test_process_pool_can_fall_back_to_threads(monkeypatch):
+    monkeypatch.setenv('EXEC_PROCESS_WORKERS', '0')
+
+    assert executors.pool('process') is executors.pool('cpu')
+    assert list(executors.stats()['pools']) == ['cpu']
+
+
+async def test_admitted_processing_job_waits_out_saturated_pools(monkeypatch):
+    from app import api
+
+    monkeypatch.setenv('EXEC_IO_WORKERS', '1')
+    monkeypatch.setenv('EXEC_IO_QUEUE', '0')
+    release = threading.Event()
+    busy = executors.pool('io').submit(release.wait)
+    with pytest.raises(executors.ExecutorSaturated):
+        await executors.run('io', time.sleep, 0)
+
+    saved = {}
+
+    async def save_meeting(**fields):
+        saved.update(fields)
+        return 'm1'
+
+    monkeypatch.setattr(api, '_analyze_for_meeting', lambda *args: {
+        'summary': 's', 'keywords': [], 'action_items': [], 'decisions': [], 'key_topics': [],
+        'extraction_metadata': {}, 'analysis_chunks': []})
+    monkeypatch.setattr(api.db, 'save_meeting', save_meeting)
+    job = api.jobs.create('u', 'process_meeting')
+
+    threading.Timer(0.2, release.set).start()
+    await api._process_meeting_job(job.id, 'u', 'Standup', None, 'We agreed to ship.', None, [], None)
+    busy.result(timeout=5)
+
+    assert api.jobs.get(job.id).to_dict()['result']['meeting_id'] == 'm1'
+    assert saved['required'] is True
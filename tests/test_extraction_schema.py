@@ -0,0 +1,56 @@
+"""Tests for structured extraction parsing and local JSON repair."""
+import pytest
+
+from app.extraction_schema import (
+    ExtractionParseError,
+    GeminiExtraction,
+    OpenAIExtraction,
+    parse_extraction,
+    provider_schema,
+)
+
+
+def test_parse_valid_reply_applies_schema_defaults():
+    raw = '{"action_items": [{"task": "Draft plan", "owner": null}], "decisions": []}'
+    result, repaired = parse_extraction(raw, GeminiExtraction)
+
+    assert not repaired
+    assert result['action_items'] == [{
+        'task': 'Draft plan', 'owner': '', 'assignee': '', 'deadline': '',
+        'priority': 'medium', 'status': 'pending',
+    }]
+    assert result['key_topics'] == []
+
+
+@pytest.mark.parametrize('raw', [
+    '```json\n{"action_items": [{"task": "Draft plan",},],}\n```',
+    'Here you go: {"action_items": [{"task": "Draft plan"}]} Hope this helps!',
+    '{"action_items": [{"task": "Draft plan", "owner": "Al',
+    '{"action_items": [{"task": "Draft plan", "own',
+])
+def test_malformed_replies_are_repaired_locally(raw):
+    result, repaired = parse_extraction(raw, GeminiExtraction)
+
+    assert repaired
+    assert result['action_items'][0]['task'] == 'Draft plan'
+
+
+def test_unrepairable_reply_raises():
+    with pytest.raises(ExtractionParseError):
+        parse_extraction('no json here', OpenAIExtraction)
+
+
+def test_invalid_items_are_dropped_not_fatal():
+    raw = '{"action_items": [{"text": "Ship it", "confidence": "high"}, {"text": "Review", "confidence": 0.8}]}'
+    result, _ = parse_extraction(raw, OpenAIExtraction)
+
+    assert [item['text'] for item in result['action_items']] == ['Review']
+
+
+def test_openai_schema_is_strict():
+    schema = provider_schema(OpenAIExtraction, 'openai')
+    item = schema['properties']['action_items']['items']
+
+    assert item['additionalProperties'] is False
+    assert set(item['required']) == set(item['properties'])
+    assert item['properties']['owner'] == {'anyOf': [{'type': 'string'}, {'type': 'null'}]}
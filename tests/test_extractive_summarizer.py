@@ -0,0 +1,31 @@
+"""Tests for the offline TextRank summarizer."""
+import time
+from pathlib import Path
+
+from app.extractive_summarizer import TextRankSummarizer, split_sentences
+
+TRANSCRIPT = Path(__file__).resolve().parents[1] / 'data' / 'transcripts' / 'one_hour_meeting.txt'
+
+
+def test_split_sentences_keeps_offsets():
+    text = 'Alice: We ship Friday.  Bob: Agreed!\nNext topic'
+    spans = split_sentences(text)
+
+    assert [s for _, _, s in spans] == ['Alice: We ship Friday.', 'Bob: Agreed!', 'Next topic']
+    assert all(text[a:b] == s for a, b, s in spans)
+
+
+def test_one_hour_transcript_is_fast_and_within_budget():
+    text = TRANSCRIPT.read_text(encoding='utf-8-sig')
+    summarizer = TextRankSummarizer(stop_words={'the', 'and', 'to', 'we', 'of', 'a'})
+
+    started = time.perf_counter()
+    summary = summarizer.summarize(text, max_words=150)
+    elapsed = time.perf_counter() - started
+
+    assert summary
+    assert len(summary.split()) <= 150
+    # Sentences come back verbatim from the transcript
+    source = {s for _, _, s in split_sentences(text)}
+    assert all(s in source for _, _, s in split_sentences(summary))
+    assert elapsed < 1.0
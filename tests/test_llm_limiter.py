@@ -0,0 +1,32 @@
+"""Tests for the adaptive LLM concurrency/token-rate limiter."""
+import pytest
+
+from app.llm_limiter import AdaptiveLimiter, RateLimited
+
+TARGET = ('openai', 'gpt-4o-mini')
+
+
+def test_quota_halves_limits_and_success_grows_them():
+    limiter = AdaptiveLimiter(initial_limit=8, max_limit=16, initial_tpm=100000, max_tpm=100000, queue_s=0)
+
+    limiter.acquire(TARGET)
+    limiter.release(TARGET, 'quota')
+    state = limiter.snapshot()['openai/gpt-4o-mini']
+    assert state['concurrency_limit'] == 4 and state['tpm_limit'] == 50000
+
+    limiter.acquire(TARGET)
+    limiter.release(TARGET)
+    assert limiter.snapshot()['openai/gpt-4o-mini']['concurrency_limit'] == 4.25
+
+
+def test_over_limit_calls_are_rejected_after_queue_wait():
+    limiter = AdaptiveLimiter(initial_limit=1, initial_tpm=1000, queue_s=0.05)
+
+    limiter.acquire(TARGET, tokens=100)
+    with pytest.raises(RateLimited):
+        limiter.acquire(TARGET, tokens=100)
+    limiter.release(TARGET)
+    # The bucket holds 900 tokens and refills at 1000/min, so a 10k-token call must wait
+    with pytest.raises(RateLimited):
+        limiter.acquire(TARGET, tokens=10000, timeout=0)
+    assert limiter.snapshot()['openai/gpt-4o-mini']['throttled'] == 2
@@ -0,0 +1,133 @@
+"""Tests for health-aware LLM provider routing."""
+import time
+
+import pytest
+
+from app.llm_router import HedgeBudget, NoHealthyProviderError, ProviderRouter, classify_error
+
+GEMINI = ('gemini', 'gemini-1.5-flash')
+OPENAI = ('openai', 'gpt-4o-mini')
+
+
+def test_quota_error_opens_breaker_and_fails_over():
+    router = ProviderRouter(max_attempts=3, open_seconds=60)
+    calls = []
+
+    def fn(provider, model):
+        calls.append(provider)
+        if provider == 'gemini':
+            raise Exception('429 Resource has been exhausted (e.g. check quota).')
+        return 'ok'
+
+    assert router.call([GEMINI, OPENAI], fn) == ('ok', OPENAI)
+    # Breaker is open: the second request skips Gemini entirely
+    assert router.call([GEMINI, OPENAI], fn) == ('ok', OPENAI)
+    assert calls == ['gemini', 'openai', 'openai']
+    assert router.snapshot()['gemini/gemini-1.5-flash']['state'] == 'open'
+
+
+def test_retry_budget_caps_attempts():
+    router = ProviderRouter(max_attempts=1)
+
+    def fn(provider, model):
+        raise TimeoutError('request timed out')
+
+    with pytest.raises(NoHealthyProviderError):
+        router.call([GEMINI, OPENAI], fn)
+    assert router.snapshot()['gemini/gemini-1.5-flash']['samples'] == 1
+    assert router.snapshot()['openai/gpt-4o-mini']['samples'] == 0
+
+
+def test_classify_error():
+    assert classify_error(Exception('503 Service Unavailable')) == 'server'
+    assert classify_error(Exception('Error code: 401 - invalid_api_key')) == 'auth'
+    assert classify_error(ValueError('bad json')) == 'other'
+    # Numbers that merely contain a status code are not one
+    assert classify_error(ValueError('prompt exceeds maximum 1500 tokens')) == 'other'
+    assert classify_error(Exception('Error code: 500 - internal')) == 'server'
+
+
+def test_hedged_call_takes_faster_secondary():
+    router = ProviderRouter(max_attempts=3)
+    router.hedge_min_samples = 1
+    router.record_success(GEMINI, 0.01)  # primary p90 = 10ms
+
+    def fn(provider, model):
+        if provider == 'gemini':
+            time.sleep(0.3)
+            return 'slow'
+        return 'fast'
+
+    assert router.hedged_call([GEMINI, OPENAI], fn, tenant='t1') == ('fast', OPENAI)
+    stats = router.hedges.stats()
+    assert stats['hedges'] == 1 and stats['wins'] == 1
+    assert stats['tenants']['t1']['hedge_rate'] == 1.0
+
+
+def test_hedge_budget_is_per_tenant():
+    budget = HedgeBudget(ratio=0.1, burst=1)
+
+    budget.on_request('a')
+    assert budget.try_hedge('a')
+    budget.on_request('a')
+    assert not budget.try_hedge('a')
+    budget.on_request('b')
+    assert budget.try_hedge('b')
+
+
+def test_cooldown_expiring_while_another_target_is_healthy_still_allows_a_probe():
+    router = ProviderRouter(max_attempts=3, open_seconds=60)
+    router.record_success(OPENAI, 0.01)
+    router.health(GEMINI).trip(time.monotonic() - 120)  # cooldown already over
+
+    # Gemini is eligible again but OpenAI is healthier and serves the request
+    assert router.rank([GEMINI, OPENAI]) == [OPENAI, GEMINI]
+    assert router.call([GEMINI, OPENAI], lambda p, m: p) == ('openai', OPENAI)
+    assert router.snapshot()['gemini/gemini-1.5-flash']['state'] == 'open'
+
+    # The target was never probed, so it is still offered rather than stuck half-open
+    assert GEMINI in router.rank([GEMINI, OPENAI])
+    assert router.call([GEMINI], lambda p, m: p) == ('gemini', GEMINI)
+    assert router.snapshot()['gemini/gemini-1.5-flash']['state'] == 'closed'
+
+
+def test_only_one_probe_while_half_open():
+    router = ProviderRouter(max_attempts=3, open_seconds=60)
+    h = router.health(GEMINI)
+    h.trip(time.monotonic() - 120)
+
+    assert h.begin(time.monotonic()) and h.state == 'half_open'
+    # A second attempt while the probe is in flight is turned away without spending the budget
+    with pytest.raises(NoHealthyProviderError):
+        router.call([GEMINI], lambda p, m: p)
+    assert router.snapshot()['gemini/gemini-1.5-flash']['samples'] == 0
+
+
+def test_streamed_call_holds_its_slot_and_stays_out_of_latency_window():
+    router = ProviderRouter(max_attempts=3)
+    router.record_success(OPENAI, 2.0)
+
+    def fn(provider, model):
+        if provider == 'gemini':
+            return iter([])  # empty stream: fails over like an error
+        return iter(['a', 'b', 'c'])
+
+    stream, target = router.call([GEMINI, OPENAI], fn, stream=True)
+    assert target == OPENAI
+    assert next(stream) == 'a'
+    assert router.limiter.snapshot()['openai/gpt-4o-mini']['in_flight'] == 1
+    assert list(stream) == ['b', 'c']
+    assert router.limiter.snapshot()['openai/gpt-4o-mini']['in_flight'] == 0
+
+    health = router.health(OPENAI)
+    assert len(health.samples) == 2 and health.latency_percentile(90) == 2.0
+    assert router.health(GEMINI).error_rate == 1.0
+
+
+def test_abandoned_stream_returns_its_slot():
+    router = ProviderRouter(max_attempts=1)
+    stream, _ = router.call([OPENAI], lambda p, m: iter(['a', 'b']), stream=True)
+    next(stream)
+    stream.close()
+
+    assert router.limiter.snapshot()['openai/gpt-4o-mini']['in_flight'] == 0
@@ -0,0 +1,80 @@
+"""Tests for MinHash/LSH near-duplicate candidate generation."""
+import difflib
+import random
+
+from app.near_duplicates import NearDuplicateIndex
+from app.nlp_analyzer import NLPAnalyzer
+
+
+def _brute_force_pairs(texts, threshold=0.7):
+    return {
+        (i, j)
+        for i in range(len(texts))
+        for j in range(i + 1, len(texts))
+        if difflib.SequenceMatcher(None, texts[i], texts[j]).ratio() > threshold
+    }
+
+
+def test_candidates_cover_similar_pairs():
+    texts = [
+        'alice will send the budget report by friday',
+        'alice will send the budget report by friday.',
+        'bob to update the onboarding docs',
+        'bob will update the onboarding documents',
+        'schedule a follow-up with the vendor next week',
+        'alice will send the budget report by friday',
+        'ok',
+    ]
+    index = NearDuplicateIndex(texts)
+    found = {(i, j) for i in range(len(texts)) for j in index.candidates(i)}
+
+    assert _brute_force_pairs(texts) <= found
+    assert all(j > i for i, j in found)
+    assert (0, 5) in found  # identical texts are always candidates
+
+
+def test_merge_matches_pairwise_fields():
+    items = [
+        {'text': 'Alice will send the budget report', 'assignee': 'Unassigned',
+         'deadline': 'No deadline specified', 'confidence': 0.6},
+        {'text': 'Bob to book the offsite venue', 'assignee': 'Bob', 'confidence': 0.8},
+        {'text': 'alice will send the budget report.', 'assignee': 'Alice',
+         'deadline': 'Friday', 'confidence': 0.9, 'evidence': 'quote'},
+    ]
+    analyzer = NLPAnalyzer.__new__(NLPAnalyzer)
+    merged = analyzer._merge_similar_items(items)
+
+    assert [m['text'] for m in merged] == [items[0]['text'], items[1]['text']]
+    assert merged[0]['assignee'] == 'Alice'
+    assert merged[0]['deadline'] == 'Friday'
+    assert merged[0]['evidence'] == 'quote'
+    assert abs(merged[0]['confidence'] - 0.75) < 1e-9
+
+
+def test_thousands_of_texts_reach_few_exact_comparisons():
+    rng = random.Random(7)
+    letters = 'abcdefghijklmnopqrstuvwxyz'
+    words = [''.join(rng.choice(letters) for _ in range(rng.randint(3, 9))) for _ in range(400)]
+    texts = [' '.join(rng.choice(words) for _ in range(8)) for _ in range(3000)]
+
+    index = NearDuplicateIndex(texts)
+    total = sum(len(index.candidates(i)) for i in range(len(texts)))
+
+    # Only a small fraction of the ~4.5M pairs reach the exact comparison
+    assert total < len(texts) * (len(texts) - 1) // 2 // 30
+
+
+def test_merge_agrees_with_pairwise_comparison():
+    rng = random.Random(3)
+    base = ['send the budget report to finance', 'book the offsite venue for march',
+            'update onboarding docs for new hires', 'review the vendor contract draft']
+    texts = []
+    for _ in range(200):
+        words = rng.choice(base).split()
+        if rng.random() < 0.5:
+            words[rng.randrange(len(words))] = rng.choice(['quickly', 'team', 'q3', 'the'])
+        texts.append(' '.join(words))
+
+    index = NearDuplicateIndex(texts)
+    found = {(i, j) for i in range(len(texts)) for j in index.candidates(i)}
+    assert _brute_force_pairs(texts) <= found
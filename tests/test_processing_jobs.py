@@ -0,0 +1,74 @@
+"""Tests for the processing job registry."""
+import asyncio
+
+import pytest
+
+from app.processing_jobs import DONE, FAILED, QUEUED, RUNNING, JobQueueFull, JobRegistry
+
+
+def test_job_lifecycle():
+    jobs = JobRegistry()
+    job = jobs.create('user-1', 'process_meeting')
+    assert jobs.get(job.id).status == QUEUED
+
+    jobs.stage(job.id, 'transcribing', 0.1)
+    assert (job.status, job.stage, job.progress) == (RUNNING, 'transcribing', 0.1)
+
+    jobs.finish(job.id, {'meeting_id': 'm1'})
+    state = jobs.get(job.id).to_dict()
+    assert state['status'] == DONE
+    assert state['progress'] == 1.0
+    assert state['result'] == {'meeting_id': 'm1'}
+
+    failed = jobs.create('user-1', 'process_meeting')
+    jobs.fail(failed.id, 'no speech')
+    assert jobs.get(failed.id).to_dict()['error'] == 'no speech'
+    assert jobs.get(failed.id).status == FAILED
+
+
+def test_finished_jobs_expire():
+    jobs = JobRegistry(retention_s=-1)
+    old = jobs.create('u', 'process_meeting')
+    running = jobs.create('u', 'process_meeting')
+    jobs.finish(old.id, {})
+    jobs.stage(running.id, 'analyzing', 0.5)
+
+    jobs.create('u', 'process_meeting')  # creating a job prunes expired ones
+    assert jobs.get(old.id) is None
+    assert jobs.get(running.id) is not None
+
+
+def test_active_jobs_are_capped():
+    jobs = JobRegistry(max_active=2)
+    first = jobs.create('u', 'process_meeting')
+    jobs.create('u', 'process_meeting')
+
+    with pytest.raises(JobQueueFull):
+        jobs.create('u', 'process_meeting')
+
+    jobs.finish(first.id, {})  # a finished job frees its place
+    assert jobs.get(jobs.create('u', 'process_meeting').id) is not None
+
+
+async def test_job_cancelled_at_shutdown_is_not_left_running(monkeypatch):
+    from app import api
+
+    saving = asyncio.Event()
+
+    async def save_meeting(**fields):
+        saving.set()
+        await asyncio.Event().wait()
+
+    monkeypatch.setattr(api, '_analyze_for_meeting', lambda *args: {
+        'summary': 's', 'keywords': [], 'action_items': [], 'decisions': [], 'key_topics': [],
+        'extraction_metadata': {}, 'analysis_chunks': []})
+    monkeypatch.setattr(api.db, 'save_meeting', save_meeting)
+    job = api.jobs.create('u', 'process_meeting')
+    api.jobs.track(job.id, asyncio.create_task(
+        api._process_meeting_job(job.id, 'u', 'Standup', None, 'We agreed to ship.', None, [], None)))
+    await asyncio.wait_for(saving.wait(), timeout=5)
+
+    await api.jobs.cancel_all()
+
+    assert api.jobs.get(job.id).status == FAILED
+    assert 'shut down' in api.jobs.get(job.id).error
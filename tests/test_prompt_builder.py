@@ -0,0 +1,92 @@
+"""Tests for prompt construction and filler stripping."""
+from types import SimpleNamespace
+
+from app.nlp_analyzer import NLPAnalyzer
+from app.prompt_builder import PromptBuilder, prepare_transcript, strip_fillers
+
+
+def test_strip_fillers_is_reversible():
+    text = "Um, so we we will, uh, ship the the release by Friday.\nJohn: I- I think that's fine um."
+    clean, fillers = strip_fillers(text)
+
+    assert clean == "so we will, ship the release by Friday.\nJohn: I think that's fine."
+    assert fillers.restore(clean) == text
+
+
+
+def test_grammatical_doubles_are_kept():
+    text = "I think that that is fine. He had had enough. Bye bye. Mm, Hmm.\nNo, uh. We we we ship."
+    clean, fillers = strip_fillers(text)
+
+    assert clean == "I think that that is fine. He had had enough. Bye bye.\nNo. We ship."
+    assert fillers.restore(clean) == text
+
+def test_clean_spans_map_back_to_original():
+    text = "We need to, um, finalize the the budget by Monday."
+    clean, fillers = strip_fillers(text)
+    quote = "finalize the budget"
+    start = clean.index(quote)
+
+    orig_start, orig_end = fillers.to_original_span(start, start + len(quote))
+
+    assert text[orig_start:orig_end] == "finalize the the budget"
+
+
+def test_model_text_spans_map_back_through_normalization():
+    text = "Um, the ﬁnal plan — “ship it” … Bob will, uh, édit the docs."
+    prepared = prepare_transcript(text)
+    assert prepared.model_text == 'the final plan - "ship it" ... Bob will, édit the docs.'
+
+    for quote, original in (('"ship it"', '“ship it”'), ('final plan - "ship', 'ﬁnal plan — “ship'),
+                            ('Bob will, édit', 'Bob will, uh, édit'), ('fi', 'ﬁ')):
+        start = prepared.model_text.index(quote)
+        orig_start, orig_end = prepared.to_original_span(start, start + len(quote))
+        assert text[orig_start:orig_end] == original
+
+
+def test_extraction_prompt_embeds_transcript_once():
+    prepared = prepare_transcript("Alice will, uh, draft the launch plan by Tuesday.")
+    prompt = PromptBuilder().build('openai_extraction', transcript=prepared,
+                                   meeting_date='2025-01-01', attendees='Alice')
+
+    assert prompt.user.count("draft the launch plan") == 1
+    assert "uh," not in prompt.user
+    assert prompt.prompt_tokens > 0
+    assert prompt.fillers_removed == 1
+
+
+class _FakeOpenAI:
+    def __init__(self):
+        self.prompts = []
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self._create))
+
+    def _create(self, model, messages, **kwargs):
+        self.prompts.append(messages[-1]['content'])
+        reply = SimpleNamespace(message=SimpleNamespace(content=f"summary {len(self.prompts)}"))
+        return SimpleNamespace(choices=[reply])
+
+
+class _FakeGemini:
+    def __init__(self):
+        self.prompts = []
+
+    def generate_content(self, prompt):
+        self.prompts.append(prompt)
+        return SimpleNamespace(text=f"summary {len(self.prompts)}")
+
+
+def test_long_transcripts_are_summarized_in_chunks(monkeypatch):
+    transcript = "Alice: We reviewed the, um, launch checklist and the rollout plan. " * 600
+    nlp = NLPAnalyzer()
+    nlp.openai_client = _FakeOpenAI()
+    gemini = _FakeGemini()
+    monkeypatch.setattr(nlp, '_gemini_model_client', lambda model=None: gemini)
+
+    assert nlp._summarize_openai(transcript, model='gpt-test').startswith('summary')
+    assert nlp._summarize_gemini(transcript).startswith('summary')
+
+    # Chunk prompts, then one synthesis prompt over their summaries
+    for client in (nlp.openai_client, gemini):
+        assert len(client.prompts) > 2
+        assert "launch checklist" in client.prompts[0] and "um," not in client.prompts[0]
+        assert "summary 1" in client.prompts[-1]
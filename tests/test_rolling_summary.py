@@ -0,0 +1,55 @@
+"""Tests for incremental rolling summaries of live transcripts."""
+import time
+from pathlib import Path
+
+import pytest
+
+from app.nlp_analyzer import NLPAnalyzer
+from app.rolling_summary import split_complete
+
+TRANSCRIPT = Path(__file__).resolve().parents[1] / 'data' / 'transcripts' / 'one_hour_meeting.txt'
+
+
+@pytest.fixture(scope='module')
+def analyzer():
+    return NLPAnalyzer()
+
+
+def test_split_complete_holds_back_unfinished_sentence():
+    assert split_complete('We ship Friday. Bob will') == ('We ship Friday.', ' Bob will')
+    assert split_complete('Alice: agreed\nBob: next') == ('Alice: agreed\n', 'Bob: next')
+    assert split_complete('no boundary yet') == ('', 'no boundary yet')
+
+
+def test_updates_consume_only_the_delta(analyzer):
+    text = TRANSCRIPT.read_text(encoding='utf-8-sig')
+    deltas = [text[i:i + 2000] for i in range(0, len(text), 2000)]
+
+    timings = []
+    for delta in deltas:
+        started = time.perf_counter()
+        state = analyzer.update_rolling_summary('live-1', delta, max_length=300, provider='textrank')
+        timings.append(time.perf_counter() - started)
+        assert state['consumed_chars'] + state['pending_chars'] <= len(text)
+        assert len(state['summary'].split()) <= 300
+
+    final = analyzer.end_rolling_summary('live-1')
+    assert final['consumed_chars'] == len(text)
+    assert final['pending_chars'] == 0
+    assert final['method'] == 'textrank'
+    assert final['summary']
+    assert final['action_items']
+    assert analyzer.rolling_summary('live-1') is None
+    # Later updates cost about the same as early ones instead of growing with the meeting
+    assert max(timings) < 0.5
+
+
+def test_unfinished_sentence_waits_for_next_delta(analyzer):
+    state = analyzer.update_rolling_summary('live-2', 'Sarah will send the deck', provider='textrank')
+    assert state['updates'] == 0
+    assert state['pending_chars'] == len('Sarah will send the deck')
+
+    state = analyzer.update_rolling_summary('live-2', ' by Friday.\nTom: ok', provider='textrank')
+    assert state['updates'] == 1
+    assert [item['text'] for item in state['action_items']] == ['send the deck by Friday']
+    analyzer.end_rolling_summary('live-2')
@@ -0,0 +1,51 @@
+"""Golden tests for the precompiled rule-based extraction engine."""
+import json
+import re
+from pathlib import Path
+
+import pytest
+
+from app.document import AnalyzedDocument
+from app.nlp_analyzer import NLPAnalyzer
+from app.rule_engine import PatternSet
+
+ROOT = Path(__file__).resolve().parent.parent
+TRANSCRIPTS = ['one_hour_meeting', 'one_hour_snippet']
+
+
+@pytest.fixture(scope='module')
+def analyzer():
+    return NLPAnalyzer()
+
+
+def _load(name):
+    text = (ROOT / 'data' / 'transcripts' / f'{name}.txt').read_text(encoding='utf-8')
+    golden = json.loads((ROOT / 'tests' / 'golden' / f'rule_based_{name}.json').read_text(encoding='utf-8'))
+    return text, golden
+
+
+@pytest.mark.parametrize('name', TRANSCRIPTS)
+def test_rule_based_extraction_matches_golden(analyzer, name):
+    text, golden = _load(name)
+
+    result = analyzer._extract_enhanced_items_rule_based(text)
+    result['metadata'] = {k: result['metadata'][k] for k in ('method', 'confidence')}
+    assert result == golden['extraction']
+
+    for line_no, expected in golden['per_line_action_items'].items():
+        assert analyzer._extract_action_items_rule_based(text.splitlines()[int(line_no) - 1]) == expected
+
+
+def test_pattern_set_matches_finditer(analyzer):
+    text, _ = _load('one_hour_meeting')
+    rules = PatternSet(analyzer.action_patterns, re.IGNORECASE)
+
+    for sentence in AnalyzedDocument(text).sentences[:300]:
+        scanned = rules.scan(text, sentence.start, sentence.end)
+        for compiled, matches in zip(rules.patterns, scanned, strict=True):
+            expected = [(m.span(), m.groups()) for m in compiled.finditer(text, sentence.start, sentence.end)]
+            assert [(m.span(), m.groups()) for m in matches] == expected
+
+    deadlines = PatternSet([r'by\s+(Friday)', r'due\s+(\w+)'], re.IGNORECASE)
+    assert deadlines.first('due soon, by Friday').group(1) == 'Friday'
+    assert deadlines.first('nothing here') is None
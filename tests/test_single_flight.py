@@ -0,0 +1,61 @@
+"""Tests for single-flight coalescing of identical concurrent calls."""
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from app.single_flight import SingleFlight, flight_key
+
+
+def test_concurrent_identical_calls_share_one_computation():
+    flights = SingleFlight()
+    calls = []
+    started = threading.Event()
+
+    def compute():
+        calls.append(1)
+        started.set()
+        time.sleep(0.1)
+        return {'summary': 'shared', 'items': [1]}
+
+    key = flight_key('summary', 'same transcript', 500)
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        first = pool.submit(flights.do, key, compute)
+        started.wait()
+        rest = [pool.submit(flights.do, key, compute) for _ in range(7)]
+        results = [first.result()] + [f.result() for f in rest]
+
+    assert len(calls) == 1
+    assert all(r == {'summary': 'shared', 'items': [1]} for r in results)
+    # Each follower gets its own copy
+    results[1]['items'].append(2)
+    assert results[2]['items'] == [1]
+    assert flights.stats == {'leaders': 1, 'coalesced': 7}
+    assert flights.in_flight() == 0
+
+
+def test_errors_reach_every_waiter_and_next_call_runs_again():
+    flights = SingleFlight()
+    started = threading.Event()
+
+    def fail():
+        started.set()
+        time.sleep(0.05)
+        raise RuntimeError('provider down')
+
+    with ThreadPoolExecutor(max_workers=3) as pool:
+        first = pool.submit(flights.do, 'k', fail)
+        started.wait()
+        follower = pool.submit(flights.do, 'k', fail)
+        for future in (first, follower):
+            with pytest.raises(RuntimeError, match='provider down'):
+                future.result()
+
+    assert flights.do('k', lambda: 'ok') == 'ok'
+
+
+def test_keys_depend_on_inputs():
+    assert flight_key('summary', 'a', 500) == flight_key('summary', 'a', 500)
+    assert flight_key('summary', 'a', 500) != flight_key('summary', 'a', 400)
+    assert flight_key('summary', 'a') != flight_key('extract', 'a')
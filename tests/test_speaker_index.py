@@ -0,0 +1,62 @@
+"""Tests for the per-speaker turn index stored with meetings."""
+from app import backfill
+from app.speaker_index import build_speaker_index, search_turns, talk_time, turns_for
+
+TRANSCRIPT = ("Alice (PM): Welcome everyone, let's review the launch plan.\n"
+              "John (Engineering): The API migration is done and the rate limits are in.\n"
+              "Alice: Great. John, can you share the latency numbers?\n"
+              "John: Yes, I will post the latency dashboard today.")
+SEGMENTS = [
+    {'start': 0.0, 'end': 4.0, 'text': "Alice (PM): Welcome everyone, let's review the launch plan."},
+    {'start': 4.0, 'end': 9.5, 'text': "John (Engineering): The API migration is done and the rate limits are in."},
+    {'start': 9.5, 'end': 12.0, 'text': "Alice: Great. John, can you share the latency numbers?"},
+    {'start': 12.0, 'end': 15.0, 'text': "John: Yes, I will post the latency dashboard today."},
+]
+
+
+def test_index_records_speakers_offsets_and_times():
+    index = build_speaker_index(TRANSCRIPT, SEGMENTS)
+
+    assert index['speakers'] == ['Alice', 'John'] and index['keys'] == ['alice', 'john']
+    assert index['roles'] == ['PM', 'Engineering']
+    pos, start, end, words, t_start, t_end = index['turns'][1]
+    assert TRANSCRIPT[start:end] == "The API migration is done and the rate limits are in."
+    assert (pos, words, t_start, t_end) == (1, 11, 4.0, 9.5)
+
+
+def test_talk_time_and_filtering_read_only_the_index():
+    index = build_speaker_index(TRANSCRIPT, SEGMENTS)
+
+    stats = {row['speaker']: row for row in talk_time(index)}
+    assert stats['John']['turns'] == 2 and stats['John']['seconds'] == 8.5
+    assert stats['Alice']['seconds'] == 6.5
+    assert abs(sum(row['share'] for row in stats.values()) - 1.0) < 1e-3
+    assert [t['t_start'] for t in turns_for(index, ['ALICE'])] == [0.0, 9.5]
+    assert turns_for(index, ['Nobody']) == []
+
+
+def test_untimed_and_unlabelled_transcripts():
+    index = build_speaker_index(TRANSCRIPT)
+    assert all(turn[4] is None for turn in index['turns'])
+    assert talk_time(index)[0]['seconds'] is None
+
+    plain = build_speaker_index("Just some notes. No speakers here.")
+    assert plain['speakers'] == [] and talk_time(plain) == []
+
+
+def test_search_is_scoped_to_one_speaker():
+    index = build_speaker_index(TRANSCRIPT)
+
+    hits = search_turns(TRANSCRIPT, index, 'John', 'latency dashboard')
+    assert [h['snippet'] for h in hits] == ["Yes, I will post the latency dashboard today."]
+    # Alice also says "latency", but only John's turns are searched
+    assert len(search_turns(TRANSCRIPT, index, 'John', 'latency')) == 1
+    assert search_turns(TRANSCRIPT, index, 'Alice', 'dashboard') == []
+
+
+def test_backfill_speakers_task():
+    backfill.init_worker(['speakers'])
+
+    fields = backfill.analyze_meeting({'transcript': TRANSCRIPT})
+
+    assert list(fields) == ['speaker_index'] and fields['speaker_index']['speakers'] == ['Alice', 'John']
@@ -0,0 +1,48 @@
+"""Tests for the lightweight app.api startup path."""
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+from app.nlp_analyzer import NLPAnalyzer
+
+ROOT = Path(__file__).parent.parent
+
+_PROBE = """
+import json, sys
+import app.api
+from app.config import config
+print(json.dumps({
+    'loaded': [m for m in ('openai', 'google.generativeai', 'pydub', 'numpy') if m in sys.modules],
+    'discovered': sorted(config._discovered),
+}))
+"""
+
+
+def test_api_import_defers_sdks_and_discovery():
+    env = dict(os.environ, PYTHONPATH=str(ROOT), OPENAI_API_KEY='sk-test', GEMINI_API_KEY='test')
+    proc = subprocess.run([sys.executable, '-c', _PROBE], cwd=ROOT, env=env, capture_output=True, text=True,
+                          timeout=120)
+
+    assert proc.returncode == 0, proc.stderr[-2000:]
+    report = json.loads(proc.stdout.strip().splitlines()[-1])
+    assert report['loaded'] == []
+    # Only the Hugging Face cache is needed to set up ASR; FFmpeg and Vosk are found when first used
+    assert report['discovered'] == ['HF_HOME']
+
+
+def test_llm_clients_are_built_on_first_use(monkeypatch):
+    monkeypatch.setenv('OPENAI_API_KEY', 'sk-test')
+    monkeypatch.delenv('GEMINI_API_KEY', raising=False)
+    nlp = NLPAnalyzer()
+    built = []
+    monkeypatch.setattr(nlp, '_create_openai_client', lambda: built.append('openai') or object())
+
+    assert built == []
+    targets = nlp._llm_targets('gpt-test')
+    assert built == ['openai'] and targets == [('openai', 'gpt-test')]
+    assert nlp.gemini_client is None
+
+    nlp.openai_client = None
+    assert nlp._llm_targets('gpt-test') == [] and built == ['openai']
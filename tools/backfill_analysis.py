@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Bulk Re-Analysis Backfill
+
+Recomputes keywords, rule-based extraction, extractive summaries and/or
+speaker indexes for every stored meeting, on a process pool, writing
+results back in bulk.
+Progress is checkpointed after every page; rerun the same command to resume
+after a crash or Ctrl-C. Delete the checkpoint file to start over.
+
+Usage:
+    python tools/backfill_analysis.py --tasks keywords,extraction
+    python tools/backfill_analysis.py --tasks speakers --workers 0
+    python tools/backfill_analysis.py --tasks summary --workers 4 --checkpoint /var/tmp/backfill_summary.json
+"""
+
+import argparse
+import os
+import sys
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from dotenv import load_dotenv
+from pymongo import MongoClient
+
+from app.backfill import TASKS, Checkpoint, run_backfill
+
+# Load environment variables
+load_dotenv()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Re-analyze stored meetings in bulk (resumable)")
+    parser.add_argument('--tasks', default='keywords,extraction',
+                        help=f"Comma-separated subset of {', '.join(TASKS)}")
+    parser.add_argument('--mongodb-url', default=os.getenv('MONGODB_URL', 'mongodb://localhost:27017'))
+    parser.add_argument('--database', default=os.getenv('DATABASE_NAME', 'imip'))
+    parser.add_argument('--workers', type=int, default=None, help='Analysis processes (default: CPU count, 0 = inline)')
+    parser.add_argument('--page-size', type=int, default=200, help='Meetings per bulk write and checkpoint')
+    parser.add_argument('--limit', type=int, default=None, help='Stop after this many meetings in this run')
+    parser.add_argument('--summary-words', type=int, default=300, help='Target summary length for the summary task')
+    parser.add_argument('--checkpoint', default=None, help='Checkpoint file (default: ./backfill_<tasks>.json)')
+    args = parser.parse_args()
+
+    tasks = [t.strip() for t in args.tasks.split(',') if t.strip()]
+    unknown = [t for t in tasks if t not in TASKS]
+    if not tasks or unknown:
+        parser.error(f"unknown task(s) {unknown}; choose from {', '.join(TASKS)}")
+    checkpoint_path = args.checkpoint or f"backfill_{'_'.join(sorted(tasks))}.json"
+    Path(checkpoint_path).parent.mkdir(parents=True, exist_ok=True)
+
+    client = MongoClient(args.mongodb_url)
+    try:
+        stats = run_backfill(client[args.database]['meetings'], tasks, Checkpoint(checkpoint_path),
+                             workers=args.workers, page_size=args.page_size, limit=args.limit,
+                             summary_words=args.summary_words)
+    except KeyboardInterrupt:
+        print(f"\nInterrupted; rerun to resume from {checkpoint_path}")
+        sys.exit(130)
+    finally:
+        client.close()
+
+    print(f"\n✓ Backfill finished: {stats.processed} processed, {stats.updated} updated, "
+          f"{stats.skipped} skipped (edited meanwhile), {len(stats.failed)} failed")
+    if stats.failed:
+        print(f"  Failed ids: {', '.join(stats.failed[:20])}{' ...' if len(stats.failed) > 20 else ''}")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
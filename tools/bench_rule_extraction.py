@@ -0,0 +1,53 @@
+"""
+Rule-Based Extraction Throughput
+
+Reports MB/s for the offline rule-based extractor on a transcript repeated
+to a few megabytes, plus per-line action-item extraction.
+
+Usage: python tools/bench_rule_extraction.py [transcript] [repeat]
+"""
+
+import os
+import sys
+import time
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+# Rule-based only: never reach out to an LLM
+for key in ('OPENAI_API_KEY', 'GEMINI_API_KEY'):
+    os.environ.pop(key, None)
+
+from app.nlp_analyzer import NLPAnalyzer
+
+
+def _best_of(fn, runs=3):
+    best = float('inf')
+    for _ in range(runs):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    root = Path(__file__).parent.parent
+    path = Path(sys.argv[1]) if len(sys.argv) > 1 else root / 'data' / 'transcripts' / 'one_hour_meeting.txt'
+    repeat = int(sys.argv[2]) if len(sys.argv) > 2 else 40
+    text = path.read_text(encoding='utf-8')
+    nlp = NLPAnalyzer()
+
+    big = text * repeat
+    mb = len(big.encode('utf-8')) / 1e6
+    elapsed = _best_of(lambda: nlp._extract_enhanced_items_rule_based(big))
+    print(f"full extraction:       {mb:.2f} MB in {elapsed:.3f}s -> {mb / elapsed:.2f} MB/s")
+
+    lines = text.splitlines() * (repeat // 4 or 1)
+    mb = sum(len(line.encode('utf-8')) for line in lines) / 1e6
+    elapsed = _best_of(lambda: [nlp._extract_action_items_rule_based(line) for line in lines])
+    print(f"per-line action items: {mb:.2f} MB in {elapsed:.3f}s -> {mb / elapsed:.2f} MB/s")
+
+
+if __name__ == '__main__':
+    main()
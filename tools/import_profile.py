@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Import-Time Profile
+
+Imports a module in a fresh interpreter under `python -X importtime` and
+reports the slowest imports by cumulative time. Also checks that SDKs meant
+to load on first use (OpenAI, Gemini, pydub, NumPy) were not imported.
+With --budget-ms it exits non-zero when the import is over budget or a
+deferred module was loaded, which is how CI guards startup time.
+
+Usage:
+    python tools/import_profile.py
+    python tools/import_profile.py --module app.nlp_analyzer --top 40
+    python tools/import_profile.py --budget-ms 2500 --runs 3
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+ROOT = Path(__file__).parent.parent
+
+# Imported on first use only; seeing one at startup is a regression
+DEFERRED = ('openai', 'google.generativeai', 'pydub', 'numpy')
+
+
+def profile(module: str) -> Tuple[int, Dict[str, Tuple[int, int]]]:
+    """(cumulative µs for `module`, {imported module: (self µs, cumulative µs)}) from one fresh interpreter."""
+    env = dict(os.environ, PYTHONPATH=str(ROOT))
+    # API keys make the clients importable but must not make them import at startup
+    env.setdefault('OPENAI_API_KEY', 'sk-import-profile')
+    env.setdefault('GEMINI_API_KEY', 'import-profile')
+    proc = subprocess.run([sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+                          cwd=ROOT, env=env, capture_output=True, text=True)
+    if proc.returncode != 0:
+        raise SystemExit(f"import {module} failed:\n{proc.stderr[-2000:]}")
+    modules: Dict[str, Tuple[int, int]] = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        modules[name.strip()] = (int(self_us), int(cumulative_us))
+    return modules.get(module, (0, 0))[1], modules
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Report import-time cost of a module (python -X importtime)")
+    parser.add_argument('--module', default='app.api')
+    parser.add_argument('--top', type=int, default=25, help='Slowest imports to list')
+    parser.add_argument('--runs', type=int, default=3, help='Fresh interpreters to try; the fastest run is reported')
+    parser.add_argument('--budget-ms', type=float, default=None, help='Fail when the import takes longer than this')
+    args = parser.parse_args()
+
+    runs = [profile(args.module) for _ in range(max(1, args.runs))]
+    total_us, modules = min(runs, key=lambda r: r[0])
+
+    ranked: List[Tuple[str, Tuple[int, int]]] = sorted(modules.items(), key=lambda kv: -kv[1][1])
+    print(f"{'cumulative ms':>14} {'self ms':>9}  module")
+    for name, (self_us, cumulative_us) in ranked[:args.top]:
+        print(f"{cumulative_us / 1000:14.1f} {self_us / 1000:9.1f}  {name}")
+    print(f"\nimport {args.module}: {total_us / 1000:.1f} ms (best of {len(runs)})")
+
+    loaded = [m for m in DEFERRED if m in modules]
+    if loaded:
+        print(f"✗ Deferred modules imported at startup: {', '.join(loaded)}")
+    over = args.budget_ms is not None and total_us / 1000 > args.budget_ms
+    if over:
+        print(f"✗ Over the {args.budget_ms:.0f} ms startup budget")
+    elif args.budget_ms is not None:
+        print(f"✓ Within the {args.budget_ms:.0f} ms startup budget")
+    if args.budget_ms is not None and (over or loaded):
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()